@@ -1,199 +1,612 @@
-from flask import Flask, request, jsonify , send_file
+from flask import Blueprint, Flask, current_app, request, jsonify , send_file, Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-from src.webscraper import WebScraper
-from flask_sqlalchemy import SQLAlchemy
+from src.driver_pool import DriverPool, DriverPoolTimeout
+from src.cache import CaseCache
+from src.jobs import FINISHED, JobManager, JobQueueFull
+from src.persistence import save_case_result
+from src.pdf_cache import PdfCache, UpstreamError
+from src.prefetch import Prefetcher
+from src.order_index import OrderIndex
+from src.catalog import CaseCatalog
+from src.coalesce import SingleFlight
+from src.upstream import UpstreamUnavailable, is_court_url, upstream
+from src.history import InvalidFilter, iter_cases, parse_filters, search_cases
+from src.dal import DataAccess
+from src.logs import configure_logging
+from src.compression import compress_response
+from src.models import dumps
+from src import metrics
 from dotenv import load_dotenv
 import os
-from sqlalchemy import text
+import atexit
+import logging
+import signal
+import sys
+import threading
+import time
 import warnings
 warnings.filterwarnings("ignore")
-from io import BytesIO
 from urllib.parse import urlparse
-import requests
 
 load_dotenv()
+configure_logging()
+logger = logging.getLogger('app')
 
-app = Flask(__name__)
-CORS(app)
 
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('SQLALCHEMY_DATABASE_URI')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-db = SQLAlchemy(app)
-wb = WebScraper()
+class ModelJSONProvider(DefaultJSONProvider):
+    # Scraper rows are dataclasses; src.models.dumps writes them (with orjson when installed)
+    def dumps(self, obj, **kwargs):
+        return dumps(obj, sort_keys=self.sort_keys)
 
-@app.route("/form", methods=['POST'])
+
+bp = Blueprint('court', __name__)
+
+# Constructing these is cheap: no browser, connection or thread is started
+# until start_background() runs (on the first request).
+# Engines, pool settings and replica routing live in src/dal.py
+db = DataAccess()
+pool = DriverPool()
+catalog = CaseCatalog()
+cache = CaseCache()
+# Waiting on another worker's scrape only pays off when its result lands in the shared tier
+flights = SingleFlight(cross_process=bool(cache.shared_path))
+jobs = JobManager()
+pdf_cache = PdfCache()
+# Optional background download of every PDF in a stored order list
+prefetcher = Prefetcher(pdf_cache) if os.getenv('PREFETCH_PDFS', '0') == '1' else None
+# Optional full-text index over the text of order PDFs (needs pypdf)
+order_index = OrderIndex(pdf_cache) if os.getenv('ORDER_INDEX', '0') == '1' else None
+
+# Gauges below are read from each component's stats() when /metrics is scraped
+metrics.gauge('court_driver_pool_sessions', 'Scraper sessions in the driver pool', ('state',),
+              lambda: {(state,): value for state, value in pool.stats().items()})
+metrics.gauge('court_cache_lookups', 'Case cache lookups since start', ('result',),
+              lambda: {(result,): cache.stats()[result] for result in ('memory_hits', 'shared_hits', 'misses')})
+metrics.gauge('court_cache_hit_ratio', 'Share of case lookups served from cache', (),
+              lambda: {(): cache.stats()['hit_ratio']})
+metrics.gauge('court_cache_entries', 'Cases held in the in-memory cache', (),
+              lambda: {(): cache.stats()['entries']})
+metrics.gauge('court_jobs', 'Async lookup jobs by state', ('state',),
+              lambda: {(state,): count for state, count in jobs.stats()['jobs'].items()})
+metrics.gauge('court_coalesced_lookups', 'Single-flight lookup counters', ('outcome',),
+              lambda: {(outcome,): value for outcome, value in flights.stats().items()})
+metrics.gauge('court_upstream_circuit_state', 'Circuit breaker state toward the court website (1 = current)', ('state',),
+              lambda: {(state,): int(upstream().state == state) for state in ('closed', 'half_open', 'open')})
+metrics.gauge('court_upstream_concurrency_limit', 'Current AIMD limit on concurrent upstream calls', (),
+              lambda: {(): upstream().stats()['limit']})
+metrics.gauge('court_upstream_in_flight', 'Upstream calls in progress', (),
+              lambda: {(): upstream().stats()['in_flight']})
+metrics.gauge('court_db_pool_connections', 'SQLAlchemy pool connections by engine and state', ('engine', 'state'),
+              lambda: {(engine, state): value for engine, stats in db.pool_stats().items() for state, value in stats.items()})
+metrics.gauge('court_pdf_cache_bytes', 'Size of the PDF download cache', (),
+              lambda: {(): pdf_cache.stats()['bytes']})
+if order_index is not None:
+    metrics.gauge('court_order_index_pending', 'Order PDFs queued for text indexing', (),
+                  lambda: {(): order_index.stats()['pending']})
+
+_started = False
+_start_lock = threading.Lock()
+
+def start_background():
+    """
+    Warm the driver pool (and keep restarting crashed drivers) and start the
+    case catalog refresh, once per process. Returns immediately.
+    """
+    global _started
+    if _started:
+        return
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+    pool.start()
+    catalog.start(pool)
+    atexit.register(shutdown)
+    logger.info("Background services started", extra={'warm': pool.warm_target})
+
+def shutdown():
+    """
+    Stop background work and quit every browser (WebScraper.close).
+    """
+    catalog.stop()
+    jobs.shutdown()
+    if prefetcher is not None:
+        prefetcher.shutdown()
+    if order_index is not None:
+        order_index.shutdown()
+    pool.close()
+    db.dispose()
+    logger.info("Shut down")
+
+def create_app():
+    """
+    Flask app serving the lookup API. Nothing slow happens here; the driver
+    pool is warmed in the background once the first request (typically a
+    /healthz or /readyz probe) arrives.
+    """
+    app = Flask(__name__)
+    app.json = ModelJSONProvider(app)
+    CORS(app)
+    db.init_app(app)
+    app.register_blueprint(bp)
+    return app
+
+@bp.before_app_request
+def start_timer():
+    start_background()
+    request.environ['court.start'] = time.perf_counter()
+
+@bp.after_app_request
+def record_request(response):
+    if (request.method == "GET" and response.status_code == 200 and response.mimetype == "application/json"
+            and not response.is_streamed and "ETag" not in response.headers):
+        # Read endpoints without a cheaper validator get one from the body
+        response.add_etag(weak=True)
+        response.make_conditional(request)
+    compress_response(request, response)
+    start = request.environ.get('court.start')
+    if start is not None:
+        metrics.REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            endpoint=request.url_rule.rule if request.url_rule else 'unmatched',
+            method=request.method,
+            status=response.status_code,
+        )
+    return response
+
+def _no_progress(stage, **info):
+    pass
+
+def scrape_and_store(data, cache_key, progress):
+    """
+    Run the scrape for one lookup, store it and cache it; returns (payload, status_code).
+    """
+    progress('scraping')
+
+    # Call webscraper on a pooled driver session
+    with metrics.span('scrape', case=cache_key), pool.session() as wb:
+        res = wb.search_and_extract_case(
+            case_no_input=data['case_no'],
+            case_type_input=data['case_type'],
+            case_year_input=data['year']
+        )
+
+        logger.debug("Webscraper result", extra={'case': cache_key, 'result': res})
+
+        order_res = []
+        if res and len(res) > 0 and res[0]['order_link'] not in (None, "NA"):
+            progress('case_found', cases=len(res))
+            order_res = wb.get_order_data(order_link=res[0]['order_link'])
+            progress('orders_parsed', orders=len(order_res))
+
+        logger.info("Scrape finished", extra={'case': cache_key, 'timings': wb.last_timings})
+
+    if res and len(res) > 0:
+        try:
+            # Query, response and orders go in as one transaction
+            query_id, response_id = save_case_result(db.session, data, res[0], order_res)
+            res[0].query_id = query_id
+            res[0].response_id = response_id
+            logger.info("Stored case", extra={'case': cache_key, 'response_id': response_id, 'orders': len(order_res)})
+
+            if prefetcher is not None and order_res:
+                prefetcher.enqueue(response_id, order_res)
+            if order_index is not None and order_res:
+                order_index.enqueue(response_id, order_res)
+
+        except Exception as db_error:
+            metrics.count_error('database', db_error)
+            logger.exception("Database error")
+            db.session.rollback()
+            # Still return the result even if database insertion fails
+            pass
+
+        progress('persisted', response_id=res[0].get('response_id'))
+        cache.put(cache_key, res)
+
+        # Return the case data to frontend
+        return res, 200
+
+    else:
+        # No case found
+        return [], 200
+
+def lookup_case(data, progress=_no_progress):
+    """
+    Scrape, store and cache one case lookup.
+
+    Returns (payload, status_code). `progress(stage, **info)` is called as the
+    lookup moves along so async jobs can report it.
+    """
+    cache_key = cache.case_key(data['case_type'], data['case_no'], data['year'])
+    try:
+        # Serve repeat lookups from cache unless the caller forces a refresh
+        if not data.get('refresh'):
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.info("Cache hit", extra={'case': cache_key})
+                progress('cache_hit')
+                return cached, 200
+
+        def from_shared_cache():
+            # Another worker may have finished the same lookup while we waited
+            cached = None if data.get('refresh') else cache.get(cache_key)
+            return (cached, 200) if cached is not None else None
+
+        # One scrape per case at a time; concurrent callers share its result
+        (payload, status_code), shared = flights.do(
+            cache_key,
+            lambda: scrape_and_store(data, cache_key, progress),
+            shared_lookup=from_shared_cache,
+        )
+        if shared:
+            logger.info("Coalesced lookup", extra={'case': cache_key})
+            progress('coalesced')
+        return payload, status_code
+
+    except UpstreamUnavailable as e:
+        # Circuit open or no upstream slot: fall back to an expired cache entry
+        metrics.count_error('upstream', e)
+        stale = cache.get_stale(cache_key)
+        if stale is not None:
+            logger.info("Serving stale result: %s", e, extra={'case': cache_key})
+            progress('stale')
+            return [dict(row, stale=True) for row in stale], 200
+        logger.warning("Court website unavailable: %s", e, extra={'case': cache_key})
+        return {"error": "Court website is unavailable, try again shortly", "retry_after": e.retry_after}, 503
+
+    except DriverPoolTimeout as e:
+        metrics.count_error('driver_pool', e)
+        logger.warning("Driver pool exhausted: %s", e)
+        return {"error": "Scraper busy, try again shortly"}, 503
+
+    except Exception as e:
+        metrics.count_error('lookup', e)
+        logger.exception("Error in search_case")
+        return {"error": "Internal server error occurred"}, 500
+
+def set_retry_after(response, retry_after):
+    """
+    Tell clients and proxies when to try again (whole seconds, rounded up).
+    """
+    if retry_after is not None:
+        response.headers["Retry-After"] = str(int(retry_after) + 1)
+    return response
+
+def retry_after_of(payload, status_code):
+    """
+    retry_after of a lookup_case() answer that hit the open circuit, else None.
+    """
+    return payload.get("retry_after") if status_code == 503 and isinstance(payload, dict) else None
+
+def run_lookup_job(data):
+    """
+    Job body for an async /form request: runs lookup_case inside an app context.
+    """
+    app = current_app._get_current_object()
+
+    def run(job):
+        with app.app_context():
+            return lookup_case(data, progress=job.progress)
+    return run
+
+@bp.route("/form", methods=['POST'])
 def search_case():
+    data = request.get_json(silent=True)
+
+    # Validate input data
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+
+    required_fields = ['case_no', 'case_type', 'year']
+    for field in required_fields:
+        if field not in data or not data[field]:
+            return jsonify({"error": f"Missing required field: {field}"}), 400
+
+    # Reject unknown case types/years before any browser work
+    error = catalog.validate(data['case_type'], data['year'])
+    if error:
+        return jsonify({"error": error}), 400
+
+    logger.debug("Received data", extra={'data': data})
+
+    if data.get('async'):
+        key = cache.case_key(data['case_type'], data['case_no'], data['year'])
+        try:
+            job, created = jobs.submit(key, run_lookup_job(data))
+        except JobQueueFull as e:
+            logger.warning("Job queue full: %s", e)
+            return jsonify({"error": "Too many lookups queued, try again shortly"}), 503
+
+        return jsonify({
+            "job_id": job.id,
+            "deduplicated": not created,
+            "status_url": f"/jobs/{job.id}",
+            "events_url": f"/jobs/{job.id}/events",
+        }), 202
+
+    payload, status_code = lookup_case(data)
+    return set_retry_after(jsonify(payload), retry_after_of(payload, status_code)), status_code
+
+@bp.route("/case-types", methods=["GET"])
+def case_types():
+    options = catalog.as_dict()
+    if not options['case_types']:
+        return jsonify({"error": "Case types not loaded yet"}), 503
+    response = jsonify(options)
+    response.headers["Cache-Control"] = "public, max-age=3600"
+    return response, 200
+
+@bp.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    state = job.to_dict()
+    # The job itself was found, but its lookup hit the open circuit
+    return set_retry_after(jsonify(state), retry_after_of(state['result'], state['status_code'])), 200
+
+# The event stream holds a worker until the job finishes: only for threaded or
+# gevent workers, clients on sync workers poll /jobs/<job_id> instead
+@bp.route("/jobs/<job_id>/events", methods=["GET"])
+def stream_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+
+    def events():
+        for event in jobs.stream(job):
+            if event is None:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                continue
+            payload = dict(event)
+            if event['stage'] in FINISHED:
+                payload.update(job.to_dict())
+            yield f"event: {event['stage']}\ndata: {dumps(payload)}\n\n"
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@bp.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    return jsonify(cache.stats()), 200
+
+@bp.route("/coalesce/stats", methods=["GET"])
+def coalesce_stats():
+    return jsonify(flights.stats()), 200
+
+@bp.route("/db/stats", methods=["GET"])
+def db_stats():
+    return jsonify(db.pool_stats()), 200
+
+@bp.route("/upstream/stats", methods=["GET"])
+def upstream_stats():
+    return jsonify(upstream().stats()), 200
+
+@bp.route("/healthz", methods=["GET"])
+def healthz():
+    # Liveness: the process is serving requests
+    return jsonify({"status": "ok"}), 200
+
+@bp.route("/readyz", methods=["GET"])
+def readyz():
+    # Readiness: a scraper session is up (or can be started on demand)
+    driver = pool.health()
+    status_code = 200 if driver['ready'] else 503
+    return jsonify({"ready": driver['ready'], "driver": driver, "catalog_loaded": catalog.updated_at is not None}), status_code
+
+@bp.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+def load_orders(response_id):
+    with metrics.DB_SECONDS.time(operation='order_lookup'):
+        orders = db.order_details(response_id)
+
+    for order in orders:
+        # Same dd/mm/yyyy format the court site uses
+        if order["order_date"] is not None and not isinstance(order["order_date"], str):
+            order["order_date"] = order["order_date"].strftime("%d/%m/%Y")
+    return orders
+
+@bp.route("/order/<int:response_id>", methods=["GET"])
+def get_order_list(response_id):
+    """
+    Orders of a stored response, cacheable by browsers and proxies.
+
+    The ETag comes from the response row's version and its order count, so a
+    revalidation is answered with 304 without reading the orders.
+    """
     try:
-        if request.method == "POST":
-            data = request.get_json()
-            
-            # Validate input data
-            if not data:
-                return jsonify({"error": "No data provided"}), 400
-            
-            required_fields = ['case_no', 'case_type', 'year']
-            for field in required_fields:
-                if field not in data or not data[field]:
-                    return jsonify({"error": f"Missing required field: {field}"}), 400
-            
-            print(f"Received data: {data}")
-            
-            # Call webscraper
-            res = wb.search_and_extract_case(
-                case_no_input=data['case_no'],
-                case_type_input=data['case_type'],
-                case_year_input=data['year']
-            )
+        with metrics.DB_SECONDS.time(operation='order_state'):
+            state = db.order_state(response_id)
+        if state is None:
+            return jsonify({"error": "Unknown response_id"}), 404
+
+        version, count = state
+        etag = f"order-{response_id}-v{version}-n{count}"
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = jsonify(load_orders(response_id))
+        response.set_etag(etag, weak=True)
+        response.cache_control.public = True
+        response.cache_control.max_age = int(os.getenv("ORDER_MAX_AGE", 60))
+        response.vary.add("Accept-Encoding")
+        return response
 
-            print(f"Webscraper result: {res}")
-            
-            if res and len(res) > 0:
-                try:
-
-                    order_res = wb.get_order_data(order_link=res[0]['order_link'])
-
-                    # Insert query into database
-                    db.session.execute(
-                        text("""
-                            INSERT INTO Query (case_no, case_type, year)
-                            VALUES (:case_no, :case_type, :year)
-                        """),
-                        {
-                            'case_no': data['case_no'],
-                            'case_type': data['case_type'],
-                            'year': data['year']
-                        }
-                    )
-                    db.session.commit()
-                    print("Query inserted successfully!")
-
-                    # Get the last inserted query_id
-                    query_id = db.session.execute(text("SELECT LAST_INSERT_ID()")).scalar()
-                    res[0]['query_id'] = query_id
-
-                    # Insert response into database
-                    db.session.execute(
-                        text("""
-                            INSERT INTO Responses (
-                                query_id, case_title, status, petitioner, respondent,
-                                next_date, last_date, court_no, order_link
-                            ) VALUES (
-                                :query_id, :case_title, :status, :petitioner, :respondent,
-                                :next_date, :last_date, :court_no, :order_link
-                            )
-                        """),
-                        res[0]
-                    )
-                    db.session.commit()
-                    print("Response inserted into database successfully!")
-                    # Get last inserted response_id (to link foreign key)
-
-                    response_id = db.session.execute(text("SELECT LAST_INSERT_ID()")).scalar()
-                    res[0]["response_id"] = response_id
-                    # Insert each order detail
-                    for order in order_res:
-                        db.session.execute(
-                            text("""
-                                INSERT INTO OrderDetails (
-                                    response_id,
-                                    sr_no,
-                                    order_link,
-                                    order_date,
-                                    corrigendum_link,
-                                    hindi_order
-                                ) VALUES (
-                                    :response_id,
-                                    :sr_no,
-                                    :order_link,
-                                    :order_date,
-                                    :corrigendum_link,
-                                    :hindi_order
-                                )
-                            """),
-                            {
-                                "response_id": response_id,
-                                "sr_no": order["sr_no"],
-                                "order_link": order["order_link"],
-                                "order_date": order["order_date"],
-                                "corrigendum_link": order["corrigendum_link"],
-                                "hindi_order": order["hindi_order"]
-                            }
-                        )
-
-                    # Commit all inserts
-                    db.session.commit()
-                    print("Order details inserted successfully!")
-
-                except Exception as db_error:
-                    print(f"Database error: {db_error}")
-                    db.session.rollback()
-                    # Still return the result even if database insertion fails
-                    pass
-                
-                # Return the case data to frontend
-                return jsonify(res), 200
-            
-            else:
-                # No case found
-                return jsonify([]), 200
-    
     except Exception as e:
-        print(f"Error in search_case: {str(e)}")
-        return jsonify({"error": "Internal server error occurred"}), 500
+        metrics.count_error('order', e)
+        logger.exception("Error fetching order details")
+        return jsonify({"error": "Internal server error"}), 500
 
-@app.route("/order", methods=["POST"])
+@bp.route("/order", methods=["POST"])
 def get_order_details():
     try:
         data = request.get_json()
-        print(data)
         response_id = data.get("response_id")
 
         if not response_id:
             return jsonify({"error": "Missing response_id"}), 400
 
-        result = db.session.execute(
-            text("""
-                SELECT sr_no, order_link, order_date, corrigendum_link, hindi_order
-                FROM OrderDetails
-                WHERE response_id = :response_id
-                ORDER BY sr_no ASC
-            """),
-            {"response_id": response_id}
-        )
-        print(result)
+        return jsonify(load_orders(response_id)), 200
 
-        orders = [dict(row._mapping) for row in result]
-        return jsonify(orders), 200
+    except Exception as e:
+        metrics.count_error('order', e)
+        logger.exception("Error fetching order details")
+        return jsonify({"error": "Internal server error"}), 500
 
+@bp.route("/cases", methods=["GET"])
+def list_cases():
+    """
+    Stored cases filtered by party, status, court, case type/year, next-date
+    range or full text (q), one keyset page at a time.
+    """
+    try:
+        filters = parse_filters(request.args)
+        with metrics.DB_SECONDS.time(operation='case_search'):
+            rows, next_cursor = search_cases(
+                db.read_session, filters,
+                limit=request.args.get('limit', 50, type=int),
+                cursor=request.args.get('cursor'),
+            )
+        return jsonify({"items": rows, "next_cursor": next_cursor}), 200
+
+    except InvalidFilter as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        metrics.count_error('case_search', e)
+        logger.exception("Error searching stored cases")
+        return jsonify({"error": "Internal server error"}), 500
+
+@bp.route("/cases/export", methods=["GET"])
+def export_cases():
+    """
+    Every stored case matching the /cases filters as JSON lines, streamed.
+    """
+    try:
+        rows = iter_cases(db.read_session, parse_filters(request.args))
+        # Run the first query now so a bad filter is a 400, not a broken stream
+        first = next(rows, None)
+    except InvalidFilter as e:
+        return jsonify({"error": str(e)}), 400
+
+    def lines():
+        if first is None:
+            return
+        yield dumps(first) + "\n"
+        for row in rows:
+            yield dumps(row) + "\n"
+
+    return Response(
+        stream_with_context(lines()),
+        mimetype="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="cases.jsonl"'},
+    )
+
+@bp.route("/prefetch/<int:response_id>", methods=["GET"])
+def prefetch_status(response_id):
+    if prefetcher is None:
+        return jsonify({"error": "PDF prefetching is disabled"}), 404
+    orders = db.order_details(response_id)
+    if not orders:
+        return jsonify({"error": "No stored orders for this response"}), 404
+    return jsonify(prefetcher.status(orders)), 200
+
+@bp.route("/orders/search", methods=["GET"])
+def search_orders():
+    """
+    Order PDFs whose text matches `q`, as page hits with snippets.
+    """
+    if order_index is None:
+        return jsonify({"error": "Order text search is disabled"}), 404
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"error": "Missing q"}), 400
+    try:
+        hits = order_index.search(
+            q,
+            limit=request.args.get("limit", 20, type=int),
+            response_id=request.args.get("response_id", type=int),
+        )
+        return jsonify({"items": hits}), 200
+    except InvalidFilter as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        print(f"Error fetching order details: {e}")
+        metrics.count_error('order_index', e)
+        logger.exception("Order search failed")
         return jsonify({"error": "Internal server error"}), 500
 
-@app.route("/download" , methods=["POST"])
+@bp.route("/download" , methods=["GET", "POST"])
 def download_pdf():
-    data = request.get_json()
-    url = data.get("link")
-    
+    # GET ?link=... can be cached by the browser and honours Range requests
+    if request.method == "GET":
+        url = request.args.get("link")
+    else:
+        data = request.get_json(silent=True) or {}
+        url = data.get("link")
+
+    if not url:
+        return jsonify({"error": "Missing link"}), 400
+    # Only order PDFs from the court website, not any URL a client sends
+    if not is_court_url(url):
+        return jsonify({"error": "Link is not on the court website"}), 400
+
+    # Extract filename from URL
+    parsed_url = urlparse(url)
+    filename = os.path.basename(parsed_url.path).replace('/', '_') + ".pdf"
+
     try:
-        response = requests.get(url)
-        if response.status_code != 200:
-            return jsonify({"error": "Failed to download from source"}), 400
-        
-        # Extract filename from URL
-        parsed_url = urlparse(url)
-        filename = os.path.basename(parsed_url.path).replace('/', '_') + ".pdf"
-
-        return send_file(
-            BytesIO(response.content),
+        cached = pdf_cache.lookup(url)
+        if cached is None and (request.range or request.if_none_match):
+            # Conditional and partial requests are answered from the cached file
+            cached = pdf_cache.fetch(url)
+
+        if cached is None:
+            # First request for this PDF: stream it through while it is cached
+            chunks = pdf_cache.stream(url)
+            return Response(
+                stream_with_context(chunks),
+                mimetype="application/pdf",
+                headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+            )
+
+        path, meta = cached
+        response = send_file(
+            path,
             download_name=filename,
             mimetype="application/pdf",
-            as_attachment=True
+            as_attachment=True,
+            conditional=True,
+            etag=meta["etag"],
+            max_age=int(os.getenv("PDF_MAX_AGE", 86400)),
         )
+        response.headers["X-Cache"] = "HIT"
+        return response
+
+    except UpstreamUnavailable as e:
+        metrics.count_error('upstream', e)
+        response = jsonify({"error": "Court website is unavailable, try again shortly"})
+        return set_retry_after(response, e.retry_after), 503
+    except UpstreamError as e:
+        metrics.count_error('download', e)
+        logger.warning("Download failed: %s", e, extra={'url': url})
+        return jsonify({"error": "Failed to download from source"}), 400
     except Exception as e:
+        metrics.count_error('download', e)
         return jsonify({"error": str(e)}), 500
 
 
     
+app = create_app()
+
 if __name__ == "__main__":
+    # Turn SIGTERM into a normal exit so shutdown() closes the browsers
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""
+Page-load time, bytes transferred and memory of each browser profile.
+
+    python -m benchmarks.bench_browser
+    python -m benchmarks.bench_browser --profiles default lean --searches 50 --latency 0.1
+
+Every profile gets its own WebScraper and runs the same searches and order
+pages against the local replay server, whose pages link a stylesheet, web
+font, images and an analytics script (see benchmarks/fixtures.py ASSETS).
+Form-session reuse is switched off so that every search loads the form
+page. Needs Chrome and chromedriver.
+"""
+import argparse
+import os
+import statistics
+
+from benchmarks import fixtures
+from benchmarks.replay_server import ReplayServer
+from src.browser import PROFILES
+
+
+def bench_profile(profile, server, searches):
+    from src.webscraper import WebScraper
+
+    scraper = WebScraper(profile=profile)
+    page_load, order_load = [], []
+    try:
+        for i in range(searches):
+            # Case numbers ending in 0 are "no record" on the replay server
+            scraper.search_and_extract_case('W.P.(C)', str(i * 10 + 1), '2024')
+            page_load.append(scraper.last_timings.get('page_load', 0))
+            scraper.get_order_data(f"{server.site}{fixtures.ORDER_PATH}/bench-{i}")
+            order_load.append(scraper.last_timings.get('order_page_load', 0))
+        stats = scraper.resource_stats()
+    finally:
+        scraper.close()
+
+    rss = stats['rss_bytes']
+    print(f"{profile:<8} page_load p50 {statistics.median(page_load) * 1000:8.1f} ms  "
+          f"order_page_load p50 {statistics.median(order_load) * 1000:8.1f} ms  "
+          f"{stats['bytes_transferred'] / max(stats['pages'], 1) / 1024:8.1f} KiB/page  "
+          f"rss {rss / 1024 / 1024 if rss is not None else float('nan'):7.1f} MiB")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=PROFILES)
+    arg_parser.add_argument('--searches', type=int, default=20)
+    arg_parser.add_argument('--latency', type=float, default=0.0, help='replay server latency per response, seconds')
+    args = arg_parser.parse_args()
+
+    server = ReplayServer(latency=args.latency, assets=True).start()
+    os.environ['WEBSITE_LINK'] = server.form_url
+    # With the form reused, page_load is ~0 after the first search and there is nothing to compare
+    os.environ['SCRAPER_REUSE_FORM'] = '0'
+    try:
+        for profile in args.profiles:
+            bench_profile(profile, server, args.searches)
+    finally:
+        server.shutdown()
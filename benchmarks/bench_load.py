@@ -0,0 +1,298 @@
+"""
+Throughput and latency percentiles against the local replay server.
+
+    python -m benchmarks.bench_load
+    python -m benchmarks.bench_load --targets search orders --engine selenium --concurrency 1 2 4
+    python -m benchmarks.bench_load --latency 0.3 --jitter 0.2 --json before.json
+    python -m benchmarks.bench_load --latency 0.3 --jitter 0.2 --compare before.json
+
+Targets:
+  search    WebScraper/HttpScraper.search_and_extract_case
+  orders    get_order_data on an order page with --rows rows
+  form      POST /form (a new case every request, so no cache hits)
+  order     POST /order for stored responses with --rows orders each
+  order-get         GET /order/<response_id>, compressed, no validator
+  order-revalidate  GET /order/<response_id> with the ETag of an earlier answer (304s)
+  download  GET /download of PDFs not cached yet
+  download-cached  GET /download of PDFs already in the cache
+
+Each target runs --requests requests at every --concurrency level. The Flask
+targets go through the real app served by werkzeug on a local port, with a
+throwaway SQLite database and cache directories. Nothing talks to the court
+website.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from benchmarks import fixtures
+from benchmarks.replay_server import ReplayServer
+
+SCRAPER_TARGETS = ('search', 'orders')
+APP_TARGETS = ('form', 'order', 'order-get', 'order-revalidate', 'download', 'download-cached')
+# Case numbers ending in 0 are "no record" on the replay server
+_case_numbers = (str(n) for n in itertools.count(1) if n % 10)
+_case_lock = threading.Lock()
+
+
+def next_case_no():
+    with _case_lock:
+        return next(_case_numbers)
+
+
+def percentile(ordered, q):
+    if not ordered:
+        return 0.0
+    index = min(int(round(q / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def run_load(fn, requests, concurrency):
+    """
+    Call fn(i) `requests` times from `concurrency` threads; fn returns False or
+    raises on failure. Returns throughput and latency percentiles.
+    """
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            ok = fn(i) is not False
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            errors += not ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(requests)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'concurrency': concurrency,
+        'requests': requests,
+        'errors': errors,
+        'throughput': round(requests / wall, 2),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 2),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p90_ms': round(percentile(latencies, 90) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2),
+    }
+
+
+def scraper_target(name, server, engine, rows, size):
+    """
+    fn(i) for a scraper target, plus the pool the calls check sessions out of.
+    """
+    from src.driver_pool import DriverPool
+    from src.engines import create_scraper
+
+    pool = DriverPool(size=size, factory=lambda: create_scraper(engine))
+
+    def search(i):
+        with pool.session() as wb:
+            result = wb.search_and_extract_case('W.P.(C)', next_case_no(), '2024')
+        return bool(result) and result[0]['case_title'] != "NA"
+
+    def orders(i):
+        with pool.session() as wb:
+            result = wb.get_order_data(f"{server.site}{fixtures.ORDER_PATH}/bench-{i}?rows={rows}")
+        return len(result) == rows
+
+    return {'search': search, 'orders': orders}[name], pool
+
+
+class AppHarness:
+    def __init__(self, server, rows, pdf_pages, workdir):
+        """
+        Import app.py against the replay server and serve it on a local port.
+        """
+        os.environ.update({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            'CATALOG_PATH': os.path.join(workdir, 'catalog.json'),
+            'PDF_CACHE_DIR': os.path.join(workdir, 'pdfs'),
+            'COALESCE_LOCK_DIR': os.path.join(workdir, 'locks'),
+        })
+        os.environ.pop('CACHE_SQLITE_PATH', None)
+
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import Session
+        from werkzeug.serving import make_server
+
+        from benchmarks.sqlite_schema import create_sqlite_schema
+        from src.http_session import build_session
+        from src.parser import parse_case_table, parse_order_table
+        from src.persistence import save_case_result
+
+        engine_db = create_engine(os.environ['SQLALCHEMY_DATABASE_URI'])
+        create_sqlite_schema(engine_db)
+
+        # Stored responses for /order
+        case = parse_case_table(fixtures.case_table(1))[0]
+        orders = parse_order_table(fixtures.page(fixtures.order_table(rows)))
+        with Session(engine_db) as session:
+            self.response_ids = [
+                save_case_result(session, {'case_no': str(n), 'case_type': 'W.P.(C)', 'year': '2024'}, case, orders)[1]
+                for n in range(1, 51)
+            ]
+
+        import app as flask_app
+
+        # werkzeug logs every request at INFO otherwise
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        self.httpd = make_server('127.0.0.1', 0, flask_app.app, threaded=True)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.httpd.server_port}"
+        self.server = server
+        self.pdf_pages = pdf_pages
+        self._local = threading.local()
+        self._build_session = build_session
+
+    @property
+    def http(self):
+        # One connection pool per load thread
+        if not hasattr(self._local, 'session'):
+            self._local.session = self._build_session(retries=0)
+        return self._local.session
+
+    def pdf_link(self, name):
+        return quote(f"{self.server.site}{fixtures.PDF_PATH}/{name}.pdf?pages={self.pdf_pages}", safe='')
+
+    def target(self, name):
+        def form(i):
+            response = self.http.post(self.base + '/form', json={
+                'case_type': 'W.P.(C)', 'case_no': next_case_no(), 'year': '2024',
+            }, timeout=120)
+            return response.status_code == 200 and bool(response.json())
+
+        def order(i):
+            response_id = self.response_ids[i % len(self.response_ids)]
+            response = self.http.post(self.base + '/order', json={'response_id': response_id}, timeout=120)
+            return response.status_code == 200
+
+        def order_get(i):
+            response_id = self.response_ids[i % len(self.response_ids)]
+            response = self.http.get(f"{self.base}/order/{response_id}", timeout=120)
+            return response.status_code == 200
+
+        etags = {}
+
+        def order_revalidate(i):
+            response_id = self.response_ids[i % len(self.response_ids)]
+            response = self.http.get(f"{self.base}/order/{response_id}",
+                                     headers={'If-None-Match': etags[response_id]}, timeout=120)
+            return response.status_code == 304
+
+        def download(i):
+            response = self.http.get(f"{self.base}/download?link={self.pdf_link(f'cold-{time.time_ns()}-{i}')}", timeout=120)
+            return response.status_code == 200 and response.content.startswith(b'%PDF')
+
+        def download_cached(i):
+            response = self.http.get(f"{self.base}/download?link={self.pdf_link(f'warm-{i % 20}')}", timeout=120)
+            return response.status_code == 200 and response.content.startswith(b'%PDF')
+
+        if name == 'download-cached':
+            for i in range(20):
+                download_cached(i)
+        if name == 'order-revalidate':
+            for response_id in self.response_ids:
+                etags[response_id] = self.http.get(f"{self.base}/order/{response_id}", timeout=120).headers['ETag']
+        return {
+            'form': form, 'order': order, 'order-get': order_get, 'order-revalidate': order_revalidate,
+            'download': download, 'download-cached': download_cached,
+        }[name]
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+def report(target, result, baseline=None):
+    line = (f"{target:<16} c={result['concurrency']:<3} {result['requests']:>5} req  {result['errors']:>4} err  "
+            f"{result['throughput']:>8.1f} req/s  p50 {result['p50_ms']:>8.1f}  p95 {result['p95_ms']:>8.1f}  "
+            f"p99 {result['p99_ms']:>8.1f} ms")
+    if baseline:
+        def delta(key):
+            before = baseline[key]
+            return f"{(result[key] - before) / before * 100:+.0f}%" if before else "n/a"
+        line += f"  |  vs baseline: req/s {delta('throughput')}  p50 {delta('p50_ms')}  p95 {delta('p95_ms')}"
+    print(line)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument('--targets', nargs='+', default=list(SCRAPER_TARGETS + APP_TARGETS),
+                            choices=SCRAPER_TARGETS + APP_TARGETS)
+    arg_parser.add_argument('--engine', choices=('selenium', 'http'), default='http')
+    arg_parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    arg_parser.add_argument('--requests', type=int, default=100, help='requests per target and concurrency level')
+    arg_parser.add_argument('--rows', type=int, default=100, help='order table rows (1-1000)')
+    arg_parser.add_argument('--pdf-pages', type=int, default=20)
+    arg_parser.add_argument('--latency', type=float, default=0.0, help='replay server latency per response, seconds')
+    arg_parser.add_argument('--jitter', type=float, default=0.0)
+    arg_parser.add_argument('--error-rate', type=float, default=0.0)
+    arg_parser.add_argument('--json', help='write the results here')
+    arg_parser.add_argument('--compare', help='results file from an earlier run to diff against')
+    args = arg_parser.parse_args()
+
+    server = ReplayServer(
+        order_rows=args.rows, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, pdf_pages=args.pdf_pages,
+    ).start()
+    os.environ.update({
+        'WEBSITE_LINK': server.form_url,
+        'SCRAPER_ENGINE': args.engine,
+        'HTTP_FALLBACK': 'selenium' if args.engine == 'selenium' else 'none',
+        'DRIVER_POOL_SIZE': str(max(args.concurrency)),
+    })
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {(r['target'], r['concurrency']): r for r in json.load(f)}
+
+    results = []
+    workdir = tempfile.mkdtemp(prefix='court-bench-')
+    harness = None
+    try:
+        for target in args.targets:
+            pool = None
+            if target in SCRAPER_TARGETS:
+                fn, pool = scraper_target(target, server, args.engine, args.rows, max(args.concurrency))
+            else:
+                harness = harness or AppHarness(server, args.rows, args.pdf_pages, workdir)
+                fn = harness.target(target)
+            try:
+                for concurrency in args.concurrency:
+                    result = {'target': target, **run_load(fn, args.requests, concurrency)}
+                    results.append(result)
+                    report(target, result, baseline.get((target, concurrency)))
+            finally:
+                if pool is not None:
+                    pool.close()
+    finally:
+        if harness is not None:
+            harness.close()
+        server.shutdown()
+
+    print(f"Upstream requests: {dict(server.requests)}", file=sys.stderr)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
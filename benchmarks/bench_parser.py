@@ -0,0 +1,96 @@
+"""
+Compare the WebDriver cell-by-cell path with single-pass HTML parsing.
+
+    python -m benchmarks.bench_parser --rows 1 50 500
+
+Both paths read the same synthetic page loaded in headless Chrome from a
+local file, so the difference is the WebDriver round-trips. Pass
+--offline to time only the HTML parser (no Chrome needed).
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from selenium.webdriver.common.by import By
+
+from benchmarks import fixtures
+from src.parser import parse_case_table, parse_order_table
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_offline(rows, repeat):
+    case_html = fixtures.case_table(rows)
+    order_html = fixtures.page(fixtures.order_table(rows))
+    case_time, cases = timed(lambda: parse_case_table(case_html), repeat)
+    order_time, orders = timed(lambda: parse_order_table(order_html), repeat)
+    print(f"{rows:>5} rows  html case table {case_time * 1000:8.2f} ms  "
+          f"order table {order_time * 1000:8.2f} ms  ({len(cases)}/{len(orders)} rows)")
+
+
+def bench_driver(scraper, rows, repeat):
+    driver = scraper.driver
+    with tempfile.TemporaryDirectory() as tmp:
+        case_path = os.path.join(tmp, 'case.html')
+        order_path = os.path.join(tmp, 'order.html')
+        with open(case_path, 'w') as f:
+            f.write(fixtures.page(fixtures.case_table(rows)))
+        with open(order_path, 'w') as f:
+            f.write(fixtures.page(fixtures.order_table(rows)))
+
+        driver.get('file://' + case_path)
+        wd_case, wd_cases = timed(
+            lambda: scraper._parse_case_rows(driver.find_elements(By.CSS_SELECTOR, '#caseTable tbody tr')),
+            repeat,
+        )
+        html_case, html_cases = timed(
+            lambda: parse_case_table(
+                driver.find_element(By.ID, 'caseTable').get_attribute('outerHTML'),
+                base_url=driver.current_url,
+            ),
+            repeat,
+        )
+
+        driver.get('file://' + order_path)
+        wd_order, wd_orders = timed(
+            lambda: scraper._parse_order_rows(driver.find_element(By.TAG_NAME, 'tbody')),
+            repeat,
+        )
+        html_order, html_orders = timed(
+            lambda: parse_order_table(driver.page_source, base_url=driver.current_url),
+            repeat,
+        )
+
+    same = wd_cases == html_cases and wd_orders == html_orders
+    print(f"{rows:>5} rows  case: webdriver {wd_case * 1000:9.1f} ms  html {html_case * 1000:7.1f} ms  |  "
+          f"orders: webdriver {wd_order * 1000:9.1f} ms  html {html_order * 1000:7.1f} ms  |  "
+          f"identical output: {same}")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument('--rows', type=int, nargs='+', default=[1, 10, 50, 200])
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    arg_parser.add_argument('--offline', action='store_true')
+    args = arg_parser.parse_args()
+
+    if args.offline:
+        for n in args.rows:
+            bench_offline(n, args.repeat)
+    else:
+        from src.webscraper import WebScraper
+
+        scraper = WebScraper()
+        try:
+            for n in args.rows:
+                bench_driver(scraper, n, args.repeat)
+        finally:
+            scraper.close()
@@ -0,0 +1,82 @@
+"""
+Write latency per stored case: the old three-commit, row-by-row inserts
+against save_case_result's single transaction.
+
+    python -m benchmarks.bench_persistence --url sqlite:////tmp/bench.db
+    python -m benchmarks.bench_persistence --url mysql+pymysql://user:pw@localhost/QueryHistory
+
+MySQL runs expect the tables from db.sql; SQLite tables are created here.
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from benchmarks import fixtures
+from benchmarks.sqlite_schema import create_sqlite_schema
+from src.models import OrderEntry
+from src.parser import parse_case_table, parse_order_table
+from src.persistence import INSERT_ORDER, INSERT_QUERY, INSERT_RESPONSE, save_case_result
+
+
+def save_row_by_row(session, query, case, orders, last_id_sql):
+    """
+    The previous /form write path: three commits, one INSERT per order row.
+    """
+    session.execute(INSERT_QUERY, query)
+    session.commit()
+    query_id = session.execute(text(last_id_sql)).scalar()
+
+    session.execute(INSERT_RESPONSE, case.bind_params(query_id=query_id, checked_at=datetime.now()))
+    session.commit()
+    response_id = session.execute(text(last_id_sql)).scalar()
+
+    for order in orders:
+        session.execute(INSERT_ORDER, OrderEntry.coerce(order).bind_params(response_id=response_id))
+    session.commit()
+    return query_id, response_id
+
+
+def bench(engine, rows, cases, last_id_sql):
+    query = {'case_no': '985', 'case_type': 'W.P.(CRL)', 'year': '2024'}
+    case = parse_case_table(fixtures.case_table(1))[0]
+    orders = parse_order_table(fixtures.page(fixtures.order_table(rows)))
+
+    results = {}
+    for name, fn in (
+        ('row-by-row', lambda s: save_row_by_row(s, query, case, orders, last_id_sql)),
+        ('single txn', lambda s: save_case_result(s, query, case, orders)),
+    ):
+        timings = []
+        with Session(engine) as session:
+            for _ in range(cases):
+                start = time.perf_counter()
+                fn(session)
+                timings.append(time.perf_counter() - start)
+        results[name] = timings
+
+    for name, timings in results.items():
+        timings.sort()
+        print(f"{rows:>4} orders  {name:<11} p50 {statistics.median(timings) * 1000:8.2f} ms  "
+              f"p95 {timings[int(len(timings) * 0.95) - 1] * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument('--url', default='sqlite:////tmp/court_bench.db')
+    arg_parser.add_argument('--rows', type=int, nargs='+', default=[10, 500])
+    arg_parser.add_argument('--cases', type=int, default=50)
+    args = arg_parser.parse_args()
+
+    engine = create_engine(args.url)
+    if engine.dialect.name == 'sqlite':
+        create_sqlite_schema(engine)
+        last_id_sql = "SELECT last_insert_rowid()"
+    else:
+        last_id_sql = "SELECT LAST_INSERT_ID()"
+
+    for n in args.rows:
+        bench(engine, n, args.cases, last_id_sql)
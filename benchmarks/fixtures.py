@@ -0,0 +1,147 @@
+"""
+Synthetic pages laid out like the Delhi High Court case status and order
+pages, for offline parsing and benchmarks.
+"""
+
+SITE = "https://delhihighcourt.nic.in"
+ORDER_PATH = "/app/case-type-status-details"
+PDF_PATH = "/app/showlogo"
+ASSET_PATH = "/assets"
+
+# What a real page pulls in besides its markup: a stylesheet with a web font,
+# images and an analytics script (name: (content type, size in bytes))
+ASSETS = {
+    'site.css': ('text/css', 60_000),
+    'body.woff2': ('font/woff2', 120_000),
+    'banner.jpg': ('image/jpeg', 300_000),
+    'logo.png': ('image/png', 40_000),
+    'analytics.js': ('application/javascript', 80_000),
+}
+ASSET_TAGS = f"""
+<link rel="stylesheet" href="{ASSET_PATH}/site.css">
+<script async src="{ASSET_PATH}/analytics.js"></script>"""
+ASSET_IMAGES = f'<img src="{ASSET_PATH}/banner.jpg" alt=""><img src="{ASSET_PATH}/logo.png" alt="">'
+
+
+def case_row(i, case_type="W.P.(CRL)", case_no="985", year="2024", site=SITE):
+    return f"""
+      <tr>
+        <td>{i}</td>
+        <td>
+          <a href="javascript:void(0)">{case_type} - {case_no} / {year}</a><br>
+          <font color="green">[DISPOSED]</font><br>
+          <a href="{site}{ORDER_PATH}/{case_no}-{year}-{i}"><strong>Orders</strong></a>
+        </td>
+        <td>PETITIONER NAME {i}&nbsp;<br>VS.<br>STATE OF NCT OF DELHI {i}</td>
+        <td>NEXT DATE: NA<br>Last Date: 12/08/2025<br>COURT NO: {i % 40 + 1}</td>
+      </tr>"""
+
+
+def case_table(rows=1, site=SITE, **case):
+    if rows == 0:
+        body = '<tr class="odd"><td valign="top" colspan="4" class="dataTables_empty">No data available in table</td></tr>'
+    else:
+        body = ''.join(case_row(i + 1, site=site, **case) for i in range(rows))
+    return f"""
+    <table id="caseTable" class="display">
+      <thead><tr><th>S.No.</th><th>Case</th><th>Party</th><th>Listing</th></tr></thead>
+      <tbody>{body}</tbody>
+    </table>"""
+
+
+def order_row(i, site=SITE):
+    corrigendum = f'<a href="{site}{PDF_PATH}/corr-{i}.pdf">Corrigendum</a>' if i % 10 == 0 else ''
+    hindi = f'<a href="{site}{PDF_PATH}/hindi-{i}.pdf">Hindi</a>' if i % 7 == 0 else ''
+    return f"""
+      <tr>
+        <td>{i}</td>
+        <td><a href="{site}{PDF_PATH}/order-{i}.pdf" target="_blank">W.P.(CRL) 985/2024</a></td>
+        <td>{(i % 28) + 1:02d}/{(i % 12) + 1:02d}/2024</td>
+        <td>{corrigendum}</td>
+        <td>{hindi}</td>
+      </tr>"""
+
+
+def order_table(rows=10, site=SITE):
+    body = ''.join(order_row(i + 1, site=site) for i in range(rows))
+    return f"""
+    <table class="table">
+      <thead><tr><th>S.No.</th><th>Order</th><th>Date</th><th>Corrigendum</th><th>Hindi</th></tr></thead>
+      <tbody>{body}</tbody>
+    </table>"""
+
+
+def case_status_form(captcha, case_types=("W.P.(CRL)", "W.P.(C)", "CRL.A."), years=range(2025, 1950, -1), token="stub-token"):
+    type_options = ''.join(f'<option value="{t}">{t}</option>' for t in case_types)
+    year_options = ''.join(f'<option value="{y}">{y}</option>' for y in years)
+    return f"""
+    <form id="search-form" method="POST" action="/app/get-case-type-status">
+      <input type="hidden" name="_token" value="{token}">
+      <select id="case_type" name="case_type"><option value="">Select</option>{type_options}</select>
+      <select id="case_year" name="case_year">{year_options}</select>
+      <input type="text" id="case_number" name="case_number">
+      <span id="captcha-code">{captcha}</span>
+      <input type="text" id="captchaInput" name="captcha">
+      <button id="search" type="submit">Submit</button>
+    </form>"""
+
+
+def page(content, title="Delhi High Court", assets=False):
+    head, images = (ASSET_TAGS, ASSET_IMAGES) if assets else ('', '')
+    return f"""<!DOCTYPE html>
+<html><head><title>{title}</title>{head}</head>
+<body>{images}{content}</body></html>"""
+
+
+def asset(name):
+    """
+    (content type, body) of one of ASSETS, padded to its size.
+    """
+    content_type, size = ASSETS[name]
+    if name == 'site.css':
+        body = f"@font-face {{ font-family: body; src: url({ASSET_PATH}/body.woff2); }}\nbody {{ font-family: body; }}\n"
+    elif name == 'analytics.js':
+        body = "window.dataLayer = window.dataLayer || [];\n"
+    else:
+        body = ""
+    body = body.encode()
+    return content_type, body + b' ' * max(size - len(body), 0)
+
+
+def pdf_document(pages=1, title="W.P.(CRL) 985/2024", lines_per_page=40):
+    """
+    A small but valid PDF with one text stream per page, like a typed order.
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for n in range(1, pages + 1):
+        lines = [f"IN THE HIGH COURT OF DELHI AT NEW DELHI - {title} - page {n}"] + [
+            f"{i}. The petitioner relies on Section {100 + (n * lines_per_page + i) % 400} of the Code of Criminal Procedure."
+            for i in range(1, lines_per_page)
+        ]
+        escaped = (line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') for line in lines)
+        text = "BT /F1 9 Tf 40 800 Td 11 TL " + " ".join(f"({line}) '" for line in escaped) + " ET"
+        stream = text.encode('latin-1')
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
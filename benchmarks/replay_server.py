@@ -0,0 +1,204 @@
+"""
+Local stand-in for the court website.
+
+    python -m benchmarks.replay_server --port 8800 [--recordings DIR]
+    python -m benchmarks.replay_server --latency 0.5 --jitter 0.2 --error-rate 0.1
+
+Serves the case status form (with a captcha in a <span>), search results,
+order pages (?rows=1..1000) and order PDFs (?pages=N) built from
+benchmarks/fixtures.py. With --assets every page also links a stylesheet,
+web font, images and an analytics script, like the real site does. Files in --recordings named
+"<METHOD> <path with / replaced by _>" (e.g. "GET _app_get-case-type-status")
+are replayed verbatim instead, so a captured session can be served back.
+Point WEBSITE_LINK at http://127.0.0.1:<port>/app/get-case-type-status.
+
+Every response can be delayed by --latency seconds (plus up to --jitter),
+and a share of requests (--error-rate) fails with --error-status, or with a
+dropped connection when the status is 0. The attributes of the same names
+can be changed on a running server.
+"""
+import argparse
+import os
+import random
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks import fixtures
+
+FORM_PATH = "/app/get-case-type-status"
+MAX_ORDER_ROWS = 1000
+
+
+@lru_cache(maxsize=32)
+def pdf_body(pages):
+    return fixtures.pdf_document(pages)
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    server_version = "ReplayServer/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if method == 'POST':
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length).decode() if length else ''
+            params.update({k: v[0] for k, v in parse_qs(body).items()})
+
+        self.server.count(method, url.path)
+        if self.server.latency or self.server.jitter:
+            time.sleep(self.server.latency + random.uniform(0, self.server.jitter))
+        if self.server.error_rate and random.random() < self.server.error_rate:
+            return self._fail()
+
+        recorded = self.server.recording(method, url.path)
+        if recorded is not None:
+            content_type = 'application/pdf' if url.path.endswith('.pdf') else 'text/html; charset=utf-8'
+            return self._send(200, recorded, content_type)
+
+        if url.path == FORM_PATH and 'case_number' not in params:
+            return self._send(200, self._page(fixtures.case_status_form(self.server.issue_captcha())))
+        if url.path == FORM_PATH:
+            return self._search(params)
+        if url.path.startswith(fixtures.ORDER_PATH + '/'):
+            rows = min(max(int(params.get('rows', self.server.order_rows)), 1), MAX_ORDER_ROWS)
+            return self._send(200, self._page(fixtures.order_table(rows, site=self.server.site)))
+        if url.path.startswith(fixtures.PDF_PATH + '/'):
+            pages = int(params.get('pages', self.server.pdf_pages))
+            return self._send(200, pdf_body(pages), 'application/pdf')
+        if url.path.startswith(fixtures.ASSET_PATH + '/') and url.path.rsplit('/', 1)[1] in fixtures.ASSETS:
+            content_type, body = fixtures.asset(url.path.rsplit('/', 1)[1])
+            return self._send(200, body, content_type)
+        self._send(404, fixtures.page('Not found'))
+
+    def _search(self, params):
+        if not self.server.check_captcha(params.get('captcha', '')):
+            return self._send(200, self._page(fixtures.case_status_form(self.server.issue_captcha()) + fixtures.case_table(0)))
+
+        case = {
+            'case_type': params.get('case_type', ''),
+            'case_no': params.get('case_number', ''),
+            'year': params.get('case_year', ''),
+        }
+        # Case numbers ending in 0 have no record, to exercise the empty path
+        rows = 0 if case['case_no'].endswith('0') else 1
+        table = fixtures.case_table(rows, site=self.server.site, **case)
+        self._send(200, self._page(fixtures.case_status_form(self.server.issue_captcha()) + table))
+
+    def _page(self, content):
+        return fixtures.page(content, assets=self.server.assets)
+
+    def _fail(self):
+        if self.server.error_status == 0:
+            # Connection reset without a response, like an overloaded upstream
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return
+        self._send(self.server.error_status, fixtures.page('Service Unavailable'))
+
+    def _send(self, status, body, content_type='text/html; charset=utf-8'):
+        if isinstance(body, str):
+            body = body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, recordings=None, order_rows=10, verbose=False, latency=0.0, jitter=0.0,
+                 error_rate=0.0, error_status=503, pdf_pages=2, assets=False):
+        super().__init__(('127.0.0.1', port), ReplayHandler)
+        self.site = f"http://127.0.0.1:{self.server_address[1]}"
+        self.recordings = recordings
+        self.order_rows = order_rows
+        self.verbose = verbose
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.pdf_pages = pdf_pages
+        self.assets = assets
+        self.requests = Counter()
+        self._captchas = set()
+        self._lock = threading.Lock()
+
+    @property
+    def form_url(self):
+        return self.site + FORM_PATH
+
+    def issue_captcha(self):
+        code = str(random.randint(1000, 9999))
+        with self._lock:
+            self._captchas.add(code)
+        return code
+
+    def check_captcha(self, code):
+        with self._lock:
+            if code in self._captchas:
+                self._captchas.discard(code)
+                return True
+        return False
+
+    def count(self, method, path):
+        """
+        Tally requests per page kind, for checking how often a client went upstream.
+        """
+        kind = next((prefix for prefix in (FORM_PATH, fixtures.ORDER_PATH, fixtures.PDF_PATH, fixtures.ASSET_PATH) if path.startswith(prefix)), path)
+        with self._lock:
+            self.requests[f"{method} {kind}"] += 1
+
+    def recording(self, method, path):
+        if not self.recordings:
+            return None
+        name = f"{method} {path.replace('/', '_')}"
+        file_path = os.path.join(self.recordings, name)
+        if not os.path.isfile(file_path):
+            return None
+        with open(file_path, 'rb') as f:
+            return f.read()
+
+    def start(self):
+        """
+        Serve from a daemon thread; returns the server for chaining.
+        """
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument('--port', type=int, default=8800)
+    arg_parser.add_argument('--recordings')
+    arg_parser.add_argument('--order-rows', type=int, default=10)
+    arg_parser.add_argument('--pdf-pages', type=int, default=2)
+    arg_parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    arg_parser.add_argument('--jitter', type=float, default=0.0, help='up to this many extra seconds, uniformly')
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests that fail')
+    arg_parser.add_argument('--error-status', type=int, default=503, help='status for failed requests; 0 drops the connection')
+    arg_parser.add_argument('--assets', action='store_true', help='link stylesheet, font, image and analytics assets from every page')
+    args = arg_parser.parse_args()
+
+    server = ReplayServer(
+        args.port, args.recordings, args.order_rows, verbose=True, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, error_status=args.error_status, pdf_pages=args.pdf_pages, assets=args.assets,
+    )
+    print(f"Serving {server.form_url}")
+    server.serve_forever()
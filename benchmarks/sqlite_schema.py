@@ -0,0 +1,53 @@
+"""
+SQLite translation of db.sql, for benchmarks and local runs without MySQL.
+"""
+from sqlalchemy import text
+
+SQLITE_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS Query (
+        query_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        case_type VARCHAR(255), case_no VARCHAR(255), year VARCHAR(255))""",
+    "CREATE INDEX IF NOT EXISTS idx_query_case ON Query (case_type, case_no, year)",
+    """CREATE TABLE IF NOT EXISTS Responses (
+        response_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        query_id INT REFERENCES Query(query_id) ON DELETE CASCADE,
+        case_title VARCHAR(500), status VARCHAR(255), petitioner VARCHAR(500), respondent VARCHAR(500),
+        next_date DATE, last_date DATE, court_no VARCHAR(100), order_link TEXT,
+        checked_at DATETIME NULL, version INT NOT NULL DEFAULT 1)""",
+    "CREATE INDEX IF NOT EXISTS idx_responses_query ON Responses (query_id)",
+    "CREATE INDEX IF NOT EXISTS idx_responses_next_date ON Responses (next_date, response_id)",
+    "CREATE INDEX IF NOT EXISTS idx_responses_court ON Responses (court_no)",
+    # Stands in for MySQL's FULLTEXT index; kept in sync by the triggers below
+    """CREATE VIRTUAL TABLE IF NOT EXISTS responses_fts USING fts5(
+        case_title, petitioner, respondent, content='Responses', content_rowid='response_id')""",
+    """CREATE TRIGGER IF NOT EXISTS responses_fts_insert AFTER INSERT ON Responses BEGIN
+        INSERT INTO responses_fts (rowid, case_title, petitioner, respondent)
+        VALUES (new.response_id, new.case_title, new.petitioner, new.respondent);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS responses_fts_delete AFTER DELETE ON Responses BEGIN
+        INSERT INTO responses_fts (responses_fts, rowid, case_title, petitioner, respondent)
+        VALUES ('delete', old.response_id, old.case_title, old.petitioner, old.respondent);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS responses_fts_update AFTER UPDATE OF case_title, petitioner, respondent ON Responses BEGIN
+        INSERT INTO responses_fts (responses_fts, rowid, case_title, petitioner, respondent)
+        VALUES ('delete', old.response_id, old.case_title, old.petitioner, old.respondent);
+        INSERT INTO responses_fts (rowid, case_title, petitioner, respondent)
+        VALUES (new.response_id, new.case_title, new.petitioner, new.respondent);
+    END""",
+    """CREATE TABLE IF NOT EXISTS OrderDetails (
+        order_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        response_id INT NOT NULL REFERENCES Responses(response_id) ON DELETE CASCADE,
+        sr_no INT, order_link TEXT, order_date DATE, corrigendum_link TEXT, hindi_order TEXT)""",
+    "CREATE INDEX IF NOT EXISTS idx_orders_response ON OrderDetails (response_id, sr_no)",
+    """CREATE TABLE IF NOT EXISTS CaseEvents (
+        event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        response_id INT NOT NULL REFERENCES Responses(response_id) ON DELETE CASCADE,
+        field VARCHAR(50), old_value TEXT, new_value TEXT, detected_at DATETIME DEFAULT CURRENT_TIMESTAMP)""",
+    "CREATE INDEX IF NOT EXISTS idx_events_response ON CaseEvents (response_id, detected_at)",
+]
+
+
+def create_sqlite_schema(engine):
+    with engine.begin() as conn:
+        for statement in SQLITE_SCHEMA:
+            conn.execute(text(statement))
@@ -9,7 +9,8 @@ CREATE TABLE IF NOT EXISTS Query (
     query_id INT AUTO_INCREMENT PRIMARY KEY,
     case_type VARCHAR(255),
     case_no VARCHAR(255),
-    year VARCHAR(255)
+    year VARCHAR(255),
+    INDEX idx_query_case (case_type, case_no, year)
 );
 
 -- Create Table2: Responses
@@ -24,5 +25,47 @@ CREATE TABLE IF NOT EXISTS Responses (
     last_date DATE,
     court_no VARCHAR(100),
     order_link TEXT,
+    checked_at DATETIME NULL,
+    version INT NOT NULL DEFAULT 1,
+    INDEX idx_responses_query (query_id),
+    INDEX idx_responses_next_date (next_date, response_id),
+    INDEX idx_responses_court (court_no),
+    FULLTEXT INDEX ft_responses_parties (case_title, petitioner, respondent),
     FOREIGN KEY (query_id) REFERENCES Query(query_id) ON DELETE CASCADE
 );
+
+-- Create Table3: OrderDetails
+CREATE TABLE IF NOT EXISTS OrderDetails (
+    order_id INT AUTO_INCREMENT PRIMARY KEY,
+    response_id INT NOT NULL,
+    sr_no INT,
+    order_link TEXT,
+    order_date DATE,
+    corrigendum_link TEXT,
+    hindi_order TEXT,
+    INDEX idx_orders_response (response_id, sr_no),
+    FOREIGN KEY (response_id) REFERENCES Responses(response_id) ON DELETE CASCADE
+);
+
+-- Create Table4: CaseEvents (changes found when re-checking stored cases)
+CREATE TABLE IF NOT EXISTS CaseEvents (
+    event_id INT AUTO_INCREMENT PRIMARY KEY,
+    response_id INT NOT NULL,
+    field VARCHAR(50),
+    old_value TEXT,
+    new_value TEXT,
+    detected_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_events_response (response_id, detected_at),
+    FOREIGN KEY (response_id) REFERENCES Responses(response_id) ON DELETE CASCADE
+);
+
+-- Databases created before the indexes were added:
+-- ALTER TABLE Query ADD INDEX idx_query_case (case_type, case_no, year);
+-- ALTER TABLE Responses ADD INDEX idx_responses_query (query_id);
+-- ALTER TABLE Responses
+--     ADD COLUMN checked_at DATETIME NULL,
+--     ADD COLUMN version INT NOT NULL DEFAULT 1;
+-- ALTER TABLE Responses
+--     ADD INDEX idx_responses_next_date (next_date, response_id),
+--     ADD INDEX idx_responses_court (court_no),
+--     ADD FULLTEXT INDEX ft_responses_parties (case_title, petitioner, respondent);
@@ -2,15 +2,12 @@ from selenium import webdriver
 from selenium.webdriver.support.ui import Select
 from selenium.webdriver.common.by import By
 import time
-from selenium.webdriver.chrome.options import Options
+from src.batch import BatchRunner
+from src.browser import apply_profile, chrome_options
 
 
-# Set up Chrome options
-options = Options()
-options.add_argument('--headless')  # Run in headless mode
-options.add_argument('--disable-gpu')  # Optional: helps in Windows
-options.add_argument('--no-sandbox')  # Optional: for Linux
-options.add_argument('--window-size=1920,1080')  # Optional: for full rendering
+# Set up Chrome options (BROWSER_PROFILE=lean blocks images, fonts and analytics)
+options = chrome_options()
 
 def search_and_extract_case(case_type_input, case_no_input, case_year_input):
     """
@@ -27,6 +24,7 @@ def search_and_extract_case(case_type_input, case_no_input, case_year_input):
     
     # Initialize driver
     driver = webdriver.Chrome(options=options)
+    apply_profile(driver)
     driver.get('https://delhihighcourt.nic.in/app/get-case-type-status')  
     driver.implicitly_wait(30)
 
@@ -158,35 +156,37 @@ def search_and_extract_case(case_type_input, case_no_input, case_year_input):
         # Close driver
         driver.quit()
 
-def search_multiple_cases(cases_list):
+def search_multiple_cases(cases_list, workers=2):
     """
     Search for multiple cases
     
     Args:
         cases_list: List of dictionaries with keys: case_type, case_number, case_year
+        workers: Number of cases looked up at the same time
     
     Returns:
         Dictionary with results for each case
     """
-    all_results = {}
-    
-    for i, case in enumerate(cases_list):
-        print(f"Searching case {i+1}/{len(cases_list)}: {case}")
-        
-        case_key = f"{case['case_type']} - {case['case_number']}/{case['case_year']}"
-        result = search_and_extract_case(
-            case['case_type'], 
-            case['case_number'], 
-            case['case_year']
-        )
-        
-        all_results[case_key] = result
-        
-        # Add delay between searches
-        if i < len(cases_list) - 1:
-            time.sleep(3)
-    
-    return all_results
+    # Concurrent, rate limited lookups instead of one by one with a fixed sleep
+    # search_and_extract_case returns [] for "no records" too, so retry only once
+    runner = BatchRunner(workers=workers, retries=1, factory=CaseSearch)
+    return {record['key']: record['result'] for record in runner.run(cases_list)}
+
+
+class CaseSearch:
+    """
+    Adapts search_and_extract_case to the scraper interface BatchRunner expects.
+    """
+    last_timings = {}
+
+    def search_and_extract_case(self, case_type_input, case_no_input, case_year_input):
+        return search_and_extract_case(case_type_input, case_no_input, case_year_input)
+
+    def is_alive(self):
+        return True
+
+    def close(self):
+        pass
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,211 @@
+"""
+Concurrent batch lookups.
+
+    python -m src.batch cases.csv --out results.jsonl --workers 4 --rate 1
+
+Cases are read from CSV or JSONL with case_type, case_number (or case_no)
+and case_year (or year) fields. Results are appended to --out as each case
+finishes, and an interrupted run resumes by skipping cases already there.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from dotenv import load_dotenv
+
+from src.driver_pool import DriverPool
+from src.engines import create_scraper
+from src.logs import configure_logging
+from src.models import dumps
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    def __init__(self, rate=None, burst=1):
+        """
+        Token bucket shared by all workers: at most `rate` acquisitions per second.
+        """
+        self.rate = float(rate or os.getenv('BATCH_RATE', 1.0))
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+def case_key(case):
+    return f"{case['case_type']} - {case['case_number']}/{case['case_year']}"
+
+
+def normalise_case(record):
+    """
+    Accept the field names used by the CSV/JSONL inputs and by /form.
+    """
+    return {
+        'case_type': str(record.get('case_type', '')).strip(),
+        'case_number': str(record.get('case_number') or record.get('case_no') or '').strip(),
+        'case_year': str(record.get('case_year') or record.get('year') or '').strip(),
+    }
+
+
+class BatchRunner:
+    def __init__(self, workers=None, rate=None, retries=None, backoff=None, checkpoint=None,
+                 with_orders=False, factory=create_scraper):
+        """
+        Fan case lookups out over `workers` scraper sessions.
+
+        All workers share one rate limiter toward the court site. Failed
+        lookups are retried with exponential backoff; finished cases are
+        appended to `checkpoint` (JSONL) and skipped when the batch is rerun.
+        """
+        self.workers = int(workers or os.getenv('BATCH_WORKERS', 2))
+        self.retries = int(retries if retries is not None else os.getenv('BATCH_RETRIES', 3))
+        self.backoff = float(backoff or os.getenv('BATCH_BACKOFF', 2.0))
+        self.checkpoint = checkpoint
+        self.with_orders = with_orders
+        self.limiter = RateLimiter(rate)
+        self.pool = DriverPool(size=self.workers, factory=factory)
+
+        self._checkpoint_lock = threading.Lock()
+
+    def run(self, cases):
+        """
+        Yield one record per case as soon as it finishes (completion order).
+        """
+        done = self._completed_keys()
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='batch') as executor:
+                pending = set()
+                for case in cases:
+                    case = normalise_case(case)
+                    if case_key(case) in done:
+                        continue
+                    # Keep a small window in flight so huge inputs aren't all queued at once
+                    if len(pending) >= self.workers * 2:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        yield from self._collect(finished)
+                    pending.add(executor.submit(self._lookup, case))
+
+                while pending:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from self._collect(finished)
+        finally:
+            self.pool.close()
+
+    def _collect(self, futures):
+        for future in futures:
+            record = future.result()
+            self._save(record)
+            yield record
+
+    def _lookup(self, case):
+        record = {'key': case_key(case), 'case': case, 'result': [], 'attempts': 0, 'error': None}
+
+        for attempt in range(self.retries + 1):
+            record['attempts'] = attempt + 1
+            self.limiter.acquire()
+            try:
+                with self.pool.session() as wb:
+                    result = wb.search_and_extract_case(case['case_type'], case['case_number'], case['case_year'])
+                    if result and self.with_orders and result[0].get('order_link') not in (None, "NA"):
+                        self.limiter.acquire()
+                        record['orders'] = wb.get_order_data(result[0]['order_link'])
+                # The scrapers return [] on errors and a placeholder row for "no record".
+                # Raised outside the session: the browser is fine, it shouldn't be recycled
+                if not result:
+                    raise RuntimeError("Empty result from scraper")
+                record['result'] = result
+                record['error'] = None
+                return record
+            except Exception as e:
+                record['error'] = str(e)
+                if attempt < self.retries:
+                    delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+                    logger.warning("Attempt %d failed (%s), retrying in %.1fs", attempt + 1, e, delay, extra={'case': record['key']})
+                    time.sleep(delay)
+
+        return record
+
+    def _completed_keys(self):
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return set()
+        keys = set()
+        with open(self.checkpoint) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Partial line from an interrupted write
+                    continue
+                if not record.get('error'):
+                    keys.add(record['key'])
+        return keys
+
+    def _save(self, record):
+        if not self.checkpoint:
+            return
+        with self._checkpoint_lock:
+            with open(self.checkpoint, 'a') as f:
+                f.write(dumps(record) + '\n')
+
+
+def read_cases(path):
+    """
+    Read cases from a .csv or .jsonl file.
+    """
+    with open(path, newline='') as f:
+        if path.endswith('.csv'):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument('cases', help='CSV or JSONL file of cases')
+    arg_parser.add_argument('--out', required=True, help='JSONL results file, also used to resume')
+    arg_parser.add_argument('--workers', type=int)
+    arg_parser.add_argument('--rate', type=float, help='lookups per second across all workers')
+    arg_parser.add_argument('--retries', type=int)
+    arg_parser.add_argument('--orders', action='store_true', help='also fetch each case\'s order list')
+    arg_parser.add_argument('--engine', choices=('selenium', 'http'))
+    args = arg_parser.parse_args()
+    configure_logging()
+
+    runner = BatchRunner(
+        workers=args.workers,
+        rate=args.rate,
+        retries=args.retries,
+        checkpoint=args.out,
+        with_orders=args.orders,
+        factory=lambda: create_scraper(args.engine),
+    )
+    failed = 0
+    for count, record in enumerate(runner.run(read_cases(args.cases)), start=1):
+        failed += bool(record['error'])
+        status = 'failed: ' + record['error'] if record['error'] else f"{len(record['result'])} row(s)"
+        print(f"[{count}] {record['key']}: {status}")
+    sys.exit(1 if failed else 0)
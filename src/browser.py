@@ -0,0 +1,151 @@
+"""
+Chrome options and per-session resource accounting for the Selenium scrapers.
+
+BROWSER_PROFILE picks the profile:
+
+- "default" (default): the plain headless setup.
+- "lean" (opt-in): images, fonts, stylesheets and analytics are blocked
+  through CDP Network.setBlockedURLs, pages are handed over at
+  DOMContentLoaded ("eager" page-load strategy), and the disk cache
+  (BROWSER_DISK_CACHE_MB) and renderer JS heap (BROWSER_JS_HEAP_MB) are capped.
+  Compare the two with benchmarks/bench_browser.py against the live form
+  before switching.
+
+BROWSER_BLOCKED_URLS adds comma-separated URL patterns to the lean block list.
+"""
+import os
+
+from dotenv import load_dotenv
+from selenium.webdriver.chrome.options import Options
+
+from src.metrics import REGISTRY, Histogram
+
+load_dotenv()
+
+PROFILES = ('default', 'lean')
+
+# Network.setBlockedURLs patterns; `*` matches any run of characters
+BLOCKED_URLS = (
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.bmp',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.css', '*.css?*',
+    '*.mp4', '*.webm', '*.mp3',
+    '*google-analytics.com*', '*googletagmanager.com*', '*/gtag/js*', '*analytics.js*',
+    '*doubleclick.net*', '*facebook.net*', '*hotjar.com*', '*clarity.ms*',
+)
+
+PAGE_BYTES = REGISTRY.register(Histogram(
+    'court_browser_page_bytes', 'Bytes transferred to load a page in the browser', ('profile', 'page'),
+    buckets=(10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000),
+))
+SESSION_RSS_BYTES = REGISTRY.register(Histogram(
+    'court_browser_rss_bytes', 'Resident memory of a browser session (chromedriver and Chrome processes)', ('profile',),
+    buckets=tuple(mb * 1024 * 1024 for mb in (50, 100, 150, 200, 300, 400, 600, 800, 1200, 2000)),
+))
+
+# Sum of transferSize over the navigation and every resource fetched since
+PAGE_BYTES_SCRIPT = """
+    return performance.getEntriesByType('navigation')
+        .concat(performance.getEntriesByType('resource'))
+        .reduce((total, entry) => total + (entry.transferSize || 0), 0);
+"""
+
+
+def browser_profile(profile=None):
+    profile = (profile or os.getenv('BROWSER_PROFILE', 'default')).lower()
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown browser profile {profile!r}, expected one of {PROFILES}")
+    return profile
+
+
+def chrome_options(profile=None):
+    """
+    Options for a headless Chrome session with the given profile.
+    """
+    profile = browser_profile(profile)
+    options = Options()
+    options.add_argument('--headless')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--window-size=1920,1080')
+    if profile == 'default':
+        return options
+
+    # Hand the page over at DOMContentLoaded; the scrapers wait for the elements they need
+    options.page_load_strategy = 'eager'
+    disk_cache = int(float(os.getenv('BROWSER_DISK_CACHE_MB', 16)) * 1024 * 1024)
+    options.add_argument(f'--disk-cache-size={disk_cache}')
+    options.add_argument(f"--js-flags=--max-old-space-size={int(os.getenv('BROWSER_JS_HEAP_MB', 128))}")
+    options.add_argument('--blink-settings=imagesEnabled=false')
+    options.add_argument('--renderer-process-limit=2')
+    for flag in ('--disable-extensions', '--disable-background-networking', '--disable-component-update',
+                 '--disable-default-apps', '--disable-sync', '--disable-dev-shm-usage', '--mute-audio',
+                 '--no-first-run', '--disable-features=Translate,MediaRouter,OptimizationHints'):
+        options.add_argument(flag)
+    options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.images': 2,
+        'profile.default_content_setting_values.notifications': 2,
+    })
+    return options
+
+
+def apply_profile(driver, profile=None):
+    """
+    Session-level settings that can't be passed as options (the CDP block list).
+    """
+    if browser_profile(profile) != 'lean':
+        return
+    extra = [pattern.strip() for pattern in os.getenv('BROWSER_BLOCKED_URLS', '').split(',') if pattern.strip()]
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(BLOCKED_URLS) + extra})
+
+
+def page_bytes(driver):
+    """
+    Bytes transferred for the current page and its resources, as far as the
+    Resource Timing API can see them (cross-origin responses without
+    Timing-Allow-Origin count as 0).
+    """
+    try:
+        return int(driver.execute_script(PAGE_BYTES_SCRIPT) or 0)
+    except Exception:
+        return None
+
+
+def session_rss(driver):
+    """
+    Resident memory in bytes of chromedriver and every process under it
+    (Chrome and its renderers), or None where /proc isn't available.
+    """
+    try:
+        root = driver.service.process.pid
+    except AttributeError:
+        return None
+    return _tree_rss(root)
+
+
+def _tree_rss(root):
+    children = {}
+    rss = {}
+    try:
+        pids = [int(name) for name in os.listdir('/proc') if name.isdigit()]
+    except OSError:
+        return None
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                fields = dict(line.split(':', 1) for line in f if ':' in line)
+        except OSError:
+            # Exited while we were looking
+            continue
+        children.setdefault(int(fields['PPid']), []).append(pid)
+        # VmRSS is missing for kernel threads and zombies
+        rss[pid] = int(fields.get('VmRSS', '0 kB').split()[0]) * 1024
+
+    total = 0
+    stack = [root]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, ()))
+    return total
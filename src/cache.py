@@ -0,0 +1,196 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+from src.models import dumps, parse_site_date
+
+load_dotenv()
+
+
+class CaseCache:
+    def __init__(self, max_entries=None, ttl=None, max_ttl=None, empty_ttl=None, shared_path=None, stale_ttl=None,
+                 memory_ttl=None):
+        """
+        Two-tier cache of case lookups keyed on (case_type, case_no, year).
+
+        The first tier is an in-process LRU; the optional second tier is a
+        SQLite file (CACHE_SQLITE_PATH) shared by every worker on the host.
+        With the shared tier, a memory entry is re-checked against it after
+        CACHE_MEMORY_TTL seconds, so an invalidate() or put() from another
+        process (e.g. the change tracker) is seen within that time.
+        Expired entries stay readable through get_stale() for CACHE_STALE_TTL
+        more seconds, for when the court website is down.
+        """
+        self.max_entries = int(max_entries or os.getenv('CACHE_MAX_ENTRIES', 1024))
+        self.ttl = float(ttl or os.getenv('CACHE_TTL', 6 * 3600))
+        self.max_ttl = float(max_ttl or os.getenv('CACHE_MAX_TTL', 7 * 24 * 3600))
+        self.empty_ttl = float(empty_ttl or os.getenv('CACHE_EMPTY_TTL', 600))
+        self.shared_path = shared_path or os.getenv('CACHE_SQLITE_PATH')
+        self.stale_ttl = float(stale_ttl or os.getenv('CACHE_STALE_TTL', 30 * 24 * 3600))
+        self.memory_ttl = float(memory_ttl or os.getenv('CACHE_MEMORY_TTL', 30))
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'shared_hits': 0, 'misses': 0, 'stale_hits': 0, 'stores': 0, 'invalidations': 0}
+
+        if self.shared_path:
+            with self._shared() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS case_cache (
+                        cache_key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                """)
+
+    @staticmethod
+    def case_key(case_type, case_no, year):
+        """
+        Normalised cache key for a case lookup.
+        """
+        return "|".join([
+            ' '.join(str(case_type).split()).upper(),
+            str(case_no).strip(),
+            str(year).strip(),
+        ])
+
+    def get(self, key):
+        """
+        Cached value for `key`, or None if missing or expired.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, checked_at = entry
+                if expires_at > now and (not self.shared_path or now - checked_at < self.memory_ttl):
+                    self._entries.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    return json.loads(value)
+                if expires_at + self.stale_ttl <= now:
+                    del self._entries[key]
+
+        if self.shared_path:
+            with self._shared() as conn:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM case_cache WHERE cache_key = ?", (key,)
+                ).fetchone()
+            with self._lock:
+                if row is None:
+                    # Invalidated by another process
+                    self._entries.pop(key, None)
+                else:
+                    self._remember(key, row[0], row[1])
+            if row is not None and row[1] > now:
+                with self._lock:
+                    self._stats['shared_hits'] += 1
+                return json.loads(row[0])
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def get_stale(self, key):
+        """
+        Cached value for `key` even if it has expired, as long as it is within
+        CACHE_STALE_TTL of expiry; None otherwise.
+        """
+        oldest = time.time() - self.stale_ttl
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None and self.shared_path:
+            with self._shared() as conn:
+                entry = conn.execute(
+                    "SELECT value, expires_at FROM case_cache WHERE cache_key = ?", (key,)
+                ).fetchone()
+        if entry is None or entry[1] <= oldest:
+            return None
+        with self._lock:
+            self._stats['stale_hits'] += 1
+        return json.loads(entry[0])
+
+    def put(self, key, value, expires_at=None):
+        """
+        Store `value`; when `expires_at` is not given it follows expires_for(value).
+        """
+        expires_at = expires_at or self.expires_for(value)
+        serialized = dumps(value)
+        with self._lock:
+            self._remember(key, serialized, expires_at)
+            self._stats['stores'] += 1
+
+        if self.shared_path:
+            with self._shared() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO case_cache (cache_key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, serialized, expires_at)
+                )
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._stats['invalidations'] += 1
+        if self.shared_path:
+            with self._shared() as conn:
+                conn.execute("DELETE FROM case_cache WHERE cache_key = ?", (key,))
+
+    def expires_for(self, result):
+        """
+        Freshness rule for a case result.
+
+        A case with an upcoming hearing can't change before that date, so it is
+        served from cache until `next_date` (capped at CACHE_MAX_TTL). "No
+        record" answers expire after CACHE_EMPTY_TTL, everything else after
+        CACHE_TTL.
+        """
+        now = time.time()
+        if not result or result[0].get('case_title') == "NA":
+            return now + self.empty_ttl
+
+        next_date = parse_site_date(result[0].get('next_date'))
+        if next_date is not None and next_date.timestamp() > now:
+            return min(next_date.timestamp(), now + self.max_ttl)
+        return now + self.ttl
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['memory_hits'] + stats['shared_hits'] + stats['misses']
+        stats['hit_ratio'] = round((stats['memory_hits'] + stats['shared_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _remember(self, key, serialized, expires_at):
+        self._entries[key] = (serialized, expires_at, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _shared(self):
+        conn = sqlite3.connect(self.shared_path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return _Connection(conn)
+
+
+class _Connection:
+    """
+    sqlite3 connection that commits and closes when leaving a `with` block.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.conn.commit()
+        finally:
+            self.conn.close()
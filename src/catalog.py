@@ -0,0 +1,115 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class CaseCatalog:
+    def __init__(self, path=None, refresh_interval=None):
+        """
+        Case type and year options of the court's search form, harvested once
+        and kept on disk (CATALOG_PATH) so lookups can be validated up front.
+        """
+        self.path = path or os.getenv('CATALOG_PATH', os.path.join('.cache', 'catalog.json'))
+        self.refresh_interval = float(refresh_interval or os.getenv('CATALOG_REFRESH', 24 * 3600))
+
+        self.case_types = []
+        self.years = []
+        self.updated_at = None
+        self._case_type_set = frozenset()
+        self._year_set = frozenset()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._set(stored['case_types'], stored['years'], stored['updated_at'])
+
+    def refresh(self, scraper):
+        """
+        Harvest the dropdown options with `scraper` and store them.
+        """
+        options = scraper.fetch_form_options()
+        if not options['case_types'] or not options['years']:
+            raise ValueError("Search form returned no options")
+
+        updated_at = time.time()
+        self._set(options['case_types'], options['years'], updated_at)
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump(self.as_dict(), f)
+        os.replace(self.path + '.tmp', self.path)
+        logger.info("Case catalog refreshed", extra={'case_types': len(self.case_types), 'years': len(self.years)})
+
+    def is_stale(self):
+        return self.updated_at is None or time.time() - self.updated_at > self.refresh_interval
+
+    def start(self, pool, retry=300):
+        """
+        Refresh in a background thread whenever the catalog goes stale.
+        """
+        if self._thread is not None:
+            return
+
+        def run():
+            while not self._stop.is_set():
+                wait = max(self.refresh_interval - (time.time() - (self.updated_at or 0)), 0)
+                if self._stop.wait(wait):
+                    return
+                try:
+                    with pool.session() as wb:
+                        self.refresh(wb)
+                except Exception as e:
+                    logger.warning("Case catalog refresh failed: %s", e)
+                    self._stop.wait(retry)
+
+        self._thread = threading.Thread(target=run, name='catalog-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def validate(self, case_type, year):
+        """
+        Error message for an unknown case type or year, or None if the input is
+        valid (or the catalog hasn't been harvested yet).
+        """
+        with self._lock:
+            if not self._case_type_set:
+                return None
+            if ' '.join(str(case_type).split()) not in self._case_type_set:
+                return f"Unknown case type: {case_type}"
+            if str(year).strip() not in self._year_set:
+                return f"Unknown year: {year}"
+        return None
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'case_types': list(self.case_types),
+                'years': list(self.years),
+                'updated_at': self.updated_at,
+            }
+
+    def _set(self, case_types, years, updated_at):
+        with self._lock:
+            self.case_types = list(case_types)
+            self.years = list(years)
+            self.updated_at = updated_at
+            self._case_type_set = frozenset(case_types)
+            self._year_set = frozenset(years)
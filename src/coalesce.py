@@ -0,0 +1,149 @@
+import contextlib
+import copy
+import hashlib
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+try:
+    import fcntl
+except ImportError:  # Windows: coalesce within the process only
+    fcntl = None
+
+load_dotenv()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, lock_dir=None, wait_timeout=None, cross_process=True):
+        """
+        Collapse concurrent calls for the same key into one.
+
+        Inside a process, callers that arrive while a key is in flight wait for
+        the leader and get its result. With `cross_process`, a file lock per
+        key (COALESCE_LOCK_DIR) also serialises the leaders of different
+        gunicorn workers, and each one checks `shared_lookup` (e.g. the shared
+        cache tier) before doing the work. Leave it off when there is no such
+        shared result to find: waiting would only delay a second scrape.
+        """
+        self.lock_dir = lock_dir or os.getenv('COALESCE_LOCK_DIR', os.path.join('.cache', 'locks'))
+        self.wait_timeout = float(wait_timeout or os.getenv('COALESCE_WAIT_TIMEOUT', 120))
+        self.cross_process = cross_process and fcntl is not None
+        if self.cross_process:
+            os.makedirs(self.lock_dir, exist_ok=True)
+
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {'leaders': 0, 'collapsed_local': 0, 'collapsed_remote': 0, 'lock_timeouts': 0}
+
+    def do(self, key, fn, shared_lookup=None):
+        """
+        Run `fn()` once for all concurrent callers of `key`.
+
+        Returns (result, shared) where `shared` tells whether the result came
+        from another caller's run.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            with self._lock:
+                self._stats['collapsed_local'] += 1
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result), True
+
+        shared = False
+        try:
+            with self._process_lock(key) as waited:
+                result = shared_lookup() if waited and shared_lookup else None
+                if result is not None:
+                    shared = True
+                    with self._lock:
+                        self._stats['collapsed_remote'] += 1
+                else:
+                    with self._lock:
+                        self._stats['leaders'] += 1
+                    result = fn()
+            call.result = result
+            return copy.deepcopy(result), shared
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls)
+        return stats
+
+    def _process_lock(self, key):
+        return _FileLock(self, key) if self.cross_process else contextlib.nullcontext(False)
+
+
+class _FileLock:
+    """
+    Exclusive flock on a per-key file; `with` yields whether we had to wait for it.
+
+    The holder deletes the file before unlocking, so lock files don't pile up
+    one per case. A waiter that then gets the lock on the deleted file starts
+    over on the path's current file.
+    """
+
+    def __init__(self, flight, key):
+        self.flight = flight
+        self.path = os.path.join(flight.lock_dir, hashlib.sha256(key.encode()).hexdigest() + '.lock')
+        self.fd = None
+
+    def __enter__(self):
+        waited = False
+        deadline = time.monotonic() + self.flight.wait_timeout
+        self.fd = os.open(self.path, os.O_CREAT | os.O_RDWR)
+        while True:
+            try:
+                fcntl.flock(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                if self._still_linked():
+                    return waited
+                # Locked a file the previous holder already deleted
+                os.close(self.fd)
+                self.fd = os.open(self.path, os.O_CREAT | os.O_RDWR)
+                waited = True
+            except BlockingIOError:
+                waited = True
+                if time.monotonic() > deadline:
+                    # Another worker is stuck; do the work ourselves rather than fail
+                    with self.flight._lock:
+                        self.flight._stats['lock_timeouts'] += 1
+                    os.close(self.fd)
+                    self.fd = None
+                    return False
+                time.sleep(0.05)
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.fd is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+
+    def _still_linked(self):
+        try:
+            return os.path.samestat(os.fstat(self.fd), os.stat(self.path))
+        except FileNotFoundError:
+            return False
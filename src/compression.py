@@ -0,0 +1,64 @@
+"""
+Response compression for the JSON API.
+
+Bodies of at least COMPRESS_MIN_BYTES are compressed with brotli when the
+`brotli` package is installed and the client accepts it, with gzip
+otherwise. Streamed responses (SSE, exports, PDF downloads) pass through
+untouched.
+"""
+import gzip
+import os
+
+from dotenv import load_dotenv
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+load_dotenv()
+
+MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', 1024))
+GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 5))
+COMPRESSIBLE = ('application/json', 'application/x-ndjson', 'text/')
+
+
+def choose_encoding(accept_encoding):
+    """
+    Best encoding we can produce from an Accept-Encoding header, or None.
+    """
+    if brotli is not None and accept_encoding['br']:
+        return 'br'
+    if accept_encoding['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_response(request, response):
+    """
+    Compress `response` in place for `request` if it is worth it; returns it.
+    """
+    if (response.direct_passthrough or response.is_streamed or response.status_code != 200
+            or 'Content-Encoding' in response.headers
+            or not (response.mimetype or '').startswith(COMPRESSIBLE)):
+        return response
+
+    # Whatever we decide, caches must key on the request's encodings
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None or len(body) < MIN_BYTES:
+        return response
+
+    if encoding == 'br':
+        body = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    # The compressed bytes differ, so a byte-exact (strong) validator would be wrong
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
@@ -0,0 +1,158 @@
+"""
+Database engines, sessions and the read queries of the route handlers.
+
+The primary engine (SQLALCHEMY_DATABASE_URI) takes every write. Reads that
+can tolerate replication lag go to SQLALCHEMY_REPLICA_URI when it is set.
+Both engines share the pool settings below; the time callers spend waiting
+for a pooled connection is recorded in court_db_pool_wait_seconds.
+"""
+import os
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from src.metrics import REGISTRY, Histogram
+
+load_dotenv()
+
+POOL_WAIT_SECONDS = REGISTRY.register(Histogram(
+    'court_db_pool_wait_seconds', 'Wait for a connection from the SQLAlchemy pool', ('engine',),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30),
+))
+
+# What the order list of a response looks like now, for its ETag: the row's
+# version goes up whenever the change tracker records a change or a new order
+SELECT_ORDER_STATE = text("""
+    SELECT r.version,
+           (SELECT COUNT(*) FROM OrderDetails o WHERE o.response_id = r.response_id) AS orders
+    FROM Responses r
+    WHERE r.response_id = :response_id
+""")
+
+SELECT_ORDERS = text("""
+    SELECT sr_no, order_link, order_date, corrigendum_link, hindi_order
+    FROM OrderDetails
+    WHERE response_id = :response_id
+    ORDER BY sr_no ASC
+""")
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a connection.
+    """
+
+    engine_name = 'primary'
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - start, engine=self.engine_name)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.engine_name = self.engine_name
+        return pool
+
+
+def engine_options(url):
+    """
+    create_engine() keyword arguments from the DB_* settings.
+    """
+    options = {
+        'pool_pre_ping': os.getenv('DB_PRE_PING', '1') == '1',
+        # Compiled forms of the statements, reused across requests
+        'query_cache_size': int(os.getenv('DB_COMPILED_CACHE_SIZE', 500)),
+    }
+    if url.startswith('sqlite') and (':memory:' in url or url.rstrip('/') == 'sqlite:'):
+        # In-memory SQLite keeps its single-connection pool
+        return options
+    options.update({
+        'poolclass': TimedQueuePool,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+        # Below MySQL's wait_timeout and typical proxy idle cut-offs
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+    })
+    return options
+
+
+def create_db_engine(url=None, name='primary'):
+    url = url or os.getenv('SQLALCHEMY_DATABASE_URI')
+    engine = create_engine(url, **engine_options(url))
+    # Labels the pool wait histogram
+    engine.pool.engine_name = name
+    return engine
+
+
+class DataAccess:
+    def __init__(self, url=None, replica_url=None):
+        """
+        Primary (and optional replica) engine with a thread-scoped session for each.
+        """
+        self.engine = create_db_engine(url, 'primary')
+        replica_url = replica_url or os.getenv('SQLALCHEMY_REPLICA_URI')
+        self.replica = create_db_engine(replica_url, 'replica') if replica_url else self.engine
+
+        self.session = scoped_session(sessionmaker(bind=self.engine))
+        self.read_session = scoped_session(sessionmaker(bind=self.replica)) if replica_url else self.session
+
+    def init_app(self, app):
+        """
+        Hand each request's (or job's) connections back to the pool when its app context ends.
+        """
+        app.teardown_appcontext(self.remove)
+
+    def remove(self, exc=None):
+        self.session.remove()
+        if self.read_session is not self.session:
+            self.read_session.remove()
+
+    def order_details(self, response_id):
+        """
+        Order rows of a stored response, read from the replica when there is one.
+
+        A response written moments ago may not have replicated yet, so an empty
+        answer from the replica is re-read from the primary.
+        """
+        rows = self.read_session.execute(SELECT_ORDERS, {'response_id': response_id}).all()
+        if not rows and self.read_session is not self.session:
+            rows = self.session.execute(SELECT_ORDERS, {'response_id': response_id}).all()
+        return [dict(row._mapping) for row in rows]
+
+    def order_state(self, response_id):
+        """
+        (version, order count) of a stored response, or None if there is no such response.
+        """
+        row = self.read_session.execute(SELECT_ORDER_STATE, {'response_id': response_id}).first()
+        if row is None and self.read_session is not self.session:
+            row = self.session.execute(SELECT_ORDER_STATE, {'response_id': response_id}).first()
+        return tuple(row) if row is not None else None
+
+    def pool_stats(self):
+        engines = {'primary': self.engine}
+        if self.replica is not self.engine:
+            engines['replica'] = self.replica
+        stats = {}
+        for name, engine in engines.items():
+            pool = engine.pool
+            if not isinstance(pool, QueuePool):
+                continue
+            stats[name] = {
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'idle': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0),
+            }
+        return stats
+
+    def dispose(self):
+        self.engine.dispose()
+        if self.replica is not self.engine:
+            self.replica.dispose()
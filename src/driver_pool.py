@@ -0,0 +1,259 @@
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from src.engines import create_scraper
+from src.metrics import DRIVER_CHECKOUT_SECONDS, count_error
+from src.upstream import UpstreamUnavailable
+
+logger = logging.getLogger(__name__)
+
+
+class DriverPoolTimeout(Exception):
+    """
+    Raised when no scraper session could be checked out in time.
+    """
+
+
+class DriverPool:
+    def __init__(self, size=None, max_uses=None, checkout_timeout=None, factory=create_scraper):
+        """
+        Bounded pool of warm scraper sessions (see SCRAPER_ENGINE).
+
+        Sessions are created lazily up to `size`, handed out one caller at a
+        time and recycled after `max_uses` checkouts or when they fail a
+        health check.
+        """
+        self.size = int(size or os.getenv('DRIVER_POOL_SIZE', 2))
+        self.max_uses = int(max_uses or os.getenv('DRIVER_MAX_USES', 50))
+        self.checkout_timeout = float(checkout_timeout or os.getenv('DRIVER_CHECKOUT_TIMEOUT', 120))
+        self.factory = factory
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._uses = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.warm_target = 0
+        self.restarts = 0
+        self.last_error = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def warm(self, count=None, timeout=None):
+        """
+        Start up to `count` sessions ahead of time so the first requests
+        don't pay the Chrome cold start.
+
+        Idle sessions that no longer respond are replaced on the way; checking
+        them doesn't count as a use towards `max_uses`. Stops early when every
+        slot is busy for `timeout` seconds.
+        """
+        count = self.size if count is None else min(count, self.size)
+        timeout = self.checkout_timeout if timeout is None else timeout
+        sessions = []
+        try:
+            for _ in range(count):
+                if not self._slots.acquire(timeout=timeout):
+                    break
+                try:
+                    scraper = self._take_idle()
+                    if scraper is None:
+                        with self._lock:
+                            enough = len(self._uses) >= count
+                        # Sessions busy with a request count towards the target too
+                        scraper = None if enough else self._create()
+                except Exception:
+                    self._slots.release()
+                    raise
+                if scraper is None:
+                    self._slots.release()
+                    break
+                sessions.append(scraper)
+        finally:
+            for scraper in sessions:
+                if self._closed:
+                    # close() ran while this session was starting; nothing will quit it later
+                    self._discard(scraper)
+                else:
+                    self._idle.put(scraper)
+                self._slots.release()
+
+    def start(self, warm=None, interval=None):
+        """
+        Keep `warm` (DRIVER_WARM) sessions ready from a background thread,
+        re-checking every `interval` seconds so a crashed driver is restarted
+        before a request needs it.
+        """
+        if self._thread is not None:
+            return
+        self.warm_target = min(int(os.getenv('DRIVER_WARM', 1) if warm is None else warm), self.size)
+        interval = float(interval or os.getenv('DRIVER_HEALTH_INTERVAL', 30))
+        if self.warm_target <= 0:
+            return
+
+        def run():
+            while not self._closed:
+                try:
+                    self.warm(self.warm_target, timeout=0)
+                except Exception as e:
+                    count_error('driver_pool', e)
+                    logger.warning("Driver warm-up failed: %s", e)
+                if self._stop.wait(interval):
+                    return
+
+        self._thread = threading.Thread(target=run, name='driver-warmer', daemon=True)
+        self._thread.start()
+
+    def checkout(self, timeout=None):
+        """
+        Take a healthy scraper out of the pool, creating one if needed.
+        """
+        if self._closed:
+            raise RuntimeError("Driver pool is closed")
+
+        timeout = self.checkout_timeout if timeout is None else timeout
+        start = time.perf_counter()
+        acquired = self._slots.acquire(timeout=timeout)
+        DRIVER_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+        if not acquired:
+            raise DriverPoolTimeout(f"No scraper available after {timeout}s")
+
+        try:
+            scraper = self._take_idle()
+            if scraper is None:
+                scraper = self._create()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._uses[id(scraper)] += 1
+        return scraper
+
+    def checkin(self, scraper, broken=False):
+        """
+        Return a scraper to the pool, recycling it if it is worn out or broken.
+        """
+        try:
+            with self._lock:
+                uses = self._uses.get(id(scraper), 0)
+
+            if broken or self._closed or uses >= self.max_uses or not self._is_healthy(scraper):
+                if broken:
+                    self.restarts += 1
+                self._discard(scraper)
+            else:
+                self._idle.put(scraper)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def session(self, timeout=None):
+        """
+        Check out a scraper for the duration of a `with` block.
+        """
+        scraper = self.checkout(timeout=timeout)
+        broken = False
+        try:
+            yield scraper
+        except UpstreamUnavailable:
+            # The site is down, the browser is fine
+            raise
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.checkin(scraper, broken=broken)
+
+    def health(self):
+        """
+        Readiness of the pool: a live session exists (or, without warm-up,
+        the last attempt to start one didn't fail).
+        """
+        stats = self.stats()
+        if self._closed:
+            ready = False
+        elif self.warm_target:
+            ready = stats['open'] > 0
+        else:
+            ready = self.last_error is None
+        return {
+            'ready': ready,
+            'warm': self.warm_target,
+            'restarts': self.restarts,
+            'last_error': self.last_error,
+            **stats,
+        }
+
+    def stats(self):
+        """
+        Current pool occupancy.
+        """
+        with self._lock:
+            total = len(self._uses)
+        idle = self._idle.qsize()
+        return {
+            'size': self.size,
+            'open': total,
+            'idle': idle,
+            'in_use': total - idle,
+        }
+
+    def close(self):
+        """
+        Quit every idle session; sessions still checked out are closed on checkin.
+        """
+        self._closed = True
+        self._stop.set()
+        while True:
+            try:
+                scraper = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(scraper)
+
+    def _take_idle(self):
+        """
+        A healthy idle session, or None; unresponsive ones are discarded.
+        """
+        while True:
+            try:
+                scraper = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+            if self._is_healthy(scraper):
+                return scraper
+            logger.warning("Replacing unresponsive scraper session")
+            self.restarts += 1
+            self._discard(scraper)
+
+    def _create(self):
+        try:
+            scraper = self.factory()
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            raise
+        self.last_error = None
+        with self._lock:
+            self._uses[id(scraper)] = 0
+        return scraper
+
+    def _discard(self, scraper):
+        with self._lock:
+            self._uses.pop(id(scraper), None)
+        try:
+            scraper.close()
+        except Exception as e:
+            count_error('driver_pool', e)
+            logger.warning("Error closing scraper: %s", e)
+
+    def _is_healthy(self, scraper):
+        try:
+            return scraper.is_alive()
+        except Exception:
+            return False
@@ -0,0 +1,41 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ENGINES = ('selenium', 'http')
+
+
+def create_scraper(engine=None):
+    """
+    Build a scraper for the configured engine (SCRAPER_ENGINE).
+
+    "selenium" drives headless Chrome; "http" uses pooled HTTP sessions and
+    falls back to Chrome when the form can't be handled without a browser.
+    """
+    engine = (engine or os.getenv('SCRAPER_ENGINE', 'selenium')).lower()
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown scraper engine {engine!r}, expected one of {ENGINES}")
+
+    # Imported here so the HTTP engine never loads Selenium unless it falls back
+    if engine == 'http':
+        from src.http_scraper import HttpScraper
+
+        return HttpScraper(fallback=_browser_factory())
+
+    from src.webscraper import WebScraper
+
+    return WebScraper()
+
+
+def _browser_factory():
+    if os.getenv('HTTP_FALLBACK', 'selenium').lower() != 'selenium':
+        return None
+
+    def factory():
+        from src.webscraper import WebScraper
+
+        return WebScraper()
+
+    return factory
@@ -0,0 +1,203 @@
+"""
+Search over stored lookups, newest first or by next hearing date.
+
+Only the latest Responses row of each case is listed, and "no record"
+placeholders are left out. Pages are keyset-paginated: the cursor carries
+the sort key of the last row, so every page is an index range scan however
+deep the client goes. Full-text search (`q`) uses the FULLTEXT index on
+MySQL and the responses_fts FTS5 table on SQLite.
+"""
+import base64
+import json
+import re
+from datetime import date
+
+from sqlalchemy import text
+
+from src.models import parse_site_date
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+SORTS = ('recent', 'next_date')
+
+CASE_COLUMNS = """
+    r.response_id, q.case_type, q.case_no, q.year,
+    r.case_title, r.status, r.petitioner, r.respondent,
+    r.next_date, r.last_date, r.court_no, r.order_link,
+    r.checked_at, r.version
+"""
+
+# A later lookup of the same case supersedes this row
+LATEST_ONLY = """
+    NOT EXISTS (
+        SELECT 1 FROM Responses r2
+        JOIN Query q2 ON q2.query_id = r2.query_id
+        WHERE q2.case_type = q.case_type AND q2.case_no = q.case_no AND q2.year = q.year
+          AND r2.response_id > r.response_id
+    )
+"""
+
+
+class InvalidFilter(ValueError):
+    """
+    Raised for a filter, limit or cursor the search can't use.
+    """
+
+
+def encode_cursor(row, sort):
+    key = {'id': row['response_id']}
+    if sort == 'next_date':
+        key['next_date'] = _iso(row['next_date'])
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        after = json.loads(base64.urlsafe_b64decode(padded))
+        int(after['id'])
+        if after.get('next_date'):
+            date.fromisoformat(after['next_date'])
+        return after
+    except (ValueError, TypeError, KeyError):
+        raise InvalidFilter("Invalid cursor")
+
+
+def parse_filters(args):
+    """
+    Search filters from request arguments (a dict-like of strings).
+    """
+    filters = {}
+    for name in ('party', 'status', 'court_no', 'case_type', 'year', 'q'):
+        value = (args.get(name) or '').strip()
+        if value:
+            filters[name] = value
+    for name in ('next_from', 'next_to'):
+        value = (args.get(name) or '').strip()
+        if value:
+            parsed = parse_site_date(value)
+            if parsed is None:
+                raise InvalidFilter(f"{name} must be a date like 2025-08-12 or 12/08/2025")
+            filters[name] = parsed.date()
+
+    sort = args.get('sort') or 'recent'
+    if sort not in SORTS:
+        raise InvalidFilter(f"sort must be one of {', '.join(SORTS)}")
+    filters['sort'] = sort
+    return filters
+
+
+def fulltext_query(value, dialect):
+    """
+    Turn free text into a prefix-match-all-words query for the given dialect,
+    dropping the operators of each syntax so user input can't break it.
+    """
+    words = re.findall(r'\w+', value)
+    if dialect != 'sqlite':
+        # InnoDB doesn't index words under innodb_ft_min_token_size (3)
+        words = [word for word in words if len(word) >= 3]
+    if not words:
+        raise InvalidFilter("q has no searchable words")
+    if dialect == 'sqlite':
+        return ' '.join(f'"{word}"*' for word in words)
+    return ' '.join(f'+{word}*' for word in words)
+
+
+def search_cases(session, filters, limit=DEFAULT_LIMIT, cursor=None):
+    """
+    One page of stored cases matching `filters` (see parse_filters).
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    dialect = session.get_bind().dialect.name
+    sort = filters.get('sort', 'recent')
+
+    where = ["r.case_title <> 'NA'", LATEST_ONLY]
+    params = {'limit': limit + 1}
+
+    if 'party' in filters:
+        where.append("(r.petitioner LIKE :party OR r.respondent LIKE :party)")
+        params['party'] = f"%{filters['party']}%"
+    for name in ('status', 'court_no'):
+        if name in filters:
+            where.append(f"r.{name} = :{name}")
+            params[name] = filters[name]
+    for name in ('case_type', 'year'):
+        if name in filters:
+            where.append(f"q.{name} = :{name}")
+            params[name] = filters[name]
+    if 'next_from' in filters:
+        where.append("r.next_date >= :next_from")
+        params['next_from'] = filters['next_from']
+    if 'next_to' in filters:
+        where.append("r.next_date <= :next_to")
+        params['next_to'] = filters['next_to']
+    if 'q' in filters:
+        params['q'] = fulltext_query(filters['q'], dialect)
+        if dialect == 'sqlite':
+            where.append("r.response_id IN (SELECT rowid FROM responses_fts WHERE responses_fts MATCH :q)")
+        else:
+            where.append("MATCH (r.case_title, r.petitioner, r.respondent) AGAINST (:q IN BOOLEAN MODE)")
+
+    after = decode_cursor(cursor) if cursor else None
+    if sort == 'next_date':
+        where.append("r.next_date IS NOT NULL")
+        order = "r.next_date ASC, r.response_id ASC"
+        if after:
+            if not after.get('next_date'):
+                raise InvalidFilter("Cursor is not from a next_date listing")
+            where.append("(r.next_date > :after_date OR (r.next_date = :after_date AND r.response_id > :after_id))")
+            params['after_date'] = date.fromisoformat(after['next_date'])
+            params['after_id'] = after['id']
+    else:
+        order = "r.response_id DESC"
+        if after:
+            where.append("r.response_id < :after_id")
+            params['after_id'] = after['id']
+
+    rows = [dict(row._mapping) for row in session.execute(text(f"""
+        SELECT {CASE_COLUMNS}
+        FROM Responses r
+        JOIN Query q ON q.query_id = r.query_id
+        WHERE {' AND '.join(where)}
+        ORDER BY {order}
+        LIMIT :limit
+    """), params)]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1], sort)
+    return [_present(row) for row in rows], next_cursor
+
+
+def iter_cases(session, filters, page_size=500):
+    """
+    Every matching case, fetched a keyset page at a time.
+    """
+    cursor = None
+    while True:
+        rows, cursor = search_cases(session, filters, limit=page_size, cursor=cursor)
+        yield from rows
+        if cursor is None:
+            return
+
+
+def _iso(value):
+    if value is None or isinstance(value, str):
+        return value[:10] if value else value
+    return value.isoformat()[:10]
+
+
+def _present(row):
+    """
+    Dates in the court site's dd/mm/yyyy format, as /form and /order return them.
+    """
+    for name in ('next_date', 'last_date'):
+        value = row[name]
+        if value is not None:
+            row[name] = date.fromisoformat(_iso(value)).strftime("%d/%m/%Y")
+    if row['checked_at'] is not None and not isinstance(row['checked_at'], str):
+        row['checked_at'] = row['checked_at'].isoformat(sep=' ', timespec='seconds')
+    return row
@@ -0,0 +1,274 @@
+import logging
+import os
+from urllib.parse import urljoin
+
+from dotenv import load_dotenv
+from lxml import html as lxml_html
+
+from src.http_session import build_session
+from src.metrics import count_error, scrape_phase
+from src.parser import no_records_placeholder, parse_case_table, parse_order_table, reports_no_records
+from src.upstream import UpstreamUnavailable, upstream
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class FormError(Exception):
+    """
+    Raised when the case status form can't be read or submitted over plain HTTP.
+    """
+
+
+class InvalidOption(ValueError):
+    """
+    Raised when a case type or year is not one of the form's options.
+    """
+
+
+class HttpScraper:
+    def __init__(self, session=None, fallback=None):
+        """
+        Browserless scraper with the same interface as WebScraper.
+
+        It GETs the case status form, copies the captcha and hidden tokens,
+        submits the search and parses the HTML or JSON answer. `fallback` is a
+        zero-argument factory (e.g. WebScraper) used when the HTTP path fails.
+        """
+        self.session = session or build_session()
+        self.website_link = os.getenv('WEBSITE_LINK')
+        self.search_url = os.getenv('HTTP_SEARCH_URL')
+        self.timeout = float(os.getenv('SCRAPER_TIMEOUT', 30))
+        self.last_timings = {}
+        self.upstream = upstream()
+
+        self._fallback_factory = fallback
+        self._fallback = None
+
+    def search_and_extract_case(self, case_type_input, case_no_input, case_year_input):
+        """
+        Search for a court case and extract the data.
+        """
+        self.last_timings = {}
+        try:
+            with self._phase('page_load'):
+                form = self._load_form()
+
+            with self._phase('form_fill'):
+                fields = dict(form['hidden'])
+                fields[form['case_type']] = self._option_value(form, 'case_type', case_type_input)
+                fields[form['year']] = self._option_value(form, 'year', case_year_input)
+                fields[form['case_no']] = case_no_input
+                fields[form['captcha_field']] = form['captcha']
+
+            with self._phase('results_wait'):
+                response = self._submit(form, fields)
+
+            with self._phase('row_parse'):
+                data = self._parse_results(response)
+
+        except UpstreamUnavailable:
+            # The site is down for the browser engine too
+            raise
+
+        except InvalidOption as e:
+            logger.warning("Invalid search option: %s", e)
+            return []
+
+        except FormError as e:
+            count_error('http_scraper', e)
+            logger.warning("HTTP engine failed: %s", e)
+            return self._use_fallback('search_and_extract_case', case_type_input, case_no_input, case_year_input)
+
+        except Exception as e:
+            count_error('http_scraper', e)
+            logger.exception("Case search failed")
+            return self._use_fallback('search_and_extract_case', case_type_input, case_no_input, case_year_input)
+
+        if not data:
+            logger.info("No records found for the given search criteria")
+            return no_records_placeholder()
+        return data
+
+    def get_order_data(self, order_link):
+        """
+            get orders data if available
+        """
+        try:
+            with self._phase('order_page_load'), self.upstream.call('orders'):
+                response = self.session.get(order_link, timeout=self.timeout)
+                response.raise_for_status()
+
+            with self._phase('order_parse'):
+                return parse_order_table(response.text, base_url=response.url)
+        except UpstreamUnavailable:
+            raise
+        except Exception as e:
+            count_error('http_scraper', e)
+            logger.warning("Order page failed: %s", e, extra={'order_link': order_link})
+            return self._use_fallback('get_order_data', order_link)
+
+    def fetch_form_options(self):
+        """
+        Case type and year options offered by the search form.
+        """
+        try:
+            form = self._load_form()
+        except FormError:
+            if self._fallback_factory is None:
+                raise
+            return self._use_fallback('fetch_form_options')
+        return {
+            name: [text for text, value in form['options'][key].items() if value.strip()]
+            for name, key in (('case_types', 'case_type'), ('years', 'year'))
+        }
+
+    def is_alive(self):
+        """
+        The HTTP session can't die, but a crashed fallback browser would keep
+        failing every search; report it so the pool replaces this scraper.
+        """
+        if self._fallback is not None:
+            return self._fallback.is_alive()
+        return True
+
+    def close(self):
+        """
+        Close pooled connections and the fallback browser, if one was started.
+        """
+        self.session.close()
+        if self._fallback is not None:
+            self._fallback.close()
+            self._fallback = None
+
+    def _load_form(self):
+        """
+        Fetch the case status page and pull out the form fields, hidden tokens and captcha.
+        """
+        with self.upstream.call('form') as call:
+            response = self.session.get(self.website_link, timeout=self.timeout)
+            if response.status_code != 200:
+                call.fail()
+        if response.status_code != 200:
+            raise FormError(f"Form page returned {response.status_code}")
+
+        root = lxml_html.fromstring(response.text)
+
+        def first(xpath, what):
+            found = root.xpath(xpath)
+            if not found:
+                raise FormError(f"Could not find {what} on the form page")
+            return found[0]
+
+        # Same locators as WebScraper
+        case_type = first('//select[contains(@id , "case_type") or contains(@name , "case_type")]', 'case type select')
+        year = first('//select[contains(@id , "year")]', 'year select')
+        case_no = first('//input[@type="text" and (contains(@id , "case") or contains(@id , "number"))]', 'case number input')
+        captcha = first('//span[contains(@id ,"code" ) or contains(@id , "captcha")]', 'captcha code')
+        captcha_field = first('//input[@type="text" and contains(@id , "captcha")]', 'captcha input')
+
+        code = captcha.text_content().strip()
+        if not code:
+            # Captcha rendered by script; only the browser engine can read it
+            raise FormError("Captcha is empty in the served HTML")
+
+        forms = case_type.xpath('ancestor::form')
+        form = forms[0] if forms else None
+        hidden = {}
+        scope = form if form is not None else root
+        for field in scope.xpath('.//input[@type="hidden" and @name]'):
+            hidden[field.get('name')] = field.get('value', '')
+        # Laravel keeps the CSRF token in a meta tag as well
+        for meta in root.xpath('//meta[@name="csrf-token"]'):
+            hidden.setdefault('_token', meta.get('content', ''))
+
+        action = form.get('action') if form is not None else None
+        method = (form.get('method') if form is not None else None) or 'GET'
+
+        return {
+            'url': urljoin(response.url, self.search_url or action or response.url),
+            'method': method.upper(),
+            'referer': response.url,
+            'hidden': hidden,
+            'case_type': case_type.get('name') or case_type.get('id'),
+            'year': year.get('name') or year.get('id'),
+            'case_no': case_no.get('name') or case_no.get('id'),
+            'captcha_field': captcha_field.get('name') or captcha_field.get('id'),
+            'captcha': code,
+            'options': {
+                'case_type': self._options(case_type),
+                'year': self._options(year),
+            },
+        }
+
+    @staticmethod
+    def _options(select):
+        return {
+            ' '.join(option.text_content().split()): option.get('value', option.text_content().strip())
+            for option in select.xpath('.//option')
+        }
+
+    @staticmethod
+    def _option_value(form, name, visible_text):
+        """
+        Mirror Select.select_by_visible_text: map the label to its submitted value.
+        """
+        options = form['options'][name]
+        if visible_text not in options:
+            raise InvalidOption(f"Could not locate element with visible text: {visible_text}")
+        return options[visible_text]
+
+    def _submit(self, form, fields):
+        headers = {
+            'Referer': form['referer'],
+            'X-Requested-With': 'XMLHttpRequest',
+        }
+        with self.upstream.call('search') as call:
+            if form['method'] == 'POST':
+                response = self.session.post(form['url'], data=fields, headers=headers, timeout=self.timeout)
+            else:
+                response = self.session.get(form['url'], params=fields, headers=headers, timeout=self.timeout)
+            if response.status_code != 200:
+                call.fail()
+        if response.status_code != 200:
+            raise FormError(f"Search returned {response.status_code}")
+        return response
+
+    @staticmethod
+    def _parse_results(response):
+        """
+        The search may answer with the results page or with DataTables JSON.
+
+        Raises FormError when the answer isn't a result list at all.
+        """
+        if 'json' not in response.headers.get('Content-Type', ''):
+            data = parse_case_table(response.text, base_url=response.url)
+            if not data and not reports_no_records(response.text):
+                # Rejected captcha, error page or a changed layout: let the fallback try
+                raise FormError("Search answer has neither result rows nor the no-records marker")
+            return data
+
+        payload = response.json()
+        if isinstance(payload, dict) and 'data' not in payload:
+            raise FormError("Search answer has no 'data' rows")
+        rows = payload['data'] if isinstance(payload, dict) else payload
+        cells = []
+        for row in rows:
+            values = row.values() if isinstance(row, dict) else row
+            cells.append('<tr>' + ''.join(f'<td>{value if value is not None else ""}</td>' for value in values) + '</tr>')
+        markup = '<table id="caseTable"><tbody>' + ''.join(cells) + '</tbody></table>'
+        return parse_case_table(markup, base_url=response.url)
+
+    def _use_fallback(self, method, *args):
+        if self._fallback_factory is None:
+            return []
+        if self._fallback is None:
+            logger.info("Falling back to the browser engine")
+            self._fallback = self._fallback_factory()
+        result = getattr(self._fallback, method)(*args)
+        self.last_timings.update(getattr(self._fallback, 'last_timings', {}))
+        return result
+
+    def _phase(self, name):
+        return scrape_phase(self.last_timings, 'http', name)
@@ -0,0 +1,262 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from src.cache import _Connection
+from src.models import dumps
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+FINISHED = ('done', 'failed')
+
+
+class JobQueueFull(Exception):
+    """
+    Raised when too many jobs are already waiting to run.
+    """
+
+
+class Job:
+    def __init__(self, key, on_change=None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.state = 'queued'
+        self.result = None
+        self.status_code = None
+        self.error = None
+        self.events = [{'stage': 'queued', 'at': time.time()}]
+        self.created_at = time.time()
+        self.finished_at = None
+        self.changed = threading.Condition()
+        self._on_change = on_change
+
+    def progress(self, stage, **info):
+        """
+        Record a progress event and wake anyone streaming this job.
+        """
+        with self.changed:
+            self.events.append({'stage': stage, 'at': time.time(), **info})
+            self.changed.notify_all()
+        self._changed()
+
+    def finish(self, state, result=None, status_code=None, error=None):
+        with self.changed:
+            self.state = state
+            self.result = result
+            self.status_code = status_code
+            self.error = error
+            self.finished_at = time.time()
+            self.events.append({'stage': state, 'at': self.finished_at})
+            self.changed.notify_all()
+        self._changed()
+
+    def to_dict(self):
+        with self.changed:
+            return {
+                'job_id': self.id,
+                'state': self.state,
+                'events': list(self.events),
+                'result': self.result,
+                'status_code': self.status_code,
+                'error': self.error,
+            }
+
+    def _changed(self):
+        if self._on_change is not None:
+            self._on_change(self)
+
+
+class StoredJob:
+    """
+    Read-only copy of a job another worker runs, as it last saved it.
+    """
+
+    def __init__(self, data):
+        self.id = data['job_id']
+        self.update(data)
+
+    def update(self, data):
+        self._data = data
+        self.state = data['state']
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class JobManager:
+    def __init__(self, workers=None, max_pending=None, ttl=None, shared_path=None):
+        """
+        Runs lookups on a bounded thread pool and keeps their state for polling.
+
+        Submitting a key that is already queued or running returns the
+        existing job instead of starting a second scrape. With a shared SQLite
+        file (JOB_SQLITE_PATH, else CACHE_SQLITE_PATH) every state change is
+        also saved there, so any gunicorn worker can answer for the job; without
+        one, only the worker that accepted it knows it.
+        """
+        self.workers = int(workers or os.getenv('JOB_WORKERS', 2))
+        self.max_pending = int(max_pending or os.getenv('JOB_MAX_PENDING', 50))
+        self.ttl = float(ttl or os.getenv('JOB_TTL', 3600))
+        self.shared_path = shared_path or os.getenv('JOB_SQLITE_PATH') or os.getenv('CACHE_SQLITE_PATH')
+        self.poll_interval = float(os.getenv('JOB_POLL_INTERVAL', 0.5))
+
+        if self.shared_path:
+            with self._shared() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS jobs (
+                        job_id TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        updated_at REAL NOT NULL
+                    )
+                """)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+        self._jobs = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn):
+        """
+        Queue `fn(job)` under `key`; returns (job, created).
+        """
+        with self._lock:
+            self._purge()
+            job_id = self._inflight.get(key)
+            if job_id is not None:
+                return self._jobs[job_id], False
+
+            if len(self._inflight) >= self.max_pending:
+                raise JobQueueFull(f"{len(self._inflight)} jobs already pending")
+
+            job = Job(key, on_change=self._save if self.shared_path else None)
+            self._jobs[job.id] = job
+            self._inflight[key] = job.id
+
+        if self.shared_path:
+            self._save(job)
+            self._purge_shared()
+        self._executor.submit(self._run, job, fn)
+        return job, True
+
+    def get(self, job_id):
+        """
+        The job, or a StoredJob copy when another worker runs it; None if unknown.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self.shared_path:
+            data = self._load(job_id)
+            job = StoredJob(data) if data is not None else None
+        return job
+
+    def stream(self, job, heartbeat=15):
+        """
+        Yield the job's events as they happen, then stop once it finishes.
+
+        Yields None every `heartbeat` seconds without news so callers can keep
+        the connection alive.
+        """
+        if isinstance(job, StoredJob):
+            yield from self._stream_stored(job, heartbeat)
+            return
+
+        sent = 0
+        while True:
+            with job.changed:
+                if sent >= len(job.events) and job.state not in FINISHED:
+                    job.changed.wait(timeout=heartbeat)
+                pending = job.events[sent:]
+                finished = job.state in FINISHED
+            sent += len(pending)
+            if not pending:
+                yield None
+            for event in pending:
+                yield event
+            if finished and sent >= len(job.events):
+                return
+
+    def stats(self):
+        with self._lock:
+            states = {}
+            for job in self._jobs.values():
+                states[job.state] = states.get(job.state, 0) + 1
+            return {'workers': self.workers, 'pending': len(self._inflight), 'jobs': states}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _stream_stored(self, job, heartbeat):
+        # No notifications across processes: re-read the saved copy
+        sent = 0
+        quiet = 0.0
+        while True:
+            events = job.to_dict()['events']
+            pending = events[sent:]
+            sent = len(events)
+            for event in pending:
+                yield event
+            if job.state in FINISHED:
+                return
+            quiet = 0.0 if pending else quiet + self.poll_interval
+            if quiet >= heartbeat:
+                quiet = 0.0
+                yield None
+            time.sleep(self.poll_interval)
+            data = self._load(job.id)
+            if data is None:
+                return
+            job.update(data)
+
+    def _run(self, job, fn):
+        with job.changed:
+            job.state = 'running'
+        job.progress('running')
+        try:
+            result, status_code = fn(job)
+            job.finish('done', result=result, status_code=status_code)
+        except Exception as e:
+            logger.exception("Job failed", extra={'job_id': job.id, 'key': job.key})
+            job.finish('failed', error=str(e))
+        finally:
+            with self._lock:
+                if self._inflight.get(job.key) == job.id:
+                    del self._inflight[job.key]
+
+    def _purge(self):
+        cutoff = time.time() - self.ttl
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def _save(self, job):
+        try:
+            with self._shared() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO jobs (job_id, value, updated_at) VALUES (?, ?, ?)",
+                    (job.id, dumps(job.to_dict()), time.time()),
+                )
+        except sqlite3.Error as e:
+            # Other workers just won't see this update; the job itself carries on
+            logger.warning("Could not save job state: %s", e, extra={'job_id': job.id})
+
+    def _load(self, job_id):
+        with self._shared() as conn:
+            row = conn.execute("SELECT value FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def _purge_shared(self):
+        with self._shared() as conn:
+            conn.execute("DELETE FROM jobs WHERE updated_at < ?", (time.time() - self.ttl,))
+
+    def _shared(self):
+        conn = sqlite3.connect(self.shared_path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return _Connection(conn)
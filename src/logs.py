@@ -0,0 +1,69 @@
+"""
+Logging setup shared by the app and the command line tools.
+
+    LOG_LEVEL=DEBUG LOG_FORMAT=json python app.py
+
+Modules log through `logging.getLogger(__name__)` and pass context as
+`extra={...}`; the extra fields come out as key=value pairs in the text
+format and as top-level keys in the JSON format.
+"""
+import json
+import logging
+import os
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def _extra(record):
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_FIELDS}
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    def format(self, record):
+        line = super().format(record)
+        fields = _extra(record)
+        if fields:
+            line += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created)),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            **_extra(record),
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level=None, fmt=None):
+    """
+    Send log records to stderr at LOG_LEVEL (INFO) in LOG_FORMAT ("text" or "json").
+    """
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    fmt = fmt or os.getenv('LOG_FORMAT', 'text')
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    # Selenium and urllib3 are chatty at DEBUG
+    for name in ('selenium', 'urllib3'):
+        logging.getLogger(name).setLevel(max(root.level, logging.INFO))
@@ -0,0 +1,213 @@
+"""
+In-process metrics in the Prometheus text format, and optional tracing.
+
+Counters and histograms are updated where the work happens; gauges are read
+from the components' stats() when /metrics is scraped. Each gunicorn worker
+keeps its own numbers, so scrape every worker (or run one) for exact totals.
+
+Spans are emitted through OpenTelemetry when `opentelemetry-api` is
+installed; configure the exporter the usual way (e.g. opentelemetry-instrument
+with OTEL_EXPORTER_OTLP_ENDPOINT). Set OTEL_TRACING=0 to turn spans off.
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from dotenv import load_dotenv
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+load_dotenv()
+
+# Seconds; the upper buckets cover the 20-30s browser lookups
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+_tracer = trace.get_tracer('court_data_fetcher') if trace and os.getenv('OTEL_TRACING', '1') == '1' else None
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)] + list(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in values]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, (None, 0.0))
+            if counts is None:
+                counts = [0] * (len(self.buckets) + 1)
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self):
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, [le])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(round(total, 6))}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, name, help, labelnames=(), function=None):
+        """
+        `function` is called at render time and returns {label value tuple: value}.
+        """
+        super().__init__(name, help, labelnames)
+        self.function = function
+
+    def _samples(self):
+        try:
+            values = sorted(self.function().items())
+        except Exception:
+            # A component that is shutting down shouldn't break the whole scrape
+            return []
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in values]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'court_http_request_seconds', 'Flask request latency', ('endpoint', 'method', 'status')))
+SCRAPE_PHASE_SECONDS = REGISTRY.register(Histogram(
+    'court_scrape_phase_seconds', 'Time spent in each step of a scrape', ('engine', 'phase')))
+DRIVER_CHECKOUT_SECONDS = REGISTRY.register(Histogram(
+    'court_driver_checkout_seconds', 'Wait for a scraper session from the driver pool'))
+DB_SECONDS = REGISTRY.register(Histogram(
+    'court_db_transaction_seconds', 'Database transaction time', ('operation',)))
+ERRORS = REGISTRY.register(Counter(
+    'court_errors_total', 'Errors by component and exception type', ('component', 'type')))
+
+
+def gauge(name, help, labelnames, function):
+    """
+    Register a gauge read from `function()` whenever /metrics is scraped.
+    """
+    return REGISTRY.register(Gauge(name, help, labelnames, function))
+
+
+def render():
+    return REGISTRY.render()
+
+
+def count_error(component, error):
+    ERRORS.inc(component=component, type=type(error).__name__)
+
+
+def span(name, **attributes):
+    """
+    Tracing span around a block, or a no-op when OpenTelemetry isn't available.
+    """
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(name, attributes={k: str(v) for k, v in attributes.items()})
+
+
+@contextmanager
+def scrape_phase(timings, engine, phase):
+    """
+    Time one step of a scrape into `timings` (seconds), the phase histogram and a span.
+    """
+    start = time.perf_counter()
+    try:
+        with span(f"scrape.{phase}", engine=engine):
+            yield
+    finally:
+        elapsed = time.perf_counter() - start
+        # A phase that runs twice (e.g. a retried step) adds up
+        timings[phase] = round(timings.get(phase, 0) + elapsed, 3)
+        SCRAPE_PHASE_SECONDS.observe(elapsed, engine=engine, phase=phase)
@@ -0,0 +1,198 @@
+"""
+Typed rows returned by the scrapers.
+
+Dates are parsed once, when a row is built from the page, and stay `date`
+objects all the way to the database binds. `as_dict()` gives the old dict
+shape (dates as dd/mm/yyyy strings) that the JSON API, the cache and the
+batch checkpoints use, and `row['field']` / `row.get('field')` keep working
+for code written against the dicts.
+
+`dumps()` serialises rows (and anything containing them) with orjson when
+it is installed and falls back to the json module otherwise; both produce
+the same text.
+"""
+import json
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SITE_DATE_FORMAT = "%d/%m/%Y"
+DATE_FORMATS = (SITE_DATE_FORMAT, '%d-%m-%Y', '%Y-%m-%d')
+
+
+def parse_site_date(value):
+    """
+    Parse a date as shown on the court site, or None for "NA"/blank values.
+    """
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if not value or value == "NA":
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def site_date(value):
+    """
+    A date from the page as a `date`; blanks become None and anything that
+    isn't a date (e.g. the "NA" placeholder) is kept as it was.
+    """
+    if value is None or isinstance(value, date):
+        return value
+    value = value.strip()
+    if not value:
+        return None
+    parsed = parse_site_date(value)
+    return parsed.date() if parsed else value
+
+
+def _show(value):
+    if isinstance(value, date):
+        return value.strftime(SITE_DATE_FORMAT)
+    return value
+
+
+def _bind(value):
+    # Placeholders like "NA" can't go into a DATE column
+    return value if isinstance(value, date) else None
+
+
+class _Row:
+    __slots__ = ()
+
+    DATE_FIELDS = ()
+
+    def __getitem__(self, name):
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name)
+
+    def get(self, name, default=None):
+        return getattr(self, name, default)
+
+    @classmethod
+    def coerce(cls, row):
+        """
+        Accept a row or its dict form (e.g. one read back from the cache).
+        """
+        if isinstance(row, cls):
+            return row
+        names = {f.name for f in fields(cls)}
+        return cls(**{name: value for name, value in row.items() if name in names})
+
+    def __post_init__(self):
+        for name in self.DATE_FIELDS:
+            setattr(self, name, site_date(getattr(self, name)))
+
+    def as_dict(self):
+        """
+        The dict shape the scrapers used to return.
+        """
+        row = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if value is None and f.name in ('query_id', 'response_id'):
+                continue
+            row[f.name] = _show(value) if f.name in self.DATE_FIELDS else value
+        return row
+
+
+@dataclass(slots=True)
+class CaseResult(_Row):
+    DATE_FIELDS = ('next_date', 'last_date')
+
+    case_title: str
+    status: str
+    petitioner: str
+    respondent: str | None
+    next_date: date | str | None
+    last_date: date | str | None
+    court_no: str
+    order_link: str | None
+    # Filled in once the lookup is stored
+    query_id: int | None = None
+    response_id: int | None = None
+
+    @classmethod
+    def not_found(cls):
+        """
+        Row returned when the site finds no case for the search.
+        """
+        return cls("NA", "NA", "NA", "NA", "NA", "NA", "NA", "NA")
+
+    @property
+    def found(self):
+        return self.case_title != "NA"
+
+    def bind_params(self, **extra):
+        """
+        Parameters for INSERT_RESPONSE, dates as `date` objects.
+        """
+        return {
+            'case_title': self.case_title,
+            'status': self.status,
+            'petitioner': self.petitioner,
+            'respondent': self.respondent,
+            'next_date': _bind(self.next_date),
+            'last_date': _bind(self.last_date),
+            'court_no': self.court_no,
+            'order_link': self.order_link,
+            **extra,
+        }
+
+
+@dataclass(slots=True)
+class OrderEntry(_Row):
+    DATE_FIELDS = ('order_date',)
+
+    sr_no: int
+    order_link: str | None
+    order_date: date | str | None
+    corrigendum_link: str | None
+    hindi_order: str | None
+
+    def bind_params(self, **extra):
+        """
+        Parameters for INSERT_ORDER, the date as a `date` object.
+        """
+        return {
+            'sr_no': self.sr_no,
+            'order_link': self.order_link,
+            'order_date': _bind(self.order_date),
+            'corrigendum_link': self.corrigendum_link,
+            'hindi_order': self.hindi_order,
+            **extra,
+        }
+
+
+def _default(value):
+    if isinstance(value, _Row):
+        return value.as_dict()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.strftime(SITE_DATE_FORMAT)
+    return str(value)
+
+
+def dumps(value, sort_keys=False):
+    """
+    JSON text for `value`; rows are written in their as_dict() shape.
+    """
+    if orjson is not None:
+        option = orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(value, default=_default, option=option).decode()
+    return json.dumps(value, default=_default, sort_keys=sort_keys, separators=(',', ':'), ensure_ascii=False)
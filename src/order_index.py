@@ -0,0 +1,315 @@
+"""
+Full-text index over the text of order PDFs.
+
+    python -m src.order_index --all            # index every stored order
+    python -m src.order_index --search "section 482"
+
+PDFs are downloaded through the PdfCache, their text is extracted page by
+page in a process pool (pypdf, optional) and stored in a SQLite FTS5 file
+(ORDER_INDEX_PATH), one row per page. Text is keyed by the SHA-256 of the
+PDF, so the same judgment linked from several lookups is extracted once and
+a re-index skips every PDF whose content hasn't changed.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from src.cache import _Connection
+from src.history import InvalidFilter, fulltext_query
+from src.metrics import REGISTRY, Counter, Histogram
+from src.prefetch import LINK_FIELDS
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+INDEXED = REGISTRY.register(Counter(
+    'court_order_index_total', 'Order PDFs handled by the text index by outcome', ('outcome',)))
+EXTRACT_SECONDS = REGISTRY.register(Histogram(
+    'court_order_extract_seconds', 'Text extraction time per order PDF', (),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+))
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS order_documents (
+        response_id INTEGER NOT NULL,
+        sr_no INTEGER NOT NULL,
+        field TEXT NOT NULL,
+        url TEXT NOT NULL,
+        sha256 TEXT NOT NULL,
+        indexed_at REAL NOT NULL,
+        PRIMARY KEY (response_id, sr_no, field)
+    );
+    CREATE INDEX IF NOT EXISTS idx_order_documents_sha256 ON order_documents (sha256);
+    CREATE TABLE IF NOT EXISTS pdf_texts (
+        sha256 TEXT PRIMARY KEY,
+        pages INTEGER NOT NULL,
+        chars INTEGER NOT NULL,
+        extracted_at REAL NOT NULL
+    );
+    CREATE VIRTUAL TABLE IF NOT EXISTS pdf_pages USING fts5(
+        text, sha256 UNINDEXED, page UNINDEXED, tokenize = 'unicode61 remove_diacritics 2'
+    );
+"""
+
+# Best pages first; each hit is shown against the newest order row linking that PDF
+SEARCH = """
+    SELECT d.response_id, d.sr_no, d.field, d.url, h.page, h.snippet
+    FROM (
+        SELECT sha256, page, snippet(pdf_pages, 0, '[', ']', '...', 24) AS snippet, rank
+        FROM pdf_pages
+        WHERE pdf_pages MATCH :q {scope}
+        ORDER BY rank
+        LIMIT :limit
+    ) h
+    JOIN order_documents d ON d.rowid = (
+        SELECT rowid FROM order_documents
+        WHERE sha256 = h.sha256 {doc_scope}
+        ORDER BY response_id DESC LIMIT 1
+    )
+    ORDER BY h.rank
+"""
+
+
+def extract_pages(pdf_path, out_path):
+    """
+    Write the text of each page of `pdf_path` to `out_path` as JSON lines.
+
+    Runs in a worker process. Pages are read and written one at a time so
+    a long judgment never sits in memory as a whole. Returns the page count.
+    """
+    # Imported here: it is optional and only the extractor processes need it
+    try:
+        import pypdf
+    except ImportError:
+        raise RuntimeError("pypdf is not installed")
+    reader = pypdf.PdfReader(pdf_path)
+    count = 0
+    with open(out_path, 'w', encoding='utf-8') as out:
+        for number, page in enumerate(reader.pages, start=1):
+            try:
+                page_text = page.extract_text() or ''
+            except Exception as e:
+                # One unreadable page shouldn't lose the rest of the judgment
+                logger.warning("Page %d unreadable: %s", number, e)
+                page_text = ''
+            out.write(json.dumps({'page': number, 'text': ' '.join(page_text.split())}) + '\n')
+            count += 1
+    return count
+
+
+class OrderIndex:
+    def __init__(self, pdf_cache, path=None, workers=None, processes=None):
+        """
+        Indexes order PDFs in the background; searched with search().
+
+        `workers` threads download PDFs and write the index, `processes`
+        worker processes extract text.
+        """
+        self.pdf_cache = pdf_cache
+        self.path = path or os.getenv('ORDER_INDEX_PATH', os.path.join('.cache', 'orders.db'))
+        self.workers = int(workers or os.getenv('ORDER_INDEX_WORKERS', 2))
+        self.processes = int(processes or os.getenv('ORDER_INDEX_PROCESSES', 2))
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='order-index')
+        # spawn: forking a process that runs threads and a browser pool isn't safe
+        self._extractors = ProcessPoolExecutor(
+            max_workers=self.processes, mp_context=multiprocessing.get_context('spawn'))
+        # Striped locks so one PDF is extracted once even when several rows link it
+        self._locks = [threading.Lock() for _ in range(64)]
+        self._pending = 0
+        self._idle = threading.Condition()
+
+    def enqueue(self, response_id, orders):
+        """
+        Queue every PDF linked from `orders` (rows of one stored response) for indexing.
+        """
+        for order in orders:
+            for field in LINK_FIELDS:
+                url = order.get(field)
+                if url:
+                    with self._idle:
+                        self._pending += 1
+                    self._executor.submit(self._run, response_id, order['sr_no'], field, url)
+
+    def wait(self, timeout=None):
+        """
+        Block until everything queued so far is indexed; False on timeout.
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def search(self, q, limit=DEFAULT_LIMIT, response_id=None):
+        """
+        Pages matching every word of `q` (prefix match), best first, with a snippet.
+        """
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        params = {'q': fulltext_query(q, 'sqlite'), 'limit': limit}
+        scope = doc_scope = ''
+        if response_id is not None:
+            scope = "AND sha256 IN (SELECT sha256 FROM order_documents WHERE response_id = :response_id)"
+            doc_scope = "AND response_id = :response_id"
+            params['response_id'] = int(response_id)
+
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(SEARCH.format(scope=scope, doc_scope=doc_scope), params).fetchall()
+        except sqlite3.OperationalError as e:
+            # FTS5 rejects some inputs fulltext_query lets through
+            raise InvalidFilter(f"Invalid search: {e}")
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+
+    def stats(self):
+        with self._connect() as conn:
+            documents, = conn.execute("SELECT COUNT(*) FROM order_documents").fetchone()
+            texts, pages = conn.execute("SELECT COUNT(*), COALESCE(SUM(pages), 0) FROM pdf_texts").fetchone()
+        with self._idle:
+            pending = self._pending
+        return {'documents': documents, 'pdfs': texts, 'pages': pages, 'pending': pending}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._extractors.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, response_id, sr_no, field, url):
+        try:
+            outcome = self._index(response_id, sr_no, field, url)
+        except Exception as e:
+            logger.warning("Indexing failed: %s", e, extra={'url': url, 'response_id': response_id})
+            outcome = 'failed'
+        finally:
+            with self._idle:
+                self._pending -= 1
+                self._idle.notify_all()
+        INDEXED.inc(outcome=outcome)
+
+    def _index(self, response_id, sr_no, field, url):
+        """
+        Index one linked PDF; returns 'unchanged', 'reused' or 'extracted'.
+        """
+        with self._connect() as conn:
+            known = conn.execute(
+                "SELECT url, sha256 FROM order_documents WHERE response_id = ? AND sr_no = ? AND field = ?",
+                (response_id, sr_no, field),
+            ).fetchone()
+
+        cached = self.pdf_cache.lookup(url)
+        if known and cached and known == (url, cached[1]['etag']):
+            return 'unchanged'
+
+        path, meta = cached or self.pdf_cache.fetch(url)
+        sha256 = meta['etag']
+
+        with self._locks[int(sha256[:8], 16) % len(self._locks)]:
+            with self._connect() as conn:
+                have_text = conn.execute("SELECT 1 FROM pdf_texts WHERE sha256 = ?", (sha256,)).fetchone()
+            outcome = 'reused' if have_text else 'extracted'
+            if not have_text:
+                self._extract(sha256, path)
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO order_documents (response_id, sr_no, field, url, sha256, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (response_id, sr_no, field, url, sha256, time.time()),
+            )
+            if known and known[1] != sha256:
+                self._drop_orphan(conn, known[1])
+        return 'unchanged' if known and known[1] == sha256 else outcome
+
+    def _extract(self, sha256, pdf_path):
+        fd, out_path = tempfile.mkstemp(suffix='.jsonl', dir=os.path.dirname(self.path) or None)
+        os.close(fd)
+        try:
+            with EXTRACT_SECONDS.time():
+                pages = self._extractors.submit(extract_pages, pdf_path, out_path).result()
+
+            with self._connect() as conn, open(out_path, encoding='utf-8') as f:
+                chars = 0
+
+                def rows():
+                    nonlocal chars
+                    for line in f:
+                        page = json.loads(line)
+                        chars += len(page['text'])
+                        yield page['text'], sha256, page['page']
+
+                conn.execute("DELETE FROM pdf_pages WHERE sha256 = ?", (sha256,))
+                conn.executemany("INSERT INTO pdf_pages (text, sha256, page) VALUES (?, ?, ?)", rows())
+                conn.execute(
+                    "INSERT OR REPLACE INTO pdf_texts (sha256, pages, chars, extracted_at) VALUES (?, ?, ?, ?)",
+                    (sha256, pages, chars, time.time()),
+                )
+            logger.info("Indexed PDF", extra={'sha256': sha256, 'pages': pages})
+        finally:
+            os.unlink(out_path)
+
+    @staticmethod
+    def _drop_orphan(conn, sha256):
+        # Text of a PDF no order row links to any more
+        if conn.execute("SELECT 1 FROM order_documents WHERE sha256 = ? LIMIT 1", (sha256,)).fetchone():
+            return
+        conn.execute("DELETE FROM pdf_pages WHERE sha256 = ?", (sha256,))
+        conn.execute("DELETE FROM pdf_texts WHERE sha256 = ?", (sha256,))
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return _Connection(conn)
+
+
+if __name__ == "__main__":
+    from sqlalchemy import bindparam, text
+    from sqlalchemy.orm import Session
+
+    from src.dal import create_db_engine
+    from src.logs import configure_logging
+    from src.pdf_cache import PdfCache
+
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument('--all', action='store_true', help='index the PDFs of every stored order')
+    arg_parser.add_argument('--response-id', type=int, action='append', default=[], help='index one stored response')
+    arg_parser.add_argument('--search', help='search the index and print the hits')
+    args = arg_parser.parse_args()
+    configure_logging()
+
+    index = OrderIndex(PdfCache())
+    try:
+        if args.all or args.response_id:
+            where = "" if args.all else "WHERE response_id IN :ids"
+            statement = text(f"SELECT response_id, sr_no, order_link, corrigendum_link, hindi_order FROM OrderDetails {where}")
+            params = {}
+            if not args.all:
+                statement = statement.bindparams(bindparam('ids', expanding=True))
+                params['ids'] = args.response_id
+            with Session(create_db_engine()) as session:
+                for row in session.execute(statement, params):
+                    index.enqueue(row.response_id, [row._mapping])
+            index.wait()
+            print(index.stats())
+        if args.search:
+            for hit in index.search(args.search):
+                print(f"{hit['response_id']}/{hit['sr_no']} p.{hit['page']}: {hit['snippet']}")
+    finally:
+        index.shutdown()
@@ -0,0 +1,160 @@
+"""
+Pure HTML parsers for the case status and order pages.
+
+They take markup fetched in one go (page_source / outerHTML) and return the
+same dicts as the WebDriver row-by-row path in WebScraper, so they can be
+run offline against saved pages.
+"""
+from urllib.parse import urljoin
+
+from lxml import html as lxml_html
+
+from src.models import CaseResult, OrderEntry
+
+# What the case table shows when a search finds nothing
+NO_RECORDS_TEXT = "No data available in table"
+
+# Elements that start a new line in the browser's innerText
+BLOCK_TAGS = {'div', 'p', 'tr', 'li', 'table', 'tbody', 'thead', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+
+def no_records_placeholder():
+    """
+    Row returned when the site finds no case for the search.
+    """
+    return [CaseResult.not_found()]
+
+
+def reports_no_records(markup):
+    """
+    Whether the page says the search found nothing, as opposed to not
+    showing a results table at all (captcha rejected, error page, new layout).
+    """
+    return NO_RECORDS_TEXT in markup
+
+
+def inner_text(element):
+    """
+    Approximate the browser's innerText: <br> and block elements become newlines.
+    """
+    parts = []
+
+    def walk(node):
+        tag = node.tag if isinstance(node.tag, str) else None
+        if tag == 'br':
+            parts.append('\n')
+        elif tag in BLOCK_TAGS:
+            parts.append('\n')
+        if node.text and tag not in ('script', 'style'):
+            parts.append(node.text)
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if tag in BLOCK_TAGS:
+            parts.append('\n')
+
+    walk(element)
+    lines = [' '.join(line.split()) for line in ''.join(parts).split('\n')]
+    return '\n'.join(line for line in lines if line)
+
+
+def _first_text(element, xpath):
+    found = element.xpath(xpath)
+    return ' '.join(found[0].text_content().split()) if found else ""
+
+
+def _first_href(element, xpath, base_url):
+    found = element.xpath(xpath)
+    if not found or found[0].get('href') is None:
+        return None
+    return urljoin(base_url, found[0].get('href'))
+
+
+def parse_case_table(markup, base_url=""):
+    """
+    Extract case rows from the `#caseTable` markup (or a whole page containing it).
+
+    Returns [] when the table reports NO_RECORDS_TEXT, and for any page
+    without result rows; tell the two apart with reports_no_records().
+    """
+    root = lxml_html.fromstring(markup)
+    tables = root.xpath('//table[@id="caseTable"]') or [root]
+    rows = tables[0].xpath('.//tbody/tr')
+
+    data = []
+    for row in rows:
+        cols = row.xpath('./td')
+        if len(cols) < 4:
+            continue
+
+        case_info_raw = cols[1]
+        case_text = _first_text(case_info_raw, './/a')
+        status = _first_text(case_info_raw, './/font').replace('[', '').replace(']', '')
+        order_link = _first_href(case_info_raw, './/strong/..', base_url)
+
+        parties = inner_text(cols[2]).replace('\xa0', ' ').strip()
+        parts = ' '.join(parties.split()).split('VS.')
+        petitioner = parts[0].strip()
+        respondent = parts[1].strip() if len(parts) > 1 else None
+
+        next_date = last_date = court_no = ""
+        for line in inner_text(cols[3]).split('\n'):
+            if "NEXT DATE:" in line:
+                next_date = line.replace("NEXT DATE:", "").strip()
+            elif "Last Date:" in line:
+                last_date = line.replace("Last Date:", "").strip()
+            elif "COURT NO:" in line:
+                court_no = line.replace("COURT NO:", "").strip()
+
+        data.append(CaseResult(
+            case_title=case_text,
+            status=status,
+            petitioner=petitioner,
+            respondent=respondent,
+            next_date=next_date if next_date != 'NA' else None,
+            last_date=last_date,
+            court_no=court_no,
+            order_link=order_link,
+        ))
+
+    return data
+
+
+def parse_order_table(markup, base_url=""):
+    """
+    Extract order rows from the first table body of an order page.
+    """
+    root = lxml_html.fromstring(markup)
+    bodies = root.xpath('//tbody')
+    if not bodies:
+        return []
+
+    data = []
+    for row in bodies[0].xpath('./tr'):
+        row_data = row.xpath('./td')
+        if len(row_data) < 5:
+            continue
+        sr_no = row_data[0].text_content().strip()
+        if not sr_no.isdigit():
+            continue
+        data.append(OrderEntry(
+            sr_no=int(sr_no),
+            order_link=_first_href(row_data[1], './/a', base_url),
+            order_date=' '.join(row_data[2].text_content().split()),
+            corrigendum_link=_first_href(row_data[3], './/a', base_url),
+            hindi_order=_first_href(row_data[4], './/a', base_url),
+        ))
+    return data
+
+
+def parse_select_options(markup):
+    """
+    Visible texts of a <select>'s real options (placeholders with an empty value are skipped).
+    """
+    root = lxml_html.fromstring(markup)
+    return [
+        ' '.join(option.text_content().split())
+        for option in root.xpath('//option')
+        if option.get('value', option.text_content()).strip()
+    ]
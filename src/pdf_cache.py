@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from src.http_session import build_session
+from src.upstream import is_court_url, upstream
+
+load_dotenv()
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UpstreamError(Exception):
+    """
+    Raised when the court server doesn't return the PDF.
+    """
+
+    def __init__(self, status_code):
+        super().__init__(f"Upstream returned {status_code}")
+        self.status_code = status_code
+
+
+class PdfCache:
+    def __init__(self, directory=None, max_bytes=None, session=None):
+        """
+        On-disk cache of order PDFs keyed by their link.
+
+        Files are evicted least-recently-used once the cache grows past
+        PDF_CACHE_MAX_BYTES. Every transfer is streamed in CHUNK_SIZE pieces,
+        so memory use doesn't depend on the size of the PDF.
+        """
+        self.directory = directory or os.getenv('PDF_CACHE_DIR', os.path.join('.cache', 'pdfs'))
+        self.max_bytes = int(max_bytes or os.getenv('PDF_CACHE_MAX_BYTES', 1024 ** 3))
+        self.timeout = float(os.getenv('PDF_TIMEOUT', 60))
+        self.session = session or build_session()
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Striped locks so concurrent misses on one link download it once
+        self._locks = [threading.Lock() for _ in range(64)]
+        self._evict_lock = threading.Lock()
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def lookup(self, url):
+        """
+        (path, meta) of the cached PDF for `url`, or None. Marks it recently used.
+        """
+        path, meta_path = self._paths(self.key(url))
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return path, meta
+
+    def mark(self, url, state):
+        """
+        Record a download state (e.g. 'queued', 'failed') for `url` next to
+        the cache files, where every worker on the host can read it.
+        """
+        path, _ = self._paths(self.key(url))
+        state_path = path[:-len('.pdf')] + '.state'
+        os.makedirs(os.path.dirname(state_path), exist_ok=True)
+        with open(state_path + '.tmp', 'w') as f:
+            json.dump({'state': state, 'at': time.time()}, f)
+        os.replace(state_path + '.tmp', state_path)
+
+    def state(self, url):
+        """
+        {'state', 'at'} for `url`: 'done' once cached, else the last mark(), or None.
+        """
+        path, meta_path = self._paths(self.key(url))
+        # Not lookup(): asking about a PDF shouldn't count as using it
+        if os.path.exists(meta_path):
+            return {'state': 'done', 'at': os.path.getmtime(meta_path)}
+        try:
+            with open(path[:-len('.pdf')] + '.state') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def fetch(self, url):
+        """
+        Make sure `url` is cached, downloading it if needed; returns (path, meta).
+        """
+        cached = self.lookup(url)
+        if cached:
+            return cached
+
+        with self._lock_for(url):
+            cached = self.lookup(url)
+            if cached:
+                return cached
+            for _ in self.stream(url):
+                pass
+        return self.lookup(url)
+
+    def stream(self, url):
+        """
+        Start downloading `url` and return an iterator of its chunks.
+
+        The chunks are written through to the cache as they are handed out, and
+        the file is kept once the whole body has been read. Raises UpstreamError
+        before anything is yielded if the server refuses, and UpstreamUnavailable
+        while the court website is considered down.
+        """
+        if is_court_url(url):
+            # Only the wait for the response headers counts towards upstream health
+            with upstream().call('pdf') as call:
+                response = self.session.get(url, stream=True, timeout=self.timeout)
+                if response.status_code >= 500:
+                    call.fail()
+        else:
+            # Another host's failures say nothing about the court website
+            response = self.session.get(url, stream=True, timeout=self.timeout)
+        if response.status_code != 200:
+            response.close()
+            raise UpstreamError(response.status_code)
+
+        def chunks():
+            digest = hashlib.sha256()
+            size = 0
+            complete = False
+            tmp = tempfile.NamedTemporaryFile(dir=self.directory, suffix='.part', delete=False)
+            try:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    tmp.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+                    yield chunk
+                complete = True
+            finally:
+                response.close()
+                tmp.close()
+                if complete:
+                    self._store(url, tmp.name, {
+                        'url': url,
+                        'etag': digest.hexdigest(),
+                        'size': size,
+                        'content_type': response.headers.get('Content-Type', 'application/pdf'),
+                    })
+                else:
+                    os.unlink(tmp.name)
+
+        return chunks()
+
+    def stats(self):
+        files = self._files()
+        return {
+            'files': len(files),
+            'bytes': sum(size for _, size, _ in files),
+            'max_bytes': self.max_bytes,
+        }
+
+    def _store(self, url, tmp_path, meta):
+        path, meta_path = self._paths(self.key(url))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + '.tmp', meta_path)
+        try:
+            os.unlink(path[:-len('.pdf')] + '.state')
+        except OSError:
+            pass
+        self._evict()
+
+    def _evict(self):
+        with self._evict_lock:
+            files = self._files()
+            total = sum(size for _, size, _ in files)
+            # Oldest access first
+            for path, size, _ in sorted(files, key=lambda f: f[2]):
+                if total <= self.max_bytes:
+                    break
+                for stale in (path, path[:-len('.pdf')] + '.json'):
+                    try:
+                        os.unlink(stale)
+                    except OSError:
+                        pass
+                total -= size
+
+    def _files(self):
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith('.pdf'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((path, stat.st_size, stat.st_mtime))
+        return files
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key[:2], key)
+        return base + '.pdf', base + '.json'
+
+    def _lock_for(self, url):
+        return self._locks[int(self.key(url)[:8], 16) % len(self._locks)]
@@ -0,0 +1,136 @@
+from datetime import datetime
+
+from sqlalchemy import text
+
+from src.models import CaseResult, OrderEntry, parse_site_date
+from src.metrics import DB_SECONDS
+
+INSERT_QUERY = text("""
+    INSERT INTO Query (case_no, case_type, year)
+    VALUES (:case_no, :case_type, :year)
+""")
+
+INSERT_RESPONSE = text("""
+    INSERT INTO Responses (
+        query_id, case_title, status, petitioner, respondent,
+        next_date, last_date, court_no, order_link, checked_at
+    ) VALUES (
+        :query_id, :case_title, :status, :petitioner, :respondent,
+        :next_date, :last_date, :court_no, :order_link, :checked_at
+    )
+""")
+
+INSERT_ORDER = text("""
+    INSERT INTO OrderDetails (
+        response_id, sr_no, order_link, order_date, corrigendum_link, hindi_order
+    ) VALUES (
+        :response_id, :sr_no, :order_link, :order_date, :corrigendum_link, :hindi_order
+    )
+""")
+
+INSERT_EVENT = text("""
+    INSERT INTO CaseEvents (response_id, field, old_value, new_value, detected_at)
+    VALUES (:response_id, :field, :old_value, :new_value, :detected_at)
+""")
+
+# Columns the change tracker may rewrite on an existing Responses row
+TRACKED_FIELDS = (
+    'case_title', 'status', 'petitioner', 'respondent',
+    'next_date', 'last_date', 'court_no', 'order_link',
+)
+
+
+def db_date(value):
+    """
+    Bind value for a DATE column from a date (or date string as shown on the court site).
+    """
+    parsed = parse_site_date(value)
+    return parsed.date() if parsed else None
+
+
+def save_case_result(session, query, case, orders):
+    """
+    Store one lookup (Query, its Responses row and all OrderDetails) in a
+    single transaction.
+
+    `case` and `orders` are CaseResult/OrderEntry rows (or their dict form).
+    Order rows go in with one executemany. The row is stamped as checked
+    now, so the change tracker doesn't re-scrape a case just looked up.
+    Returns (query_id, response_id).
+    """
+    case = CaseResult.coerce(case)
+    with DB_SECONDS.time(operation='save_case_result'):
+        try:
+            query_id = session.execute(INSERT_QUERY, {
+                'case_no': query['case_no'],
+                'case_type': query['case_type'],
+                'year': query['year'],
+            }).lastrowid
+
+            response_id = session.execute(
+                INSERT_RESPONSE, case.bind_params(query_id=query_id, checked_at=datetime.now())
+            ).lastrowid
+
+            if orders:
+                session.execute(INSERT_ORDER, [
+                    OrderEntry.coerce(order).bind_params(response_id=response_id) for order in orders
+                ])
+
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+    return query_id, response_id
+
+
+def save_case_changes(session, response_id, changes, new_orders, checked_at):
+    """
+    Apply a re-check of a stored case in one transaction.
+
+    `changes` maps TRACKED_FIELDS to (old, new) values; only those columns are
+    rewritten and the row's version goes up when anything changed.
+    `new_orders` are appended to OrderDetails and every change is logged to
+    CaseEvents. Returns the event dicts that were written.
+    """
+    events = [
+        {'response_id': response_id, 'field': field, 'old_value': old, 'new_value': new, 'detected_at': checked_at}
+        for field, (old, new) in changes.items()
+    ] + [
+        {'response_id': response_id, 'field': 'order', 'old_value': None, 'new_value': order['sr_no'], 'detected_at': checked_at}
+        for order in new_orders
+    ]
+
+    with DB_SECONDS.time(operation='save_case_changes'):
+        try:
+            assignments = [f"{field} = :{field}" for field in changes if field in TRACKED_FIELDS]
+            if events:
+                assignments.append("version = version + 1")
+            assignments.append("checked_at = :checked_at")
+            params = {field: new for field, (old, new) in changes.items() if field in TRACKED_FIELDS}
+            session.execute(
+                text(f"UPDATE Responses SET {', '.join(assignments)} WHERE response_id = :response_id"),
+                {**params, 'checked_at': checked_at, 'response_id': response_id}
+            )
+
+            if new_orders:
+                session.execute(INSERT_ORDER, [
+                    OrderEntry.coerce(order).bind_params(response_id=response_id) for order in new_orders
+                ])
+
+            if events:
+                session.execute(INSERT_EVENT, [
+                    {**event, 'old_value': _event_value(event['old_value']), 'new_value': _event_value(event['new_value'])}
+                    for event in events
+                ])
+
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+    return events
+
+
+def _event_value(value):
+    return None if value is None else str(value)
@@ -0,0 +1,99 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+
+from src.upstream import is_court_url
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+LINK_FIELDS = ('order_link', 'corrigendum_link', 'hindi_order')
+
+
+class Prefetcher:
+    def __init__(self, pdf_cache, workers=None, per_host=None):
+        """
+        Downloads the PDFs of a stored order list into the PdfCache in the background.
+
+        At most `per_host` downloads run against one host at a time and each
+        link is fetched once even if several rows or lookups point at it.
+        Download state is kept with the PdfCache files, so status() answers
+        the same from every worker and after a restart.
+        """
+        self.pdf_cache = pdf_cache
+        self.workers = int(workers or os.getenv('PREFETCH_WORKERS', 4))
+        self.per_host = int(per_host or os.getenv('PREFETCH_PER_HOST', 2))
+
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='prefetch')
+        self._hosts = {}
+        self._inflight = set()
+        self._lock = threading.Lock()
+
+    def enqueue(self, response_id, orders):
+        """
+        Queue every PDF linked from `orders` for download.
+
+        Links off the court website are skipped: /download won't serve them.
+        """
+        for order in orders:
+            for field in LINK_FIELDS:
+                url = order.get(field)
+                if not url or not is_court_url(url):
+                    continue
+                with self._lock:
+                    if url in self._inflight:
+                        continue
+                    self._inflight.add(url)
+                if self.pdf_cache.lookup(url) is not None:
+                    with self._lock:
+                        self._inflight.discard(url)
+                    continue
+                self.pdf_cache.mark(url, 'queued')
+                self._executor.submit(self._download, url)
+
+    def status(self, orders):
+        """
+        Download state of each PDF linked from `orders` (OrderDetails rows).
+        """
+        rows = []
+        for order in orders:
+            row = {'sr_no': order['sr_no']}
+            for field in LINK_FIELDS:
+                url = order.get(field)
+                if not url:
+                    continue
+                if not is_court_url(url):
+                    row[field] = 'skipped'
+                    continue
+                state = self.pdf_cache.state(url)
+                row[field] = state['state'] if state is not None else 'not_queued'
+            rows.append(row)
+        return rows
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _download(self, url):
+        try:
+            if self.pdf_cache.lookup(url) is None:
+                self.pdf_cache.mark(url, 'downloading')
+                with self._host_slot(url):
+                    self.pdf_cache.fetch(url)
+        except Exception as e:
+            logger.warning("Prefetch failed: %s", e, extra={'url': url})
+            self.pdf_cache.mark(url, 'failed')
+        finally:
+            with self._lock:
+                self._inflight.discard(url)
+
+    def _host_slot(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.BoundedSemaphore(self.per_host)
+            return self._hosts[host]
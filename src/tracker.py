@@ -0,0 +1,239 @@
+"""
+Re-check stored cases and record what changed.
+
+    python -m src.tracker            # keep polling
+    python -m src.tracker --once     # check the cases that are due, then exit
+
+Cases with a hearing coming up (or just held) are checked most often; ones
+listed far in the future are checked rarely. Changed fields and new orders
+are written to the latest Responses row, logged to CaseEvents and, when
+TRACKER_WEBHOOK_URL is set, POSTed there as JSON.
+
+The tracker runs in its own process, so the app only learns that a case
+changed through the shared cache tier. With CACHE_SQLITE_PATH set to the
+same file for both, the app re-checks its memory copy within
+CACHE_MEMORY_TTL seconds; without it, the app keeps serving the old result
+until the entry expires.
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import date, datetime
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.batch import RateLimiter
+from src.cache import CaseCache
+from src.dal import create_db_engine
+from src.driver_pool import DriverPool
+from src.engines import create_scraper
+from src.http_session import build_session
+from src.logs import configure_logging
+from src.persistence import TRACKED_FIELDS, db_date, save_case_changes
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Newest stored response for every distinct case
+LATEST_SNAPSHOTS = text("""
+    SELECT r.response_id, q.case_type, q.case_no, q.year,
+           r.case_title, r.status, r.petitioner, r.respondent,
+           r.next_date, r.last_date, r.court_no, r.order_link, r.checked_at
+    FROM Responses r
+    JOIN Query q ON q.query_id = r.query_id
+    WHERE r.response_id IN (
+        SELECT MAX(r2.response_id)
+        FROM Responses r2
+        JOIN Query q2 ON q2.query_id = r2.query_id
+        GROUP BY q2.case_type, q2.case_no, q2.year
+    )
+    AND r.case_title <> 'NA'
+""")
+
+ORDER_NUMBERS = text("SELECT sr_no FROM OrderDetails WHERE response_id = :response_id")
+
+DATE_FIELDS = ('next_date', 'last_date')
+
+
+def as_date(value):
+    """
+    DATE column value as a date (SQLite hands these back as strings).
+    """
+    if value is None or isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    return date.fromisoformat(str(value)[:10])
+
+
+def as_timestamp(value):
+    if value is None:
+        return 0.0
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(str(value)).timestamp()
+
+
+class ChangeTracker:
+    def __init__(self, engine=None, pool=None, cache=None, interval=None, min_interval=None,
+                 max_interval=None, batch_size=None, rate=None, webhook_url=None):
+        """
+        Polls stored cases on a cadence driven by their next hearing date.
+        """
+        self.engine = engine or create_db_engine()
+        self.pool = pool or DriverPool(factory=create_scraper)
+        self.cache = cache or CaseCache()
+        self.interval = float(interval or os.getenv('TRACKER_INTERVAL', 24 * 3600))
+        self.min_interval = float(min_interval or os.getenv('TRACKER_MIN_INTERVAL', 3600))
+        self.max_interval = float(max_interval or os.getenv('TRACKER_MAX_INTERVAL', 7 * 24 * 3600))
+        self.batch_size = int(batch_size or os.getenv('TRACKER_BATCH', 50))
+        self.limiter = RateLimiter(rate or os.getenv('TRACKER_RATE', 0.2))
+        self.webhook_url = webhook_url or os.getenv('TRACKER_WEBHOOK_URL')
+        self._webhook_session = build_session() if self.webhook_url else None
+        if not self.cache.shared_path:
+            logger.warning("CACHE_SQLITE_PATH is not set: the app's cache won't see tracked changes "
+                           "until its entries expire (CACHE_MAX_TTL)")
+
+    def due_at(self, snapshot, today=None):
+        """
+        When a stored case should next be checked.
+
+        The interval shrinks as the hearing approaches: a quarter of the days
+        left, clamped to [TRACKER_MIN_INTERVAL, TRACKER_MAX_INTERVAL]. A hearing
+        today or already past gets the minimum, since the status and orders
+        change around it; cases with no listing use TRACKER_INTERVAL.
+        """
+        today = today or date.today()
+        next_date = as_date(snapshot['next_date'])
+        if next_date is None:
+            interval = self.interval
+        else:
+            days_left = (next_date - today).days
+            interval = min(max(days_left * 86400 / 4, self.min_interval), self.max_interval)
+        return as_timestamp(snapshot['checked_at']) + interval
+
+    def due_cases(self, now=None):
+        """
+        Stored cases that are due, soonest hearing first.
+        """
+        now = now or time.time()
+        with Session(self.engine) as session:
+            snapshots = [dict(row._mapping) for row in session.execute(LATEST_SNAPSHOTS)]
+
+        due = [s for s in snapshots if self.due_at(s) <= now]
+        # Cases without a listing go last
+        due.sort(key=lambda s: (as_date(s['next_date']) or date.max, as_timestamp(s['checked_at'])))
+        return due[:self.batch_size]
+
+    def check(self, snapshot):
+        """
+        Re-scrape one case and store only what changed; returns the events.
+        """
+        self.limiter.acquire()
+        with self.pool.session() as wb:
+            result = wb.search_and_extract_case(snapshot['case_type'], snapshot['case_no'], snapshot['year'])
+            if not result or result[0]['case_title'] == "NA":
+                # Scrape failed or the site lost the case: try again once the case is due again,
+                # not on every pass
+                logger.info("Re-check returned nothing", extra={'response_id': snapshot['response_id']})
+                self.record_attempt(snapshot)
+                return []
+            fresh = result[0]
+            orders = []
+            if fresh['order_link'] not in (None, "NA"):
+                self.limiter.acquire()
+                orders = wb.get_order_data(fresh['order_link'])
+
+        changes = {}
+        for field in TRACKED_FIELDS:
+            old = snapshot[field]
+            new = fresh[field]
+            if field in DATE_FIELDS:
+                old, new = as_date(old), db_date(new)
+            if old != new:
+                changes[field] = (old, new)
+
+        with Session(self.engine) as session:
+            known = {row[0] for row in session.execute(ORDER_NUMBERS, {'response_id': snapshot['response_id']})}
+            new_orders = [order for order in orders if order['sr_no'] not in known]
+            events = save_case_changes(session, snapshot['response_id'], changes, new_orders, datetime.now())
+
+        if events:
+            self.cache.invalidate(self.cache.case_key(snapshot['case_type'], snapshot['case_no'], snapshot['year']))
+            self._notify(snapshot, events)
+        return events
+
+    def record_attempt(self, snapshot):
+        """
+        Mark a case as checked without changing it, so it waits its normal interval.
+        """
+        with Session(self.engine) as session:
+            save_case_changes(session, snapshot['response_id'], {}, [], datetime.now())
+
+    def run_once(self):
+        """
+        Check every case that is due; returns how many changes were found.
+        """
+        found = 0
+        for snapshot in self.due_cases():
+            try:
+                found += len(self.check(snapshot))
+            except Exception as e:
+                logger.exception("Re-check failed", extra={'response_id': snapshot['response_id']})
+                try:
+                    self.record_attempt(snapshot)
+                except Exception as e:
+                    logger.warning("Could not record the failed re-check: %s", e)
+        return found
+
+    def run_forever(self, idle=None):
+        idle = float(idle or os.getenv('TRACKER_IDLE', 300))
+        try:
+            while True:
+                found = self.run_once()
+                logger.info("Tracker pass done", extra={'changes': found})
+                time.sleep(idle)
+        finally:
+            self.pool.close()
+
+    def _notify(self, snapshot, events):
+        if not self.webhook_url:
+            return
+        payload = {
+            'case_type': snapshot['case_type'],
+            'case_no': snapshot['case_no'],
+            'year': snapshot['year'],
+            'response_id': snapshot['response_id'],
+            'events': events,
+        }
+        try:
+            self._webhook_session.post(
+                self.webhook_url,
+                data=json.dumps(payload, default=str),
+                headers={'Content-Type': 'application/json'},
+                timeout=10,
+            )
+        except Exception as e:
+            logger.warning("Webhook delivery failed: %s", e)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument('--once', action='store_true', help='run a single pass and exit')
+    arg_parser.add_argument('--engine', choices=('selenium', 'http'))
+    args = arg_parser.parse_args()
+    configure_logging()
+
+    tracker = ChangeTracker(pool=DriverPool(size=1, factory=lambda: create_scraper(args.engine)))
+    if args.once:
+        try:
+            print(f"{tracker.run_once()} change(s) found")
+        finally:
+            tracker.pool.close()
+    else:
+        tracker.run_forever()
@@ -0,0 +1,201 @@
+"""
+Health of the court website as seen from this process.
+
+Every outbound call (case search, order page, form options, PDF download)
+goes through `upstream.call(kind)`, which
+
+- fails fast with UpstreamUnavailable while the circuit is open, i.e. after
+  too many recent calls failed or were slower than UPSTREAM_SLOW_CALL, and
+  lets a single probe through once UPSTREAM_OPEN_SECONDS have passed;
+- caps the number of concurrent calls with an AIMD limit: +1 per limit's
+  worth of fast successes, halved on a failure or slow call.
+"""
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+
+from src.metrics import REGISTRY, Counter, Histogram
+
+load_dotenv()
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+
+UPSTREAM_CALLS = REGISTRY.register(Counter(
+    'court_upstream_calls_total', 'Calls to the court website by kind and outcome', ('kind', 'outcome')))
+UPSTREAM_SECONDS = REGISTRY.register(Histogram(
+    'court_upstream_call_seconds', 'Latency of calls to the court website', ('kind',)))
+
+
+class UpstreamUnavailable(Exception):
+    """
+    Raised instead of calling the court website while it is considered down
+    or every concurrency slot is taken.
+    """
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Call:
+    def __init__(self):
+        self.failed = False
+
+    def fail(self):
+        """
+        Count this call as failed even though it didn't raise (e.g. a scraper
+        that returns [] after swallowing a timeout).
+        """
+        self.failed = True
+
+
+class UpstreamHealth:
+    def __init__(self, window=None, failure_ratio=None, min_calls=None, open_seconds=None,
+                 slow_call=None, min_limit=None, max_limit=None, queue_timeout=None):
+        self.window = int(window or os.getenv('UPSTREAM_WINDOW', 20))
+        self.failure_ratio = float(failure_ratio or os.getenv('UPSTREAM_FAILURE_RATIO', 0.5))
+        self.min_calls = int(min_calls or os.getenv('UPSTREAM_MIN_CALLS', 5))
+        self.open_seconds = float(open_seconds or os.getenv('UPSTREAM_OPEN_SECONDS', 60))
+        self.slow_call = float(slow_call or os.getenv('UPSTREAM_SLOW_CALL', 15))
+        self.min_limit = int(min_limit or os.getenv('UPSTREAM_MIN_CONCURRENCY', 1))
+        self.max_limit = int(max_limit or os.getenv('UPSTREAM_MAX_CONCURRENCY', 16))
+        self.queue_timeout = float(queue_timeout or os.getenv('UPSTREAM_QUEUE_TIMEOUT', 30))
+
+        self.state = CLOSED
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self.opened_at = None
+        self._outcomes = deque(maxlen=self.window)
+        self._probing = False
+        self._changed = threading.Condition()
+
+    @contextmanager
+    def call(self, kind):
+        """
+        Wrap one call to the court website; yields a handle with .fail().
+        """
+        probe = self._acquire()
+        handle = _Call()
+        start = time.perf_counter()
+        try:
+            yield handle
+        except UpstreamUnavailable:
+            raise
+        except Exception:
+            handle.failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            outcome = 'failure' if handle.failed else 'slow' if elapsed > self.slow_call else 'success'
+            UPSTREAM_CALLS.inc(kind=kind, outcome=outcome)
+            UPSTREAM_SECONDS.observe(elapsed, kind=kind)
+            self._release(outcome, probe)
+
+    def stats(self):
+        with self._changed:
+            failures = sum(self._outcomes)
+            return {
+                'state': self.state,
+                'limit': int(self.limit),
+                'in_flight': self.in_flight,
+                'recent_calls': len(self._outcomes),
+                'recent_failures': failures,
+                'retry_after': self._retry_after(),
+            }
+
+    def _retry_after(self):
+        if self.state != OPEN:
+            return None
+        return max(round(self.opened_at + self.open_seconds - time.monotonic(), 1), 0)
+
+    def _acquire(self):
+        """
+        Wait for a concurrency slot; returns True when this call is the half-open probe.
+        """
+        deadline = time.monotonic() + self.queue_timeout
+        with self._changed:
+            while True:
+                probe = False
+                if self.state == OPEN:
+                    if time.monotonic() - self.opened_at < self.open_seconds:
+                        raise UpstreamUnavailable("Court website is unavailable", retry_after=self._retry_after())
+                    self.state = HALF_OPEN
+                if self.state == HALF_OPEN:
+                    # One probe at a time decides whether the circuit closes again
+                    if self._probing:
+                        raise UpstreamUnavailable("Court website is being re-checked", retry_after=self.open_seconds)
+                    probe = True
+
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    if probe:
+                        self._probing = True
+                    return probe
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise UpstreamUnavailable(f"All {int(self.limit)} upstream slots busy", retry_after=self.queue_timeout)
+                self._changed.wait(remaining)
+
+    def _release(self, outcome, probe):
+        bad = outcome != 'success'
+        with self._changed:
+            self.in_flight -= 1
+            self._outcomes.append(bad)
+
+            # AIMD: grow by about one slot per round of good calls, halve on trouble
+            if bad:
+                self.limit = max(self.min_limit, self.limit / 2)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+            if probe:
+                self._probing = False
+                if bad:
+                    self._open()
+                else:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+            elif self.state == CLOSED and len(self._outcomes) >= self.min_calls:
+                if sum(self._outcomes) / len(self._outcomes) >= self.failure_ratio:
+                    self._open()
+
+            self._changed.notify_all()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.limit = float(self.min_limit)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def upstream():
+    """
+    The process-wide UpstreamHealth shared by every scraper and the PDF cache.
+    """
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = UpstreamHealth()
+        return _default
+
+
+def is_court_url(url):
+    """
+    Whether `url` points at the court website (the host and port of WEBSITE_LINK).
+    """
+    court = urlparse(os.getenv('WEBSITE_LINK') or '')
+    try:
+        target = urlparse(url)
+        return court.hostname is not None and (target.hostname, target.port) == (court.hostname, court.port)
+    except ValueError:
+        # Malformed port
+        return False
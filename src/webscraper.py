@@ -1,193 +1,463 @@
 from selenium import webdriver
 from selenium.webdriver.support.ui import Select
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-import time
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import (
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+import logging
 from dotenv import load_dotenv
 import os
+from src.browser import PAGE_BYTES, SESSION_RSS_BYTES, apply_profile, browser_profile, chrome_options, page_bytes, session_rss
+from src.metrics import REGISTRY, Counter, count_error, scrape_phase
+from src.models import CaseResult, OrderEntry
+from src.parser import NO_RECORDS_TEXT, no_records_placeholder, parse_case_table, parse_order_table, parse_select_options
+from src.upstream import upstream
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Returned by the results wait when the site reports an empty table
+NO_RESULTS = object()
+
+# Memory of the browser is sampled on the first page and every this many after
+RSS_SAMPLE_EVERY = 10
+
+FORM_SESSIONS = REGISTRY.register(Counter(
+    'court_form_sessions_total', 'How the search form was made ready for a lookup', ('outcome',)))
+
+# The six controls of the case status form, found in one script round-trip
+FORM_XPATHS = (
+    ('case_type', '//select[contains(@id , "case_type") or contains(@name , "case_type")]'),
+    ('year', '//select[contains(@id , "year")]'),
+    ('case_no', '//input[@type="text" and (contains(@id , "case") or contains(@id , "number"))]'),
+    ('captcha_code', '//span[contains(@id ,"code" ) or contains(@id , "captcha")]'),
+    ('captcha_field', '//input[@type="text" and contains(@id , "captcha")]'),
+    ('submit', '//button[@id="search" or @id="submit" or contains(text() , "Submit")]'),
+)
+FORM_XPATH = dict(FORM_XPATHS)
+
+LOCATE_SCRIPT = """
+    return arguments[0].map(xpath => document.evaluate(
+        xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue);
+"""
+
+
+class _SearchForm:
+    """
+    Element handles of a loaded search form, valid until the page changes.
+    """
+
+    def __init__(self, elements):
+        for name, element in elements.items():
+            setattr(self, name, element)
+        # Code typed into the previous search on this page; the next one must differ
+        self.last_captcha = None
+
+
 class WebScraper:
-    def __init__(self):
+    def __init__(self, parser=None, profile=None):
         """
         Initialize Chrome WebDriver with options.
+
+        `parser` picks how result tables are read: "html" (default) pulls the
+        markup once and parses it offline, "webdriver" reads cell by cell.
+        `profile` is the browser profile (see src/browser.py).
         """
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--window-size=1920,1080')
+        self.parser = parser or os.getenv('SCRAPER_PARSER', 'html')
+        self.profile = browser_profile(profile)
 
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.driver.implicitly_wait(30)
+        self.driver = webdriver.Chrome(options=chrome_options(self.profile))
+        apply_profile(self.driver, self.profile)
+        self.pages = 0
+        self.bytes_transferred = 0
+        # Explicit waits only, so a missing optional element returns immediately
+        self.driver.implicitly_wait(0)
+        self.timeout = float(os.getenv('SCRAPER_TIMEOUT', 30))
+        self.last_timings = {}
+        # Shared with the other scrapers and the PDF cache in this process
+        self.upstream = upstream()
+
+        # Form-session mode: the search form stays loaded in its own tab and
+        # order pages open in a second one, so back-to-back searches skip the reload
+        self.reuse_form = os.getenv('SCRAPER_REUSE_FORM', '1') == '1'
+        self.captcha_refresh = float(os.getenv('SCRAPER_CAPTCHA_REFRESH', 5))
+        self._form = None
+        self._form_tab = self._current_tab = self.driver.current_window_handle
+        self._order_tab = None
 
     def search_and_extract_case(self, case_type_input, case_no_input, case_year_input):
         """
         Search for a court case and extract the data.
+
+        Per-phase timings of the lookup are left in `self.last_timings`.
         """
-        self.driver.get(os.getenv('WEBSITE_LINK'))
+        self.last_timings = {}
+
+        with self.upstream.call('search') as call:
+            try:
+                # A second pass starts from a freshly loaded page when the
+                # reused one doesn't hand out a new captcha
+                for fresh in (False, True):
+                    form = self._search_form(fresh)
+
+                    with self._phase('form_fill'):
+                        Select(form.case_type).select_by_visible_text(case_type_input)
+                        Select(form.year).select_by_visible_text(case_year_input)
+                        form.case_no.clear()
+                        form.case_no.send_keys(case_no_input)
+                        form.captcha_field.clear()
+
+                    with self._phase('captcha'):
+                        code = self._read_captcha(form)
+                    if code is not None:
+                        break
+                form.captcha_field.send_keys(code)
+                form.last_captcha = code
+
+                with self._phase('results_wait'):
+                    previous_rows = self.driver.find_elements(By.CSS_SELECTOR, '#caseTable tbody tr')
+                    form.submit.click()
+                    rows = self._wait().until(lambda d: self._results_ready(previous_rows))
+
+                if rows is NO_RESULTS:
+                    logger.info("No records found for the given search criteria")
+                    return no_records_placeholder()
+
+                with self._phase('row_parse'):
+                    if self.parser == 'html':
+                        # One round-trip for the whole table instead of several per cell
+                        table_html = self.driver.find_element(By.ID, 'caseTable').get_attribute('outerHTML')
+                        data = parse_case_table(table_html, base_url=self.driver.current_url)
+                    else:
+                        data = self._parse_case_rows(rows)
+
+                return data
+
+            except TimeoutException as e:
+                self._form = None
+                call.fail()
+                count_error('webscraper', e)
+                logger.warning("Timed out waiting for the case status page", extra={'timeout': self.timeout})
+                return []
+
+            except Exception as e:
+                self._form = None
+                call.fail()
+                count_error('webscraper', e)
+                logger.exception("Case search failed")
+                return []
 
-        try:
-            # Locate elements
-            case_type = self.driver.find_element(By.XPATH, '//select[contains(@id , "case_type") or contains(@name , "case_type")]')
-            year_element = self.driver.find_element(By.XPATH, '//select[contains(@id , "year")]')
-            case_no_element = self.driver.find_element(By.XPATH, '//input[@type="text" and (contains(@id , "case") or contains(@id , "number"))]')
-            captcha_code = self.driver.find_element(By.XPATH, '//span[contains(@id ,"code" ) or contains(@id , "captcha")]')
-            captcha_field = self.driver.find_element(By.XPATH, '//input[@type="text" and contains(@id , "captcha")]')
-            submit_button = self.driver.find_element(By.XPATH, '//button[@id="search" or @id="submit" or contains(text() , "Submit")]')
-
-            # Select values
-            Select(case_type).select_by_visible_text(case_type_input)
-            Select(year_element).select_by_visible_text(case_year_input)
-            case_no_element.send_keys(case_no_input)
-
-            code = captcha_code.text.strip()
-            captcha_field.send_keys(code)
-
-            time.sleep(2)
-            submit_button.click()
-            time.sleep(10)
-
-            rows = self.driver.find_elements(By.CSS_SELECTOR, '#caseTable tbody tr')
-            if len(rows) == 1 and "No data available in table" in rows[0].text:
-                print("No records found for the given search criteria")
-                return [{
-                    'case_title': "NA",
-                    'status': "NA",
-                    'petitioner': "NA",
-                    'respondent': "NA",
-                    'next_date': "NA",
-                    'last_date': "NA",
-                    'court_no': "NA",
-                    'order_link': "NA"
-                }]
-
-            data = []
-            for row in rows:
-                cols = row.find_elements(By.TAG_NAME, 'td')
-                if len(cols) < 4:
-                    continue
-
-                s_no = cols[0].text.strip()
-                case_info_raw = cols[1]
-                try:
-                    case_text = case_info_raw.find_element(By.TAG_NAME, 'a').text.strip()
-                except:
-                    case_text = ""
-
-                try:
-                    status = case_info_raw.find_element(By.TAG_NAME, 'font').text.strip().replace('[', '').replace(']', '')
-                except:
-                    status = ""
-
-                try:
-                    order_link = case_info_raw.find_element(By.TAG_NAME, 'strong').find_element(By.XPATH, '..').get_attribute('href')
-                except:
-                    order_link = None
-
-                parties = cols[2].get_attribute('innerText').replace('\xa0', ' ').strip()
-                parts = ' '.join(parties.split()).split('VS.')
-                petitioner = parts[0].strip()
-                respondent = parts[1].strip() if len(parts) > 1 else None
-
-                listing_text = cols[3].get_attribute('innerText').strip().split('\n')
-                next_date = last_date = court_no = ""
-                for line in listing_text:
-                    if "NEXT DATE:" in line:
-                        next_date = line.replace("NEXT DATE:", "").strip()
-                    elif "Last Date:" in line:
-                        last_date = line.replace("Last Date:", "").strip()
-                    elif "COURT NO:" in line:
-                        court_no = line.replace("COURT NO:", "").strip()
-
-                data.append({
-                    'case_title': case_text,
-                    'status': status,
-                    'petitioner': petitioner,
-                    'respondent': respondent,
-                    'next_date': next_date if next_date != 'NA' else None,
-                    'last_date': last_date,
-                    'court_no': court_no,
-                    'order_link': order_link
-                })
-
-            return data
-
-        except Exception as e:
-            print(f"Error occurred: {e}")
-            return []
-        
     def get_order_data(self , order_link):
         """
             get orders data if available
+
+            Order page timings are added to `self.last_timings`.
+        """
+        with self.upstream.call('orders') as call:
+            try:
+                if self.reuse_form:
+                    self._switch_to(self._order_tab or self._open_order_tab())
+                with self._phase('order_page_load'):
+                    self.driver.get(order_link)
+                    table_body = self._wait().until(EC.presence_of_element_located((By.TAG_NAME, "tbody")))
+                self._record_page('orders')
+
+                with self._phase('order_parse'):
+                    if self.parser == 'html':
+                        data = parse_order_table(self.driver.page_source, base_url=self.driver.current_url)
+                    else:
+                        data = self._parse_order_rows(table_body)
+                return data
+            except Exception as e:
+                call.fail()
+                count_error('webscraper', e)
+                logger.exception("Order page failed", extra={'order_link': order_link})
+                return []
+
+    def _parse_case_rows(self, rows):
+        """
+        WebDriver path: read each cell of the result rows through the driver.
+        """
+        data = []
+        for row in rows:
+            cols = row.find_elements(By.TAG_NAME, 'td')
+            if len(cols) < 4:
+                continue
+
+            case_info_raw = cols[1]
+            case_text = self._first_text(case_info_raw, By.TAG_NAME, 'a')
+            status = self._first_text(case_info_raw, By.TAG_NAME, 'font').replace('[', '').replace(']', '')
+
+            # The orders link wraps a <strong> label
+            order_anchor = case_info_raw.find_elements(By.XPATH, './/strong/..')
+            order_link = order_anchor[0].get_attribute('href') if order_anchor else None
+
+            parties = cols[2].get_attribute('innerText').replace('\xa0', ' ').strip()
+            parts = ' '.join(parties.split()).split('VS.')
+            petitioner = parts[0].strip()
+            respondent = parts[1].strip() if len(parts) > 1 else None
+
+            listing_text = cols[3].get_attribute('innerText').strip().split('\n')
+            next_date = last_date = court_no = ""
+            for line in listing_text:
+                if "NEXT DATE:" in line:
+                    next_date = line.replace("NEXT DATE:", "").strip()
+                elif "Last Date:" in line:
+                    last_date = line.replace("Last Date:", "").strip()
+                elif "COURT NO:" in line:
+                    court_no = line.replace("COURT NO:", "").strip()
+
+            data.append(CaseResult(
+                case_title=case_text,
+                status=status,
+                petitioner=petitioner,
+                respondent=respondent,
+                next_date=next_date if next_date != 'NA' else None,
+                last_date=last_date,
+                court_no=court_no,
+                order_link=order_link,
+            ))
+
+        return data
+
+    def _parse_order_rows(self, table_body):
+        """
+        WebDriver path: read each cell of the order table through the driver.
+        """
+        rows = table_body.find_elements(By.TAG_NAME , "tr")
+        data =  []
+
+        for row in rows:
+            row_data = row.find_elements(By.TAG_NAME , "td")
+            if len(row_data) < 5:
+                continue
+            # sr.no
+            sr_no = row_data[0].text
+            # order link
+            order_link = self._first_href(row_data[1])
+            # order date
+            order_date = row_data[2].text
+            # corrigendum link
+            corrigendum_link = self._first_href(row_data[3])
+            # hindi order
+            hindi_order = self._first_href(row_data[4])
+            data.append(OrderEntry(
+                sr_no=int(sr_no),
+                order_link=order_link,
+                order_date=order_date,
+                corrigendum_link=corrigendum_link,
+                hindi_order=hindi_order,
+            ))
+        return data
+
+    def _search_form(self, fresh=False):
         """
-        self.driver.get(order_link)
-        time.sleep(5)
+        The search form, ready to fill in.
+
+        In form-session mode the handles from the previous search are reused
+        while the page is unchanged, and re-located without a reload when the
+        results came back as a new page that still carries the form.
+        """
+        if self.reuse_form:
+            self._switch_to(self._form_tab)
+            form = self._form
+            if form is not None and not fresh:
+                if not self._is_stale(form.submit):
+                    FORM_SESSIONS.inc(outcome='reused')
+                    return form
+                with self._phase('form_locate'):
+                    form = self._locate_form()
+                if form is not None:
+                    FORM_SESSIONS.inc(outcome='relocated')
+                    self._form = form
+                    return form
+
+        with self._phase('page_load'):
+            self.driver.get(os.getenv('WEBSITE_LINK'))
+            self._wait().until(EC.element_to_be_clickable((By.XPATH, FORM_XPATH['submit'])))
+            form = self._locate_form()
+        if form is None:
+            raise WebDriverException("Search form controls not found")
+        self._record_page('search')
+        FORM_SESSIONS.inc(outcome='loaded')
+        self._form = form if self.reuse_form else None
+        return form
+
+    def _locate_form(self):
+        """
+        Handles of every form control on the current page, or None if one is missing.
+        """
+        elements = self.driver.execute_script(LOCATE_SCRIPT, [xpath for _, xpath in FORM_XPATHS])
+        if not elements or any(element is None for element in elements):
+            return None
+        return _SearchForm(dict(zip(FORM_XPATH, elements)))
+
+    def _read_captcha(self, form):
+        """
+        The captcha code once the page shows it (it is filled in by script).
+
+        On a page already used for a search, waits up to `captcha_refresh`
+        seconds for a new code and returns None if none comes.
+        """
+        def code(driver):
+            try:
+                text = form.captcha_code.text.strip()
+            except StaleElementReferenceException:
+                # Only the captcha was redrawn
+                form.captcha_code = driver.find_element(By.XPATH, FORM_XPATH['captcha_code'])
+                text = form.captcha_code.text.strip()
+            return text if text and text != form.last_captcha else False
+
+        if form.last_captcha is None:
+            return self._wait().until(code)
+        try:
+            return WebDriverWait(self.driver, self.captcha_refresh, poll_frequency=0.1).until(code)
+        except TimeoutException:
+            FORM_SESSIONS.inc(outcome='captcha_stuck')
+            return None
+
+    def _open_order_tab(self):
+        self.driver.switch_to.new_window('tab')
+        self._order_tab = self._current_tab = self.driver.current_window_handle
+        # CDP settings such as the URL block list are per tab
+        apply_profile(self.driver, self.profile)
+        return self._order_tab
+
+    def _switch_to(self, handle):
+        if self._current_tab != handle:
+            self.driver.switch_to.window(handle)
+            self._current_tab = handle
+
+    @staticmethod
+    def _is_stale(element):
         try:
-            table_body = self.driver.find_element(By.TAG_NAME , "tbody")
-            rows = table_body.find_elements(By.TAG_NAME , "tr")
-            data =  []
-
-            for row in rows:
-                row_data = row.find_elements(By.TAG_NAME , "td")
-                # sr.no
-                sr_no = row_data[0].text
-                # order link
-                a_tag = row_data[1].find_elements(By.TAG_NAME , "a")
-                if a_tag:
-                    order_link = a_tag[0].get_attribute("href")
-                else:
-                    order_link = None
-                # order date
-                order_date = row_data[2].text
-                # corrigendum link
-                a_tag = row_data[3].find_elements(By.TAG_NAME , "a")
-                if a_tag:
-                    corrigendum_link = a_tag[0].get_attribute("href")
-                else:
-                    corrigendum_link = None
-                # hindi order
-                a_tag = row_data[4].find_elements(By.TAG_NAME , "a")
-                if a_tag:
-                    hindi_order = a_tag[0].get_attribute("href")
-                else:
-                    hindi_order = None
-                data.append({
-                    "sr_no":int(sr_no),
-                    "order_link":order_link,
-                    "order_date":order_date,
-                    "corrigendum_link":corrigendum_link,
-                    "hindi_order":hindi_order,
-                })
-            return data
-        except Exception as e:
-            print(e)
-            return []
-
-    def search_multiple_cases(self, cases_list):
+            element.is_enabled()
+            return False
+        except StaleElementReferenceException:
+            return True
+
+    def _phase(self, name):
+        """
+        Record how long a step of the current lookup took, in seconds.
+        """
+        return scrape_phase(self.last_timings, 'selenium', name)
+
+    def _wait(self):
+        return WebDriverWait(self.driver, self.timeout, poll_frequency=0.2)
+
+    def _results_ready(self, previous_rows):
+        """
+        Wait condition for the case table: returns the result rows, the
+        NO_RESULTS marker, or False while the table is still updating.
+        """
+        # The table is redrawn on submit, so rows from before the click must go stale first
+        if previous_rows:
+            try:
+                previous_rows[0].is_enabled()
+                return False
+            except StaleElementReferenceException:
+                previous_rows.clear()
+
+        rows = self.driver.find_elements(By.CSS_SELECTOR, '#caseTable tbody tr')
+        if not rows:
+            return False
+        if len(rows) == 1 and NO_RECORDS_TEXT in rows[0].text:
+            return NO_RESULTS
+        if rows[0].find_elements(By.CSS_SELECTOR, 'td.dataTables_empty'):
+            # "Processing..." placeholder
+            return False
+        return rows
+
+    @staticmethod
+    def _first_text(element, by, value):
+        """
+        Text of the first matching child, or "" without waiting if there is none.
+        """
+        found = element.find_elements(by, value)
+        return found[0].text.strip() if found else ""
+
+    @staticmethod
+    def _first_href(element):
+        found = element.find_elements(By.TAG_NAME, "a")
+        return found[0].get_attribute("href") if found else None
+
+    def fetch_form_options(self):
+        """
+        Case type and year options offered by the search form.
+        """
+        with self.upstream.call('form_options'):
+            if self.reuse_form:
+                self._switch_to(self._form_tab)
+            self.driver.get(os.getenv('WEBSITE_LINK'))
+            case_type = self._wait().until(EC.presence_of_element_located(
+                (By.XPATH, '//select[contains(@id , "case_type") or contains(@name , "case_type")]')
+            ))
+            year_element = self.driver.find_element(By.XPATH, '//select[contains(@id , "year")]')
+            return {
+                'case_types': parse_select_options(case_type.get_attribute('outerHTML')),
+                'years': parse_select_options(year_element.get_attribute('outerHTML')),
+            }
+
+    def search_multiple_cases(self, cases_list, workers=None):
         """
         Search for multiple cases.
+
+        Runs through src.batch.BatchRunner, which looks cases up concurrently
+        on its own driver sessions; returns {case_key: result} as before.
         """
-        all_results = {}
+        from src.batch import BatchRunner
 
-        for i, case in enumerate(cases_list):
-            print(f"Searching case {i+1}/{len(cases_list)}: {case}")
-            case_key = f"{case['case_type']} - {case['case_number']}/{case['case_year']}"
-            result = self.search_and_extract_case(
-                case['case_type'],
-                case['case_number'],
-                case['case_year']
-            )
-            all_results[case_key] = result
+        runner = BatchRunner(workers=workers)
+        return {record['key']: record['result'] for record in runner.run(cases_list)}
+
+    def resource_stats(self):
+        """
+        Pages loaded, bytes transferred for them and current memory of this session.
+        """
+        return {
+            'profile': self.profile,
+            'pages': self.pages,
+            'bytes_transferred': self.bytes_transferred,
+            'rss_bytes': session_rss(self.driver) if self.driver is not None else None,
+        }
 
-            if i < len(cases_list) - 1:
-                time.sleep(3)
+    def _record_page(self, page):
+        self.pages += 1
+        size = page_bytes(self.driver)
+        if size is not None:
+            self.bytes_transferred += size
+            PAGE_BYTES.observe(size, profile=self.profile, page=page)
+        if self.pages % RSS_SAMPLE_EVERY == 1:
+            rss = session_rss(self.driver)
+            if rss is not None:
+                SESSION_RSS_BYTES.observe(rss, profile=self.profile)
 
-        return all_results
+    def is_alive(self):
+        """
+        Check that the browser session still responds.
+        """
+        if self.driver is None:
+            return False
+        try:
+            self.driver.current_url
+            return True
+        except WebDriverException:
+            return False
 
     def close(self):
         """
-        Close the WebDriver session.
+        Close the WebDriver session; safe to call more than once.
         """
-        self.driver.quit()
+        driver, self.driver = self.driver, None
+        if driver is None:
+            return
+        try:
+            driver.quit()
+        except WebDriverException as e:
+            # Chrome already gone (crashed or killed); nothing left to clean up
+            logger.debug("WebDriver quit failed: %s", e)
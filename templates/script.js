@@ -1,13 +1,10 @@
 function downloadPDF(pdfLink) {
   let fileResponse;
 
-  fetch("http://127.0.0.1:5000/download", {
-    method: "POST",
-    headers: {
-      "Content-Type": "application/json",
-    },
-    body: JSON.stringify({ link: pdfLink }),
-  })
+  // GET so the browser can reuse its cached copy (ETag)
+  fetch(
+    "http://127.0.0.1:5000/download?link=" + encodeURIComponent(pdfLink)
+  )
     .then((response) => {
       if (!response.ok) throw new Error("Failed to fetch PDF");
       fileResponse = response;
@@ -38,6 +35,214 @@ function downloadPDF(pdfLink) {
 
 const submit = document.getElementById("submit");
 
+// Replace the built-in case type and year lists with the server's cached catalog
+function loadCaseTypes() {
+  fetch("http://127.0.0.1:5000/case-types")
+    .then((res) => {
+      if (!res.ok) throw new Error("Case types not available yet");
+      return res.json();
+    })
+    .then((catalog) => {
+      const fill = (select, values) => {
+        // Keep the "Select ..." placeholder, drop the built-in options
+        Array.from(select.options)
+          .filter((option) => option.value)
+          .forEach((option) => option.remove());
+        values.forEach((value) => {
+          const option = document.createElement("option");
+          option.value = value;
+          option.textContent = value;
+          select.appendChild(option);
+        });
+      };
+      fill(document.getElementById("case_type"), catalog.case_types);
+      fill(document.getElementById("case_year"), catalog.years);
+    })
+    .catch((err) => {
+      // The built-in lists stay in place until the catalog is harvested
+      console.warn("Using the built-in case types:", err);
+    });
+}
+
+loadCaseTypes();
+
+const STAGE_MESSAGES = {
+  queued: "Waiting for a free scraper...",
+  running: "Starting search...",
+  scraping: "Searching the court website...",
+  case_found: "Case found, reading orders...",
+  orders_parsed: "Orders read, saving...",
+  persisted: "Saved.",
+  cache_hit: "Loaded from recent results.",
+  coalesced: "Joined an identical search already in progress.",
+  stale: "Court website unavailable, using the last saved result.",
+};
+
+// Progress over server-sent events keeps a server worker busy for the whole
+// scrape; only turn this on when the app runs on threaded or gevent workers
+const USE_EVENT_STREAM = false;
+
+// Run searches as background jobs with progress messages. Any worker can
+// answer for a job only when the server has JOB_SQLITE_PATH (or
+// CACHE_SQLITE_PATH) set; otherwise keep plain requests
+const USE_JOBS = false;
+
+function showResults(data) {
+  spinner.classList.add("hidden"); // Hide spinner
+
+  const table = document.getElementById("resultsTable");
+  const body = document.getElementById("resultsBody");
+  const msg = document.getElementById("message");
+
+  body.innerHTML = "";
+  msg.innerText = "";
+
+  if (!data || data.length === 0) {
+    msg.innerText = "No case data found.";
+    table.classList.add("hidden");
+    return;
+  }
+
+  table.classList.remove("hidden");
+
+  if (data[0].stale) {
+    msg.innerText =
+      "The court website is unavailable right now; showing the last saved result.";
+  }
+
+  data.forEach((item) => {
+    const row = document.createElement("tr");
+
+    row.innerHTML = `
+<td class="border px-4 py-2">${item["case_title"] || "-"}</td>
+<td class="border px-4 py-2">${item["status"] || "-"}</td>
+<td class="border px-4 py-2">${item["petitioner"] || "-"}</td>
+<td class="border px-4 py-2">${item["respondent"] || "-"}</td>
+<td class="border px-4 py-2">${item["next_date"] || "-"}</td>
+<td class="border px-4 py-2">${item["last_date"] || "-"}</td>
+<td class="border px-4 py-2">${item["court_no"] || "-"}</td>
+<td class="border px-4 py-2">
+  <button 
+class="view-btn bg-blue-500 hover:bg-blue-600 text-white text-sm px-3 py-1 rounded" 
+data-response-id="${item["response_id"]}">
+View
+  </button>
+</td>
+  `;
+    body.appendChild(row);
+  });
+
+  document
+    .getElementById("resultsBody")
+    .addEventListener("click", function (e) {
+      if (e.target && e.target.classList.contains("view-btn")) {
+        const responseId = e.target.getAttribute("data-response-id");
+        console.log(responseId);
+
+        // GET so the browser cache keeps the list and revalidates it with its ETag
+        fetch(`http://127.0.0.1:5000/order/${encodeURIComponent(responseId)}`)
+          .then((res) => {
+            if (!res.ok) throw new Error(`Order lookup failed (${res.status})`);
+            return res.json();
+          })
+          .then((orders) => {
+            const orderTable = document.getElementById("orderTable");
+            const orderBody = document.getElementById("orderTableBody");
+            orderBody.innerHTML = "";
+
+            if (orders.length === 0) {
+              orderTable.classList.add("hidden");
+              alert("No order details found for this case.");
+              return;
+            }
+
+            orders.forEach((order) => {
+              const row = document.createElement("tr");
+              row.innerHTML = `
+        <td class="border px-4 py-2">${order["sr_no"]}</td>
+        <td class="border px-4 py-2">
+         ${
+           order["order_link"]
+             ? `<a href="#" class="text-blue-600 underline" onclick="downloadPDF('${order["order_link"]}')">View</a>`
+             : "-"
+         }
+        </td>
+        <td class="border px-4 py-2">${order["order_date"]}</td>
+        <td class="border px-4 py-2">
+          ${
+            order["corrigendum_link"]
+              ? `<a href="#" target="_blank" class="text-blue-600 underline"  onclick="downloadPDF('${order["corrigendum_link"]}')">View</a>`
+              : "-"
+          }
+        </td>
+        <td class="border px-4 py-2">
+          ${
+            order["hindi_order"]
+                ? `<a href="#" target="_blank" class="text-blue-600 underline"  onclick="downloadPDF('${order["hindi_order"]}')">View</a>`
+              : "-"
+          }
+        </td>
+      `;
+              orderBody.appendChild(row);
+            });
+
+            orderTable.classList.remove("hidden");
+          })
+          .catch((err) => {
+            console.error("Error fetching order details:", err);
+            alert("An error occurred while fetching order details.");
+          });
+      }
+    });
+}
+
+// Poll the job until it finishes
+function pollJob(jobId) {
+  return fetch(`http://127.0.0.1:5000/jobs/${jobId}`)
+    .then((res) =>
+      res.json().then((body) => {
+        if (!res.ok) throw new Error(body.error || "Job status unavailable");
+        return body;
+      })
+    )
+    .then((job) => {
+      if (job.state === "done" || job.state === "failed") return job;
+      const last = job.events[job.events.length - 1];
+      document.getElementById("message").innerText =
+        STAGE_MESSAGES[last.stage] || "";
+      return new Promise((resolve) => setTimeout(resolve, 1000)).then(() =>
+        pollJob(jobId)
+      );
+    });
+}
+
+// Follow the job's progress, over server-sent events when enabled
+function waitForJob(jobId) {
+  if (!USE_EVENT_STREAM || !window.EventSource) return pollJob(jobId);
+
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(
+      `http://127.0.0.1:5000/jobs/${jobId}/events`
+    );
+    Object.keys(STAGE_MESSAGES).forEach((stage) => {
+      source.addEventListener(stage, () => {
+        document.getElementById("message").innerText = STAGE_MESSAGES[stage];
+      });
+    });
+    ["done", "failed"].forEach((stage) => {
+      source.addEventListener(stage, (e) => {
+        source.close();
+        resolve(JSON.parse(e.data));
+      });
+    });
+    source.onerror = () => {
+      // Stream dropped: finish by polling
+      source.close();
+      pollJob(jobId).then(resolve, reject);
+    };
+  });
+}
+
 submit.addEventListener("click", function (e) {
   e.preventDefault();
 
@@ -49,6 +254,7 @@ submit.addEventListener("click", function (e) {
     case_no: case_no,
     case_type: case_type,
     year: year,
+    async: USE_JOBS,
   };
 
   // const spinner = document.getElementById("spinner");
@@ -64,111 +270,20 @@ submit.addEventListener("click", function (e) {
     body: JSON.stringify(formData),
   })
     .then((res) => res.json())
-    .then((data) => {
-      spinner.classList.add("hidden"); // Hide spinner
-
-      const table = document.getElementById("resultsTable");
-      const body = document.getElementById("resultsBody");
-      const msg = document.getElementById("message");
-
-      body.innerHTML = "";
-      msg.innerText = "";
-
-      if (!data || data.length === 0) {
-        msg.innerText = "No case data found.";
-        table.classList.add("hidden");
-        return;
+    .then((answer) => {
+      if (!USE_JOBS) {
+        if (!Array.isArray(answer)) throw new Error(answer.error || "Search failed");
+        return answer;
       }
-
-      table.classList.remove("hidden");
-
-      data.forEach((item) => {
-        const row = document.createElement("tr");
-
-        row.innerHTML = `
-    <td class="border px-4 py-2">${item["case_title"] || "-"}</td>
-    <td class="border px-4 py-2">${item["status"] || "-"}</td>
-    <td class="border px-4 py-2">${item["petitioner"] || "-"}</td>
-    <td class="border px-4 py-2">${item["respondent"] || "-"}</td>
-    <td class="border px-4 py-2">${item["next_date"] || "-"}</td>
-    <td class="border px-4 py-2">${item["last_date"] || "-"}</td>
-    <td class="border px-4 py-2">${item["court_no"] || "-"}</td>
-    <td class="border px-4 py-2">
-      <button 
-    class="view-btn bg-blue-500 hover:bg-blue-600 text-white text-sm px-3 py-1 rounded" 
-    data-response-id="${item["response_id"]}">
-    View
-  </button>
-    </td>
-  `;
-        body.appendChild(row);
+      if (!answer.job_id) throw new Error(answer.error || "Search failed");
+      return waitForJob(answer.job_id).then((job) => {
+        if (job.state !== "done" || job.status_code !== 200) {
+          throw new Error(job.error || (job.result && job.result.error));
+        }
+        return job.result;
       });
-
-      document
-        .getElementById("resultsBody")
-        .addEventListener("click", function (e) {
-          if (e.target && e.target.classList.contains("view-btn")) {
-            const responseId = e.target.getAttribute("data-response-id");
-            console.log(responseId);
-
-            fetch("http://127.0.0.1:5000/order", {
-              method: "POST",
-              headers: {
-                "Content-Type": "application/json",
-              },
-              body: JSON.stringify({ response_id: responseId }),
-            })
-              .then((res) => res.json())
-              .then((orders) => {
-                const orderTable = document.getElementById("orderTable");
-                const orderBody = document.getElementById("orderTableBody");
-                orderBody.innerHTML = "";
-
-                if (orders.length === 0) {
-                  orderTable.classList.add("hidden");
-                  alert("No order details found for this case.");
-                  return;
-                }
-
-                orders.forEach((order) => {
-                  const row = document.createElement("tr");
-                  row.innerHTML = `
-            <td class="border px-4 py-2">${order["sr_no"]}</td>
-            <td class="border px-4 py-2">
-             ${
-               order["order_link"]
-                 ? `<a href="#" class="text-blue-600 underline" onclick="downloadPDF('${order["order_link"]}')">View</a>`
-                 : "-"
-             }
-            </td>
-            <td class="border px-4 py-2">${order["order_date"]}</td>
-            <td class="border px-4 py-2">
-              ${
-                order["corrigendum_link"]
-                  ? `<a href="#" target="_blank" class="text-blue-600 underline"  onclick="downloadPDF('${order["corrigendum_link"]}')">View</a>`
-                  : "-"
-              }
-            </td>
-            <td class="border px-4 py-2">
-              ${
-                order["hindi_order"]
-                    ? `<a href="#" target="_blank" class="text-blue-600 underline"  onclick="downloadPDF('${order["hindi_order"]}')">View</a>`
-                  : "-"
-              }
-            </td>
-          `;
-                  orderBody.appendChild(row);
-                });
-
-                orderTable.classList.remove("hidden");
-              })
-              .catch((err) => {
-                console.error("Error fetching order details:", err);
-                alert("An error occurred while fetching order details.");
-              });
-          }
-        });
     })
+    .then(showResults)
     .catch((err) => {
       spinner.classList.add("hidden"); // Hide spinner
       console.error("Error fetching data:", err);
@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+import src.cache
+from src.cache import CaseCache
+
+NOW = datetime(2025, 1, 1, 12).timestamp()
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Memory tier only unless a test passes shared_path
+    monkeypatch.delenv('CACHE_SQLITE_PATH', raising=False)
+    clock = SimpleNamespace(now=NOW)
+    monkeypatch.setattr(src.cache, 'time', SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def cache(clock):
+    return CaseCache(ttl=HOUR, max_ttl=7 * DAY, empty_ttl=60, stale_ttl=DAY)
+
+
+def case(next_date=None, case_title='W.P.(C) - 11 / 2024'):
+    return [{'case_title': case_title, 'next_date': next_date}]
+
+
+def test_no_record_uses_empty_ttl(cache):
+    assert cache.expires_for(case(case_title='NA')) == NOW + 60
+    assert cache.expires_for([]) == NOW + 60
+
+
+def test_upcoming_hearing_keeps_until_next_date(cache):
+    hearing = datetime.fromtimestamp(NOW) + timedelta(days=2)
+    assert cache.expires_for(case(hearing)) == hearing.timestamp()
+
+
+def test_far_hearing_is_capped_at_max_ttl(cache):
+    hearing = datetime.fromtimestamp(NOW) + timedelta(days=30)
+    assert cache.expires_for(case(hearing)) == NOW + 7 * DAY
+
+
+@pytest.mark.parametrize('next_date', [None, 'NA', datetime.fromtimestamp(NOW) - timedelta(days=1)])
+def test_no_upcoming_hearing_uses_ttl(cache, next_date):
+    assert cache.expires_for(case(next_date)) == NOW + HOUR
+
+
+def test_get_until_expiry(cache, clock):
+    cache.put('k', case(), expires_at=NOW + HOUR)
+
+    clock.now = NOW + HOUR - 1
+    assert cache.get('k') == case()
+    clock.now = NOW + HOUR
+    assert cache.get('k') is None
+
+
+def test_stale_window(cache, clock):
+    cache.put('k', case(), expires_at=NOW + HOUR)
+
+    clock.now = NOW + HOUR + DAY - 1
+    assert cache.get('k') is None
+    assert cache.get_stale('k') == case()
+
+    clock.now = NOW + HOUR + DAY
+    assert cache.get('k') is None
+    assert cache.get_stale('k') is None
+
+
+def test_invalidate_drops_stale_copy(cache, clock):
+    cache.put('k', case(), expires_at=NOW + HOUR)
+    cache.invalidate('k')
+
+    assert cache.get('k') is None
+    assert cache.get_stale('k') is None
+
+
+def test_shared_tier_serves_other_instances(clock, tmp_path):
+    path = str(tmp_path / 'cache.db')
+    writer = CaseCache(ttl=HOUR, stale_ttl=DAY, shared_path=path)
+    reader = CaseCache(ttl=HOUR, stale_ttl=DAY, shared_path=path)
+
+    writer.put('k', case(), expires_at=NOW + HOUR)
+    assert reader.get('k') == case()
+    assert reader.stats()['shared_hits'] == 1
+
+    clock.now = NOW + 2 * HOUR
+    other = CaseCache(ttl=HOUR, stale_ttl=DAY, shared_path=path)
+    assert other.get('k') is None
+    assert other.get_stale('k') == case()
+
+
+def test_lru_evicts_oldest(clock):
+    cache = CaseCache(max_entries=2, ttl=HOUR)
+    for key in ('a', 'b'):
+        cache.put(key, case())
+    cache.get('a')
+    cache.put('c', case())
+
+    assert cache.get('b') is None
+    assert cache.get('a') == case() and cache.get('c') == case()
+
+
+def test_memory_tier_sees_invalidation_from_another_process(clock, tmp_path):
+    path = str(tmp_path / 'cache.db')
+    app = CaseCache(ttl=HOUR, memory_ttl=30, shared_path=path)
+    tracker = CaseCache(ttl=HOUR, memory_ttl=30, shared_path=path)
+    app.put('k', case(), expires_at=NOW + HOUR)
+
+    tracker.invalidate('k')
+    clock.now = NOW + 29
+    assert app.get('k') == case()
+    clock.now = NOW + 30
+    assert app.get('k') is None
+
+
+def test_memory_tier_picks_up_newer_value(clock, tmp_path):
+    path = str(tmp_path / 'cache.db')
+    app = CaseCache(ttl=HOUR, memory_ttl=30, shared_path=path)
+    other = CaseCache(ttl=HOUR, memory_ttl=30, shared_path=path)
+    app.put('k', case(), expires_at=NOW + HOUR)
+
+    other.put('k', case('04/01/2025'), expires_at=NOW + HOUR)
+    clock.now = NOW + 31
+    assert app.get('k') == case('04/01/2025')
@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+from src.coalesce import SingleFlight
+
+
+@pytest.fixture
+def flight(tmp_path):
+    return SingleFlight(lock_dir=str(tmp_path / 'locks'), cross_process=False)
+
+
+def concurrent_calls(flight, fn, followers):
+    """
+    Start a leader inside `fn`, then `followers` more callers of the same key,
+    then let `fn` finish. Returns each caller's (result, shared) or exception.
+    """
+    started = threading.Event()
+    release = threading.Event()
+    runs = []
+
+    def blocking_fn():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+        return fn()
+
+    outcomes = []
+
+    def call():
+        try:
+            outcomes.append(flight.do('k', blocking_fn))
+        except Exception as e:
+            outcomes.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    assert started.wait(5)
+    threads = [threading.Thread(target=call) for _ in range(followers)]
+    for thread in threads:
+        thread.start()
+    # Followers only need to reach do() while the key is in flight
+    time.sleep(0.2)
+    release.set()
+    for thread in [leader] + threads:
+        thread.join(5)
+    return runs, outcomes
+
+
+def test_concurrent_callers_share_one_run(flight):
+    runs, outcomes = concurrent_calls(flight, lambda: {'rows': [1, 2]}, followers=4)
+
+    assert len(runs) == 1
+    assert [result for result, _ in outcomes] == [{'rows': [1, 2]}] * 5
+    assert sorted(shared for _, shared in outcomes) == [False, True, True, True, True]
+    stats = flight.stats()
+    assert (stats['leaders'], stats['collapsed_local'], stats['in_flight']) == (1, 4, 0)
+
+
+def test_callers_get_separate_copies(flight):
+    _, outcomes = concurrent_calls(flight, lambda: {'rows': []}, followers=1)
+
+    first, second = (result for result, _ in outcomes)
+    first['rows'].append('changed')
+    assert second == {'rows': []}
+
+
+def test_error_reaches_every_waiter(flight):
+    def fail():
+        raise ValueError("scrape failed")
+
+    runs, outcomes = concurrent_calls(flight, fail, followers=2)
+
+    assert len(runs) == 1
+    assert len(outcomes) == 3
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+    # The failed key isn't left in flight: the next call runs again
+    assert flight.do('k', lambda: 'ok') == ('ok', False)
+
+
+def test_sequential_calls_each_run(flight):
+    assert flight.do('k', lambda: 1) == (1, False)
+    assert flight.do('k', lambda: 2) == (2, False)
+    assert flight.do('other', lambda: 3) == (3, False)
+    assert flight.stats()['leaders'] == 3
+
+
+def test_shared_lookup_only_after_waiting(tmp_path):
+    flight = SingleFlight(lock_dir=str(tmp_path / 'locks'))
+
+    # Nobody held the file lock, so there is no other worker's result to look for
+    assert flight.do('k', lambda: 'scraped', shared_lookup=lambda: 'cached') == ('scraped', False)
+    assert list((tmp_path / 'locks').iterdir()) == []
+
+
+def test_no_lock_files_without_cross_process(tmp_path):
+    flight = SingleFlight(lock_dir=str(tmp_path / 'locks'), cross_process=False)
+
+    assert flight.do('k', lambda: 1) == (1, False)
+    assert not (tmp_path / 'locks').exists()
+
+
+def test_waiter_takes_other_workers_result(tmp_path):
+    lock_dir = str(tmp_path / 'locks')
+    worker, other = SingleFlight(lock_dir=lock_dir), SingleFlight(lock_dir=lock_dir)
+    release = threading.Event()
+    holding = threading.Event()
+
+    def other_worker():
+        # flock is per open file, so a second instance contends like another process would
+        with other._process_lock('k'):
+            holding.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=other_worker)
+    thread.start()
+    assert holding.wait(5)
+    threading.Timer(0.2, release.set).start()
+
+    assert worker.do('k', lambda: 'scraped', shared_lookup=lambda: 'cached') == ('cached', True)
+    assert worker.stats()['collapsed_remote'] == 1
+    thread.join(5)
+    assert list((tmp_path / 'locks').iterdir()) == []
@@ -0,0 +1,69 @@
+from benchmarks import fixtures
+from src.models import CaseResult, OrderEntry
+from src.parser import parse_case_table, parse_order_table, reports_no_records
+
+
+def test_case_table_row():
+    rows = parse_case_table(fixtures.page(fixtures.case_table(rows=1)), base_url=fixtures.SITE)
+
+    assert rows == [CaseResult(
+        case_title='W.P.(CRL) - 985 / 2024',
+        status='DISPOSED',
+        petitioner='PETITIONER NAME 1',
+        respondent='STATE OF NCT OF DELHI 1',
+        next_date=None,
+        last_date='12/08/2025',
+        court_no='2',
+        order_link=f'{fixtures.SITE}{fixtures.ORDER_PATH}/985-2024-1',
+    )]
+
+
+def test_case_table_no_data():
+    assert parse_case_table(fixtures.case_table(rows=0)) == []
+
+
+def test_no_records_marker_only_on_empty_table():
+    assert reports_no_records(fixtures.page(fixtures.case_table(rows=0)))
+    # A page without a results table parses to [] too, but isn't "no record"
+    assert parse_case_table('<h1>Invalid captcha</h1>') == []
+    assert not reports_no_records('<h1>Invalid captcha</h1>')
+
+
+def test_case_table_missing_respondent():
+    markup = fixtures.case_table(rows=1).replace('&nbsp;<br>VS.<br>STATE OF NCT OF DELHI 1', '')
+
+    case, = parse_case_table(markup)
+
+    assert case.petitioner == 'PETITIONER NAME 1'
+    assert case.respondent is None
+
+
+def test_order_table_rows():
+    orders = parse_order_table(fixtures.page(fixtures.order_table(rows=10)))
+
+    assert [order.sr_no for order in orders] == list(range(1, 11))
+    assert orders[6] == OrderEntry(
+        sr_no=7,
+        order_link=f'{fixtures.SITE}{fixtures.PDF_PATH}/order-7.pdf',
+        order_date='08/08/2024',
+        corrigendum_link=None,
+        hindi_order=f'{fixtures.SITE}{fixtures.PDF_PATH}/hindi-7.pdf',
+    )
+    assert orders[9].corrigendum_link == f'{fixtures.SITE}{fixtures.PDF_PATH}/corr-10.pdf'
+
+
+def test_order_table_relative_links():
+    orders = parse_order_table(fixtures.order_table(rows=1, site=''), base_url=fixtures.SITE)
+
+    assert orders[0].order_link == f'{fixtures.SITE}{fixtures.PDF_PATH}/order-1.pdf'
+
+
+def test_order_table_skips_non_numeric_sr_no():
+    header_row = '<tr><td>S.No.</td><td>Order</td><td>Date</td><td>Corrigendum</td><td>Hindi</td></tr>'
+    markup = fixtures.order_table(rows=2).replace('<tbody>', '<tbody>' + header_row, 1)
+
+    assert [order.sr_no for order in parse_order_table(markup)] == [1, 2]
+
+
+def test_order_table_without_body():
+    assert parse_order_table('<div>No orders</div>') == []
@@ -0,0 +1,144 @@
+from types import SimpleNamespace
+
+import pytest
+
+import src.upstream
+from src.upstream import CLOSED, HALF_OPEN, OPEN, UpstreamHealth, UpstreamUnavailable, is_court_url
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(src.upstream, 'time', SimpleNamespace(monotonic=lambda: clock.now, perf_counter=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def health(clock):
+    return UpstreamHealth(window=10, failure_ratio=0.5, min_calls=4, open_seconds=60, slow_call=15,
+                          min_limit=1, max_limit=8, queue_timeout=0.01)
+
+
+def succeed(health, seconds=0.0, clock=None):
+    with health.call('test'):
+        if clock is not None:
+            clock.now += seconds
+
+
+def fail(health):
+    with health.call('test') as call:
+        call.fail()
+
+
+def test_opens_after_enough_failures(health):
+    succeed(health)
+    succeed(health)
+    fail(health)
+    assert health.state == CLOSED
+    fail(health)
+
+    assert health.state == OPEN
+    with pytest.raises(UpstreamUnavailable) as raised:
+        succeed(health)
+    assert raised.value.retry_after == 60
+
+
+def test_needs_min_calls_before_opening(health):
+    for _ in range(3):
+        fail(health)
+    assert health.state == CLOSED
+
+
+def test_exception_counts_as_failure(health):
+    for _ in range(4):
+        with pytest.raises(RuntimeError):
+            with health.call('test'):
+                raise RuntimeError("timeout")
+    assert health.state == OPEN
+
+
+def test_slow_calls_count_as_failures(health, clock):
+    for _ in range(4):
+        succeed(health, seconds=16, clock=clock)
+    assert health.state == OPEN
+
+
+def test_half_open_probe_closes_circuit(health, clock):
+    for _ in range(4):
+        fail(health)
+    clock.now += 60
+
+    with health.call('test'):
+        assert health.state == HALF_OPEN
+        # Only the probe goes through while the site is re-checked
+        with pytest.raises(UpstreamUnavailable):
+            succeed(health)
+
+    assert health.state == CLOSED
+    assert health.stats()['recent_calls'] == 0
+    succeed(health)
+
+
+def test_failed_probe_reopens(health, clock):
+    for _ in range(4):
+        fail(health)
+    clock.now += 60
+
+    fail(health)
+
+    assert health.state == OPEN
+    assert health.stats()['retry_after'] == 60
+    with pytest.raises(UpstreamUnavailable):
+        succeed(health)
+
+
+def test_aimd_halves_on_failure_and_grows_on_success(clock):
+    health = UpstreamHealth(min_calls=100, min_limit=1, max_limit=8)
+    assert health.limit == 8
+    fail(health)
+    assert health.limit == 4
+    fail(health)
+    assert health.limit == 2
+
+    # About one more slot per `limit` good calls
+    succeed(health)
+    assert health.limit == 2.5
+    succeed(health)
+    assert health.limit == pytest.approx(2.9)
+
+
+def test_limit_stays_within_bounds(clock):
+    health = UpstreamHealth(min_calls=100, min_limit=2, max_limit=3)
+    for _ in range(5):
+        fail(health)
+    assert health.limit == 2
+    for _ in range(20):
+        succeed(health)
+    assert health.limit == 3
+
+
+def test_rejects_calls_beyond_the_limit():
+    # Real clock: the wait for a free slot has to time out
+    health = UpstreamHealth(min_calls=100, min_limit=1, max_limit=2, queue_timeout=0.05)
+    fail(health)
+    assert int(health.limit) == 1
+
+    with health.call('test'):
+        with pytest.raises(UpstreamUnavailable):
+            succeed(health)
+
+
+def test_is_court_url(monkeypatch):
+    monkeypatch.setenv('WEBSITE_LINK', 'https://delhihighcourt.nic.in/app/get-case-type-status')
+
+    assert is_court_url('https://delhihighcourt.nic.in/app/showlogo/1.pdf')
+    assert not is_court_url('https://example.com/1.pdf')
+    assert not is_court_url('https://delhihighcourt.nic.in:8443/1.pdf')
+    assert not is_court_url('http://delhihighcourt.nic.in:bad/1.pdf')
+
+
+def test_opening_drops_to_min_limit(health):
+    for _ in range(4):
+        fail(health)
+    assert health.state == OPEN
+    assert health.limit == 1